@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark exact vs. approximate estimators used by the large-data model factory.
+
+Times fit + predict for each exact estimator and its large-data substitute over a
+range of training-set sizes and reports the first size at which the substitute is
+faster. The *_threshold fields in RegressionConfig and ClassificationConfig sit
+above these crossovers, at the size where the exact model's fit (repeated for
+every CV fold) starts to cost seconds rather than fractions of one.
+
+Usage (from backend/):
+    python benchmarks/bench_large_data_estimators.py [--sizes 1000 5000 20000] [--budget 60]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sklearn.datasets import make_classification, make_regression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from regression.enhanced_regression_framework import RegressionConfig, ModelTrainer as RegressionTrainer
+from classification.enhanced_classification_framework import ClassificationConfig, ModelTrainer as ClassificationTrainer
+
+DEFAULT_SIZES = [1000, 2500, 5000, 10000, 20000, 50000]
+N_FEATURES = 20
+N_TEST = 2000
+
+
+def time_fit_predict(model: Any, X_train: np.ndarray, y_train: np.ndarray, X_test: np.ndarray) -> float:
+    """Fit and predict once, returning wall-clock seconds."""
+    pipeline = Pipeline([('scaler', StandardScaler()), ('model', model)])
+    start = time.perf_counter()
+    pipeline.fit(X_train, y_train)
+    pipeline.predict(X_test)
+    return time.perf_counter() - start
+
+
+def run_pairs(task: str, sizes: List[int], budget: float) -> Dict[str, List[Dict[str, Any]]]:
+    """Time every exact/substitute pair for one task over all sizes."""
+    if task == 'regression':
+        config = RegressionConfig(large_data_substitution=True)
+        trainer = RegressionTrainer(config)
+        make_data = lambda n: make_regression(n_samples=n + N_TEST, n_features=N_FEATURES, noise=10.0, random_state=0)
+    else:
+        config = ClassificationConfig(large_data_substitution=True)
+        trainer = ClassificationTrainer(config)
+        make_data = lambda n: make_classification(n_samples=n + N_TEST, n_features=N_FEATURES, random_state=0)
+
+    exact_models = trainer.initialize_models()
+    # Ask for substitutes at a size above every threshold so each pair is represented
+    substitutes = trainer.get_large_data_models(max(sizes) * 10, N_FEATURES)
+
+    results = {name: [] for name in substitutes if name in exact_models}
+    skip_exact = set()
+
+    for n in sizes:
+        X, y = make_data(n)
+        X_train, y_train, X_test = X[:n], y[:n], X[n:]
+
+        for name in results:
+            exact_time: Optional[float] = None
+            if name not in skip_exact:
+                exact_time = time_fit_predict(exact_models[name], X_train, y_train, X_test)
+                if exact_time > budget:
+                    # Larger sizes only get slower; stop timing the exact model
+                    skip_exact.add(name)
+
+            approx_time = time_fit_predict(substitutes[name][0], X_train, y_train, X_test)
+            results[name].append({'n': n, 'exact': exact_time, 'approx': approx_time})
+
+    return results
+
+
+def report(task: str, results: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Print a timing table and the crossover size for each pair."""
+    print(f"\n=== {task} ===")
+    for name, rows in results.items():
+        print(f"\n{name}")
+        print(f"{'n_train':>10} {'exact (s)':>12} {'approx (s)':>12} {'speedup':>9}")
+        crossover = None
+        for row in rows:
+            exact = row['exact']
+            approx = row['approx']
+            if exact is None:
+                print(f"{row['n']:>10} {'> budget':>12} {approx:>12.3f} {'-':>9}")
+                crossover = crossover or row['n']
+                continue
+            speedup = exact / approx if approx > 0 else float('inf')
+            print(f"{row['n']:>10} {exact:>12.3f} {approx:>12.3f} {speedup:>8.1f}x")
+            if crossover is None and speedup > 1.0:
+                crossover = row['n']
+        print(f"crossover: {crossover if crossover else 'not reached'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--budget', type=float, default=60.0,
+                        help='Stop timing an exact model once a single fit exceeds this many seconds')
+    parser.add_argument('--task', choices=['regression', 'classification', 'both'], default='both')
+    args = parser.parse_args()
+
+    tasks = ['regression', 'classification'] if args.task == 'both' else [args.task]
+    for task in tasks:
+        report(task, run_pairs(task, sorted(args.sizes), args.budget))
+
+
+if __name__ == '__main__':
+    main()
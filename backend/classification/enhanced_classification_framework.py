@@ -8,25 +8,37 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 import logging
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Dict, List, Optional, Tuple, Any, Union, Callable
 from dataclasses import dataclass, asdict
 
 # Machine Learning
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split, check_cv, GridSearchCV
+from sklearn.preprocessing import StandardScaler, LabelEncoder, OneHotEncoder, FunctionTransformer
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.kernel_approximation import Nystroem
 from sklearn.svm import SVC
 from sklearn.neighbors import KNeighborsClassifier
+from sklearn.decomposition import PCA
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.naive_bayes import GaussianNB
 from sklearn.neural_network import MLPClassifier
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score, 
-    roc_auc_score, confusion_matrix, classification_report
+    roc_auc_score, confusion_matrix, classification_report, check_scoring
 )
 from sklearn.pipeline import Pipeline
+from sklearn.base import clone, is_classifier
+from sklearn.utils import _safe_indexing
+from scipy import sparse
 import joblib
+from pathlib import Path
+
+from incremental_training import IncrementalTrainer
+from dataset_store import MatrixArtifact
+from plot_sampling import downsample_series
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -45,6 +57,20 @@ class ClassificationConfig:
     scale_features: bool = True
     hyperparameter_tuning: bool = True
     stratify: bool = True
+    large_data_substitution: bool = True
+    svm_approximation_threshold: int = 10000
+    boosting_hist_threshold: int = 10000
+    knn_tree_threshold: int = 20000
+    knn_projection_dims: int = 8
+    kernel_approximation_components: int = 300
+    max_categories_per_feature: int = 50
+    min_category_frequency: int = 10
+    sparse_threshold: float = 0.3
+    training_mode: str = 'batch'
+    chunk_size: int = 50000
+    incremental_epochs: int = 3
+    cluster_features: int = 8
+    hash_features: int = 32
     
     def __post_init__(self):
         if self.models_to_include is None:
@@ -110,6 +136,102 @@ class DataValidator:
         
         return validation_results
 
+def _as_string(X: Any) -> np.ndarray:
+    """Categorical values as strings so mixed-type columns encode consistently."""
+    return np.asarray(X).astype(str)
+
+def _to_dense(X: Any) -> Any:
+    return X.toarray() if sparse.issparse(X) else X
+
+def _requires_dense(model: Any) -> bool:
+    """Estimators (or pipeline steps) that reject sparse input in scikit-learn 1.3."""
+    if isinstance(model, Pipeline):
+        return any(_requires_dense(step) for _, step in model.steps)
+    return isinstance(model, (GaussianNB, HistGradientBoostingClassifier, PCA))
+
+class FeaturePreprocessor:
+    """Fitted ColumnTransformer shared by training and serving.
+    
+    Numeric columns are median-imputed. Categorical columns are mode-imputed and
+    one-hot encoded into a sparse block; levels seen fewer than
+    ``min_category_frequency`` times, or beyond ``max_categories_per_feature``,
+    share one infrequent column, which is also where unseen levels land at
+    prediction time.
+    """
+    
+    def __init__(self, config: ClassificationConfig):
+        self.config = config
+        self.transformer = None
+        self.input_columns = []
+        self.numeric_columns = []
+        self.categorical_columns = []
+        self.steps = []
+    
+    def _build(self) -> ColumnTransformer:
+        transformers = []
+        if self.numeric_columns:
+            transformers.append(('numeric', SimpleImputer(strategy='median'), self.numeric_columns))
+        if self.categorical_columns:
+            transformers.append(('categorical', Pipeline([
+                ('impute', SimpleImputer(strategy='most_frequent')),
+                ('as_string', FunctionTransformer(_as_string, feature_names_out='one-to-one')),
+                ('onehot', OneHotEncoder(
+                    handle_unknown='infrequent_if_exist',
+                    min_frequency=self.config.min_category_frequency,
+                    max_categories=self.config.max_categories_per_feature,
+                    sparse_output=True,
+                    dtype=np.float32
+                ))
+            ]), self.categorical_columns))
+        return ColumnTransformer(
+            transformers,
+            sparse_threshold=self.config.sparse_threshold,
+            verbose_feature_names_out=False
+        )
+    
+    def _prepare(self, X: pd.DataFrame) -> pd.DataFrame:
+        X = X.reindex(columns=self.input_columns)
+        bool_columns = [col for col in self.numeric_columns if pd.api.types.is_bool_dtype(X[col])]
+        if bool_columns:
+            X = X.astype({col: float for col in bool_columns})
+        return X
+    
+    def fit_transform(self, X: pd.DataFrame) -> Any:
+        """Fit on the training features and return the encoded matrix (CSR when mostly zeros)."""
+        self.input_columns = X.columns.tolist()
+        self.numeric_columns = [col for col in self.input_columns if pd.api.types.is_numeric_dtype(X[col])]
+        self.categorical_columns = [col for col in self.input_columns if col not in self.numeric_columns]
+        self.transformer = self._build()
+        
+        X_prepared = self._prepare(X)
+        X_encoded = self.transformer.fit_transform(X_prepared)
+        
+        self.steps = []
+        missing = X_prepared.isnull().sum()
+        for col in missing[missing > 0].index:
+            strategy = 'median' if col in self.numeric_columns else 'mode'
+            self.steps.append(f"Filled missing values in '{col}' with {strategy}")
+        if self.categorical_columns:
+            encoder = self.transformer.named_transformers_['categorical'].named_steps['onehot']
+            n_bucketed = sum(
+                1 for infrequent in (encoder.infrequent_categories_ or []) if infrequent is not None
+            )
+            self.steps.append(
+                f"One-hot encoded {len(self.categorical_columns)} categorical columns into "
+                f"{sum(len(c) for c in encoder.categories_)} levels"
+                + (f" ({n_bucketed} columns with rare levels bucketed as infrequent)" if n_bucketed else "")
+            )
+        if sparse.issparse(X_encoded):
+            self.steps.append(f"Kept encoded features sparse ({X_encoded.nnz / max(1, np.prod(X_encoded.shape)):.2%} non-zero)")
+        return X_encoded
+    
+    def transform(self, X: pd.DataFrame) -> Any:
+        """Apply the fitted transform; missing input columns are treated as missing values."""
+        return self.transformer.transform(self._prepare(X))
+    
+    def get_feature_names(self) -> List[str]:
+        return [str(name) for name in self.transformer.get_feature_names_out()]
+
 class ModelTrainer:
     """Handle model training for classification."""
     
@@ -117,9 +239,15 @@ class ModelTrainer:
         self.config = config
         self.models = {}
         self.trained_models = {}
+        self.substitutions = {}
         
-    def initialize_models(self) -> Dict[str, Any]:
-        """Initialize classification models."""
+    def initialize_models(self, n_samples: Optional[int] = None, n_features: Optional[int] = None) -> Dict[str, Any]:
+        """Initialize classification models.
+        
+        When ``n_samples`` is given and exceeds the configured thresholds, models that
+        scale quadratically or worse are replaced by approximate equivalents. Every
+        replacement is recorded in ``self.substitutions``.
+        """
         available_models = {
             'logistic': LogisticRegression(random_state=self.config.random_state, max_iter=1000),
             'knn': KNeighborsClassifier(n_neighbors=5),
@@ -143,6 +271,13 @@ class ModelTrainer:
             )
         }
         
+        self.substitutions = {}
+        if n_samples is not None and self.config.large_data_substitution:
+            for name, (model, description) in self.get_large_data_models(n_samples, n_features).items():
+                available_models[name] = model
+                if name in self.config.models_to_include:
+                    self.substitutions[name] = description
+        
         self.models = {
             name: model for name, model in available_models.items()
             if name in self.config.models_to_include
@@ -150,6 +285,56 @@ class ModelTrainer:
         
         return self.models
     
+    def get_large_data_models(self, n_samples: int, n_features: Optional[int] = None) -> Dict[str, Tuple[Any, str]]:
+        """Approximate estimators to use above the configured row thresholds."""
+        substitutes = {}
+        
+        if n_samples >= self.config.svm_approximation_threshold:
+            n_components = min(self.config.kernel_approximation_components, n_samples)
+            # modified_huber is a smoothed hinge loss that still exposes predict_proba
+            substitutes['svm_linear'] = (
+                SGDClassifier(loss='modified_huber', random_state=self.config.random_state),
+                "Linear SVM trained with SGD (modified Huber loss) instead of SVC(kernel='linear')"
+            )
+            substitutes['svm_rbf'] = (
+                Pipeline([
+                    ('kernel', Nystroem(
+                        kernel='rbf',
+                        n_components=n_components,
+                        random_state=self.config.random_state
+                    )),
+                    ('linear', SGDClassifier(loss='modified_huber', random_state=self.config.random_state))
+                ]),
+                f"Nystroem RBF approximation ({n_components} components) + linear SVM instead of SVC(kernel='rbf')"
+            )
+        
+        if n_samples >= self.config.boosting_hist_threshold:
+            substitutes['gradient_boosting'] = (
+                HistGradientBoostingClassifier(
+                    max_iter=100,
+                    random_state=self.config.random_state
+                ),
+                "HistGradientBoostingClassifier instead of GradientBoostingClassifier"
+            )
+        
+        if n_samples >= self.config.knn_tree_threshold:
+            # Space-partitioning trees only beat brute force in low dimensions, so
+            # wide data is projected first and neighbours become approximate
+            knn = KNeighborsClassifier(n_neighbors=5, algorithm='kd_tree', n_jobs=-1)
+            n_dims = self.config.knn_projection_dims
+            if n_features is None or n_features > n_dims:
+                substitutes['knn'] = (
+                    Pipeline([
+                        ('projection', PCA(n_components=n_dims, random_state=self.config.random_state)),
+                        ('model', knn)
+                    ]),
+                    f"Approximate KNN: PCA projection to {n_dims} dims + KD-tree instead of brute-force KNN"
+                )
+            else:
+                substitutes['knn'] = (knn, "KD-tree KNN with parallel queries instead of default KNN")
+        
+        return substitutes
+    
     def train_model(self, model_name: str, X_train: pd.DataFrame, y_train: pd.Series) -> Any:
         """Train a single model."""
         if model_name not in self.models:
@@ -157,33 +342,58 @@ class ModelTrainer:
         
         model = self.models[model_name]
         
-        # Always use pipeline with scaling for consistency
-        pipeline = Pipeline([
-            ('scaler', StandardScaler()),
-            ('model', model)
-        ])
+        # Always use pipeline with scaling for consistency; sparse input is scaled
+        # without centering, or densified first for estimators that need it
+        steps = [('scaler', StandardScaler(with_mean=not sparse.issparse(X_train))), ('model', model)]
+        if sparse.issparse(X_train) and _requires_dense(model):
+            steps = [('densify', FunctionTransformer(_to_dense, accept_sparse=True)),
+                     ('scaler', StandardScaler()), ('model', model)]
+        pipeline = Pipeline(steps)
         
         pipeline.fit(X_train, y_train)
         self.trained_models[model_name] = pipeline
         return pipeline
 
+def _fit_and_score_fold(model: Any, X: Any, y: Any, scorer: Any, train: np.ndarray, test: np.ndarray) -> float:
+    """Fit a fresh clone on one CV training split and score it on the held-out split."""
+    estimator = clone(model)
+    try:
+        estimator.fit(_safe_indexing(X, train), _safe_indexing(y, train))
+        return float(scorer(estimator, _safe_indexing(X, test), _safe_indexing(y, test)))
+    except Exception as e:
+        # Same as cross_val_score's error_score=np.nan
+        logger.warning(f"Cross-validation fold failed: {e}")
+        return float('nan')
+
 class ModelEvaluator:
     """Evaluate classification model performance."""
     
     def __init__(self, config: ClassificationConfig):
         self.config = config
     
+    def cross_validate(self, model: Any, X: Any, y: Any,
+                       on_fold: Optional[Callable[[int, int, float], None]] = None) -> np.ndarray:
+        """Stratified cross-validation scores, reporting each fold as it finishes."""
+        cv = check_cv(self.config.cv_folds, y, classifier=is_classifier(model))
+        scorer = check_scoring(model, scoring=self.config.scoring_metric)
+        splits = list(cv.split(X, y))
+        folds = joblib.Parallel(n_jobs=-1, return_as='generator')(
+            joblib.delayed(_fit_and_score_fold)(model, X, y, scorer, train, test) for train, test in splits
+        )
+        scores = []
+        for fold, score in enumerate(folds, 1):
+            scores.append(score)
+            if on_fold is not None:
+                on_fold(fold, len(splits), score)
+        return np.array(scores)
+    
     def evaluate_model(self, model: Any, X_train: pd.DataFrame, X_test: pd.DataFrame,
-                      y_train: pd.Series, y_test: pd.Series, model_name: str) -> Tuple[Dict[str, float], np.ndarray]:
-        """Evaluate a single model."""
+                      y_train: pd.Series, y_test: pd.Series, model_name: str,
+                      on_fold: Optional[Callable[[int, int, float], None]] = None) -> Tuple[Dict[str, float], np.ndarray, Dict[str, Any]]:
+        """Evaluate a single model; also returns its test-set predictions and probabilities."""
         
         # Cross-validation on training set
-        cv_scores = cross_val_score(
-            model, X_train, y_train,
-            cv=self.config.cv_folds,
-            scoring=self.config.scoring_metric,
-            n_jobs=-1
-        )
+        cv_scores = self.cross_validate(model, X_train, y_train, on_fold)
         
         # Test predictions
         y_pred = model.predict(X_test)
@@ -214,7 +424,7 @@ class ModelEvaluator:
         else:
             metrics['test_auc'] = 0.0
         
-        return metrics, cv_scores
+        return metrics, cv_scores, {'y_pred': y_pred, 'y_pred_proba': y_pred_proba}
 
 class ClassificationWorkflow:
     """Main workflow orchestrator for classification analysis."""
@@ -226,6 +436,23 @@ class ClassificationWorkflow:
         self.results = {}
         self.feature_columns = None
         self.target_encoder = None
+        self.processed_matrix = None  # MatrixArtifact from preprocess_data
+        self.preprocessor = None  # Fitted FeaturePreprocessor, reused at prediction time
+        self.best_model = None
+        self.X_test = None  # Test split, kept for predictions
+        self.y_test = None
+        self.evaluation = None  # Compact test-set labels/scores of the best model, for plots
+        self.progress_callback = None  # Optional (event, progress, data) hook for live progress
+        self.should_stop = None  # Optional () -> bool, checked between models to skip the rest
+    
+    def _report(self, event: str, progress: float, data: Optional[Dict[str, Any]] = None):
+        """Forward a progress event; reporting failures never interrupt training."""
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback(event, progress, data)
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
         
     def validate_data(self, data: pd.DataFrame, target_column: str) -> Dict[str, Any]:
         """Validate uploaded data."""
@@ -246,52 +473,44 @@ class ClassificationWorkflow:
         }
     
     def preprocess_data(self, data: pd.DataFrame, target_column: str) -> Dict[str, Any]:
-        """Preprocess the data."""
+        """Fit the preprocessing transformer and encode the training matrix."""
         try:
-            processed_data = data.copy()
             preprocessing_steps = []
             
-            # Handle missing values
-            for col in processed_data.columns:
-                if processed_data[col].isnull().sum() > 0:
-                    if col == target_column:
-                        # Drop rows with missing target values
-                        processed_data = processed_data.dropna(subset=[col])
-                        preprocessing_steps.append(f"Removed rows with missing target values")
-                    elif processed_data[col].dtype in ['object', 'category']:
-                        mode_val = processed_data[col].mode()
-                        fill_val = mode_val.iloc[0] if len(mode_val) > 0 else 'Unknown'
-                        processed_data[col].fillna(fill_val, inplace=True)
-                        preprocessing_steps.append(f"Filled missing values in '{col}' with mode")
-                    else:
-                        median_val = processed_data[col].median()
-                        processed_data[col].fillna(median_val, inplace=True)
-                        preprocessing_steps.append(f"Filled missing values in '{col}' with median")
-            
-            # Encode categorical features
-            feature_columns = [col for col in processed_data.columns if col != target_column]
-            categorical_cols = processed_data[feature_columns].select_dtypes(include=['object', 'category']).columns.tolist()
-            
-            if categorical_cols:
-                processed_data = pd.get_dummies(processed_data, columns=categorical_cols, prefix_sep='_', drop_first=True)
-                preprocessing_steps.append(f"One-hot encoded {len(categorical_cols)} categorical columns")
+            # Drop rows with missing target values
+            processed_data = data.dropna(subset=[target_column])
+            if len(processed_data) < len(data):
+                preprocessing_steps.append("Removed rows with missing target values")
             
             # Encode target variable if it's categorical
-            if processed_data[target_column].dtype in ['object', 'category']:
+            y = processed_data[target_column]
+            self.target_encoder = None
+            if not pd.api.types.is_numeric_dtype(y):
                 self.target_encoder = LabelEncoder()
-                processed_data[target_column] = self.target_encoder.fit_transform(processed_data[target_column])
+                y = self.target_encoder.fit_transform(y.astype(str))
                 preprocessing_steps.append("Label encoded target variable")
             
-            # Update feature columns after encoding
-            self.feature_columns = [col for col in processed_data.columns if col != target_column]
+            # Impute and encode features with a fitted, reusable transformer
+            self.preprocessor = FeaturePreprocessor(self.config)
+            X = self.preprocessor.fit_transform(processed_data.drop(columns=[target_column]))
+            preprocessing_steps.extend(self.preprocessor.steps)
+            self.feature_columns = self.preprocessor.get_feature_names()
+            
+            # Compact float32 block (CSR when sparse) handed to training; the client only gets a preview
+            target_classes = self.target_encoder.classes_.tolist() if self.target_encoder is not None else None
+            self.processed_matrix = MatrixArtifact.from_matrix(
+                X, y, self.feature_columns, target_column,
+                preprocessor=self.preprocessor, target_classes=target_classes
+            )
             
             return {
                 'success': True,
-                'processed_data': processed_data.to_dict('records'),
+                'preview': self.processed_matrix.preview(),
+                'matrix': self.processed_matrix.summary(),
                 'feature_columns': self.feature_columns,
                 'preprocessing_steps': preprocessing_steps,
-                'final_shape': processed_data.shape,
-                'target_classes': processed_data[target_column].value_counts().to_dict()
+                'final_shape': self.processed_matrix.shape,
+                'target_classes': pd.Series(self.processed_matrix.y).value_counts().to_dict()
             }
             
         except Exception as e:
@@ -300,18 +519,32 @@ class ClassificationWorkflow:
                 'error': str(e)
             }
     
-    def train_models(self, data: pd.DataFrame, target_column: str) -> Dict[str, Any]:
-        """Train and evaluate models."""
+    def load_processed_matrix(self, artifact: MatrixArtifact) -> MatrixArtifact:
+        """Adopt a stored preprocessing artifact (matrix, fitted transformer, target classes) for training."""
+        self.processed_matrix = artifact
+        self.feature_columns = artifact.feature_columns
+        self.preprocessor = artifact.preprocessor
+        target_classes = artifact.metadata.get('target_classes')
+        if target_classes is not None:
+            self.target_encoder = LabelEncoder()
+            self.target_encoder.classes_ = np.asarray(target_classes)
+        return artifact
+    
+    def train_models(self, data: Union[pd.DataFrame, MatrixArtifact], target_column: str) -> Dict[str, Any]:
+        """Train and evaluate models on a DataFrame or a preprocessed (possibly sparse) matrix."""
         try:
             # Prepare data
-            # Ensure feature_columns are set (may be provided via preprocess or infer here)
-            if not self.feature_columns:
-                self.feature_columns = [c for c in data.columns if c != target_column]
+            if isinstance(data, MatrixArtifact):
+                self.feature_columns = data.feature_columns
+                X, y = data.X, data.y
+            else:
+                # Ensure feature_columns are set (may be provided via preprocess or infer here)
+                if not self.feature_columns:
+                    self.feature_columns = [c for c in data.columns if c != target_column]
+                X = data[self.feature_columns]
+                y = data[target_column]
             if not self.feature_columns:
                 raise ValueError("No feature columns available after preprocessing")
-
-            X = data[self.feature_columns]
-            y = data[target_column]
             
             # Split data
             stratify_param = y if self.config.stratify else None
@@ -332,31 +565,70 @@ class ClassificationWorkflow:
                     stratify=None
                 )
             
-            # Initialize models
-            models = self.model_trainer.initialize_models()
+            # Initialize models (size-aware: large training sets get approximate estimators)
+            models = self.model_trainer.initialize_models(n_samples=X_train.shape[0], n_features=X_train.shape[1])
             if not models:
                 # Safety fallback to a small default set
                 self.config.models_to_include = ['logistic', 'random_forest']
-                models = self.model_trainer.initialize_models()
+                models = self.model_trainer.initialize_models(n_samples=X_train.shape[0], n_features=X_train.shape[1])
+            model_substitutions = dict(self.model_trainer.substitutions)
+            if model_substitutions:
+                logger.info(f"Large-data substitutions for {X_train.shape[0]} rows: {model_substitutions}")
             
             # Train and evaluate each model
             model_results = {}
             cross_validation_scores = {}
+            test_predictions = {}
             
-            for model_name in models:
+            # Each model is one slice of progress: its fit, then one step per CV fold
+            n_models = len(models)
+            steps_per_model = self.config.cv_folds + 1
+            
+            skipped_models = []
+            
+            for index, model_name in enumerate(models):
+                # The user picked a model from the partial leaderboard: keep what is done, skip the rest
+                if model_results and self.should_stop is not None and self.should_stop():
+                    skipped_models = list(models)[index:]
+                    logger.info(f"Training stopped early; skipping {skipped_models}")
+                    self._report('stopped', index / n_models, {'skipped_models': skipped_models})
+                    break
+                
+                def fold_done(fold: int, n_folds: int, score: float, index=index, model_name=model_name):
+                    self._report('fold_complete', (index + (1 + fold) / (n_folds + 1)) / n_models, {
+                        'model': model_name, 'fold': fold, 'n_folds': n_folds, 'score': score
+                    })
+                
+                self._report('model_started', index / n_models, {
+                    'model': model_name, 'index': index + 1, 'n_models': n_models
+                })
+                
                 # Train model
                 trained_model = self.model_trainer.train_model(model_name, X_train, y_train)
+                self._report('model_fitted', (index + 1 / steps_per_model) / n_models, {'model': model_name})
                 
                 # Evaluate model
-                metrics, cv_scores = self.model_evaluator.evaluate_model(
-                    trained_model, X_train, X_test, y_train, y_test, model_name
+                metrics, cv_scores, predictions = self.model_evaluator.evaluate_model(
+                    trained_model, X_train, X_test, y_train, y_test, model_name, on_fold=fold_done
                 )
                 
                 model_results[model_name] = {
                     'model': trained_model,
                     'metrics': metrics
                 }
+                test_predictions[model_name] = predictions
                 cross_validation_scores[model_name] = cv_scores.tolist()
+                
+                # Partial result: this model's metrics are final once its folds are scored
+                leaderboard = sorted(
+                    ({'model': name, 'test_accuracy': result['metrics']['test_accuracy'], 'cv_mean': result['metrics']['cv_mean']}
+                     for name, result in model_results.items()),
+                    key=lambda row: row['test_accuracy'], reverse=True
+                )
+                self._report('model_complete', (index + 1) / n_models, {
+                    'model': model_name, 'index': index + 1, 'n_models': n_models, 'metrics': metrics,
+                    'cv_scores': cross_validation_scores[model_name], 'leaderboard': leaderboard
+                })
             
             # Create comparison DataFrame
             comparison_data = []
@@ -394,9 +666,9 @@ class ClassificationWorkflow:
                 ]
                 feature_importance.sort(key=lambda x: x['importance'], reverse=True)
             
-            # Generate confusion matrix for best model
-            y_pred_best = best_model.predict(X_test)
-            conf_matrix = confusion_matrix(y_test, y_pred_best)
+            # Confusion matrix for best model, from the predictions made during evaluation
+            best_predictions = test_predictions[best_model_name]
+            conf_matrix = confusion_matrix(y_test, best_predictions['y_pred'])
             
             # Store results (keep models separate for internal use)
             self.models = model_results  # Store models separately
@@ -407,9 +679,10 @@ class ClassificationWorkflow:
                 'best_model_name': best_model_name,
                 'feature_importance': feature_importance,
                 'confusion_matrix': conf_matrix.tolist(),
+                'model_substitutions': model_substitutions,
                 'split_info': {
-                    'train_size': len(X_train),
-                    'test_size': len(X_test),
+                    'train_size': X_train.shape[0],
+                    'test_size': X_test.shape[0],
                     'test_ratio': self.config.test_size
                 }
             }
@@ -417,6 +690,7 @@ class ClassificationWorkflow:
             self.X_test = X_test
             self.y_test = y_test
             self.best_model = best_model
+            self.evaluation = self._evaluation_arrays(y_test, best_predictions['y_pred'], best_predictions['y_pred_proba'])
             
             return {
                 'success': True,
@@ -425,10 +699,14 @@ class ClassificationWorkflow:
                 'best_model': best_model_name,
                 'feature_importance': feature_importance,
                 'confusion_matrix': conf_matrix.tolist(),
+                'model_substitutions': model_substitutions,
+                'skipped_models': skipped_models,
                 'training_summary': {
                     'models_trained': len(model_results),
+                    'stopped_early': bool(skipped_models),
                     'best_accuracy': float(comparison_df.iloc[0]['test_accuracy']),
-                    'best_f1_score': float(comparison_df.iloc[0]['test_f1'])
+                    'best_f1_score': float(comparison_df.iloc[0]['test_f1']),
+                    'approximated_models': list(model_substitutions.keys())
                 }
             }
             
@@ -439,8 +717,85 @@ class ClassificationWorkflow:
                 'error': str(e)
             }
 
-    def get_visualizations(self) -> Dict[str, Any]:
-        """Create Plotly visualizations for classification results."""
+    def train_models_incremental(self, source: Union[str, Path, pd.DataFrame], target_column: str,
+                                 column_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Train partial_fit models over a chunked dataset that need not fit in memory."""
+        try:
+            trainer = IncrementalTrainer('classification', self.config)
+            streaming_metrics = trainer.fit(source, target_column, column_names=column_names)
+            pipelines = trainer.get_pipelines()
+            
+            model_results = {}
+            cross_validation_scores = {}
+            for model_name, metrics in streaming_metrics.items():
+                model_results[model_name] = {
+                    'model': pipelines[model_name],
+                    'metrics': metrics.result()
+                }
+                cross_validation_scores[model_name] = metrics.chunk_scores
+            
+            comparison_data = []
+            for name, result in model_results.items():
+                row = {'model': name}
+                row.update(result['metrics'])
+                comparison_data.append(row)
+            comparison_df = pd.DataFrame(comparison_data).sort_values('test_accuracy', ascending=False)
+            
+            best_model_name = comparison_df.iloc[0]['model']
+            feature_importance = trainer.get_feature_importance(best_model_name)
+            conf_matrix = streaming_metrics[best_model_name].confusion
+            
+            # Raw input columns: the fitted pipelines encode and scale rows themselves
+            self.feature_columns = trainer.feature_columns
+            self.target_encoder = trainer.target_encoder
+            self.preprocessor = None
+            self.models = model_results
+            self.best_model = model_results[best_model_name]['model']
+            self.X_test = trainer.holdout_X
+            self.y_test = trainer.holdout_y
+            self.evaluation = None  # Predicted from the holdout on first use
+            
+            self.results = {
+                'model_metrics': {name: result['metrics'] for name, result in model_results.items()},
+                'comparison_df': comparison_df.to_dict('records'),
+                'cross_validation': cross_validation_scores,
+                'best_model_name': best_model_name,
+                'feature_importance': feature_importance,
+                'confusion_matrix': conf_matrix.tolist(),
+                'incremental': trainer.stats,
+                'split_info': {
+                    'train_size': trainer.stats['train_rows'],
+                    'test_size': trainer.stats['holdout_rows'],
+                    'test_ratio': self.config.test_size
+                }
+            }
+            
+            return {
+                'success': True,
+                'model_results': {name: result['metrics'] for name, result in model_results.items()},
+                'comparison_data': comparison_df.to_dict('records'),
+                'best_model': best_model_name,
+                'feature_importance': feature_importance,
+                'confusion_matrix': conf_matrix.tolist(),
+                'incremental': trainer.stats,
+                'training_summary': {
+                    'models_trained': len(model_results),
+                    'best_accuracy': float(comparison_df.iloc[0]['test_accuracy']),
+                    'best_f1_score': float(comparison_df.iloc[0]['test_f1']),
+                    'training_mode': 'incremental',
+                    'rows_seen': trainer.stats['rows_seen']
+                }
+            }
+            
+        except Exception as e:
+            logger.error(f"Incremental training failed: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def get_visualizations(self, max_points: Optional[int] = None) -> Dict[str, Any]:
+        """Create Plotly visualizations for classification results; curves are downsampled to ``max_points``."""
         try:
             import plotly.graph_objects as go
             import numpy as np
@@ -472,27 +827,20 @@ class ClassificationWorkflow:
                 heat.update_layout(title='Confusion Matrix', xaxis_title='Predicted', yaxis_title='Actual', height=400)
                 visuals['confusion_matrix'] = heat.to_dict()
 
-            # ROC curve (binary) if probabilities available
+            # ROC curve (binary) from the stored positive-class scores
             try:
-                if hasattr(self, 'best_model') and hasattr(self, 'X_test') and hasattr(self, 'y_test'):
-                    best = self.best_model
-                    X_test = self.X_test
-                    y_test = self.y_test
-                    # Try proba
-                    proba = None
-                    try:
-                        proba = best.predict_proba(X_test)
-                    except Exception:
-                        pass
-                    if proba is not None and len(np.unique(y_test)) == 2:
-                        from sklearn.metrics import roc_curve, auc
-                        fpr, tpr, _ = roc_curve(y_test, proba[:, 1])
-                        roc_auc = auc(fpr, tpr)
-                        roc_fig = go.Figure()
-                        roc_fig.add_trace(go.Scatter(x=fpr, y=tpr, mode='lines', name=f'ROC (AUC={roc_auc:.3f})', line=dict(color='#A44A3F')))
-                        roc_fig.add_trace(go.Scatter(x=[0,1], y=[0,1], mode='lines', name='Chance', line=dict(dash='dash', color='#cccccc')))
-                        roc_fig.update_layout(title='ROC Curve', xaxis_title='False Positive Rate', yaxis_title='True Positive Rate', height=400)
-                        visuals['roc_curve'] = roc_fig.to_dict()
+                evaluation = self.get_evaluation_data()
+                if evaluation is not None and evaluation.get('y_score') is not None:
+                    from sklearn.metrics import roc_curve, auc
+                    fpr, tpr, _ = roc_curve(evaluation['y_true'], evaluation['y_score'])
+                    roc_auc = auc(fpr, tpr)
+                    # One point per distinct score: thin the curve without changing its shape
+                    fpr, tpr = downsample_series(fpr, tpr, max_points)
+                    roc_fig = go.Figure()
+                    roc_fig.add_trace(go.Scatter(x=fpr, y=tpr, mode='lines', name=f'ROC (AUC={roc_auc:.3f})', line=dict(color='#A44A3F')))
+                    roc_fig.add_trace(go.Scatter(x=[0,1], y=[0,1], mode='lines', name='Chance', line=dict(dash='dash', color='#cccccc')))
+                    roc_fig.update_layout(title='ROC Curve', xaxis_title='False Positive Rate', yaxis_title='True Positive Rate', height=400)
+                    visuals['roc_curve'] = roc_fig.to_dict()
             except Exception:
                 pass
 
@@ -508,6 +856,16 @@ class ClassificationWorkflow:
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    def _prepare_input(self, data: pd.DataFrame) -> Tuple[Any, List[str]]:
+        """Raw rows to model input: the fitted preprocessor if there is one, else column alignment."""
+        if self.preprocessor is not None:
+            expected = self.preprocessor.input_columns
+            return self.preprocessor.transform(data), [col for col in expected if col not in data.columns]
+        
+        # Missing features default to 0
+        missing = [col for col in self.feature_columns if col not in data.columns]
+        return data.reindex(columns=self.feature_columns, fill_value=0), missing
+    
     def make_prediction(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Make prediction with the best model."""
         try:
@@ -517,16 +875,8 @@ class ClassificationWorkflow:
                     'error': 'No trained model available'
                 }
             
-            # Convert input to DataFrame
-            input_df = pd.DataFrame([input_data])
-            
-            # Ensure all required features are present
-            for feature in self.feature_columns:
-                if feature not in input_df.columns:
-                    input_df[feature] = 0  # Default value for missing features
-            
-            # Select features in correct order
-            input_df = input_df[self.feature_columns]
+            # Convert input to DataFrame and apply the training-time transform
+            input_df, _ = self._prepare_input(pd.DataFrame([input_data]))
             
             # Make prediction
             prediction = self.best_model.predict(input_df)[0]
@@ -555,6 +905,87 @@ class ClassificationWorkflow:
                 'error': str(e)
             }
 
+    def make_batch_prediction(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """Score many rows with one vectorized predict call."""
+        try:
+            if not hasattr(self, 'best_model') or self.best_model is None:
+                return {
+                    'success': False,
+                    'error': 'No trained model available'
+                }
+            
+            input_df, missing_features = self._prepare_input(data)
+            predictions = self.best_model.predict(input_df)
+            probabilities = None
+            
+            try:
+                probabilities = self.best_model.predict_proba(input_df).tolist()
+            except Exception:
+                pass
+            
+            # Decode predictions if target was encoded
+            if self.target_encoder is not None:
+                predictions = self.target_encoder.inverse_transform(predictions)
+            
+            return {
+                'success': True,
+                'predictions': np.asarray(predictions).tolist(),
+                'prediction_probabilities': probabilities,
+                'n_rows': int(len(data)),
+                'model_used': self.results.get('best_model_name'),
+                'missing_features': missing_features
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def get_serving_state(self) -> Dict[str, Any]:
+        """State needed, besides the fitted model, to serve predictions later."""
+        return {
+            'feature_columns': self.feature_columns,
+            'target_encoder': self.target_encoder,
+            'preprocessor': self.preprocessor,
+            'results': self.results,
+            'evaluation': self.get_evaluation_data(),
+            'config': asdict(self.config)
+        }
+    
+    def restore_serving_state(self, state: Dict[str, Any], model: Any, model_name: str):
+        """Load a persisted model and its serving state into this workflow."""
+        self.feature_columns = state.get('feature_columns')
+        self.target_encoder = state.get('target_encoder')
+        self.preprocessor = state.get('preprocessor')
+        self.results = dict(state.get('results') or {})
+        self.results['best_model_name'] = model_name
+        self.best_model = model
+        # Test-set predictions belong to the best model only
+        best_model_name = (state.get('results') or {}).get('best_model_name')
+        self.evaluation = state.get('evaluation') if model_name == best_model_name else None
+    
+    @staticmethod
+    def _evaluation_arrays(y_true: Any, y_pred: np.ndarray, y_pred_proba: Optional[np.ndarray]) -> Dict[str, Any]:
+        y_true = np.asarray(y_true)
+        # Positive-class scores are all the ROC curve needs; multi-class keeps none
+        y_score = None
+        if y_pred_proba is not None and np.ndim(y_pred_proba) == 2 and y_pred_proba.shape[1] == 2 \
+                and len(np.unique(y_true)) == 2:
+            y_score = np.asarray(y_pred_proba[:, 1], dtype=np.float32)
+        return {'y_true': y_true, 'y_pred': np.asarray(y_pred), 'y_score': y_score}
+    
+    def get_evaluation_data(self) -> Optional[Dict[str, Any]]:
+        """Best model's test-set labels, predictions and positive-class scores, kept so plots never re-predict."""
+        if self.evaluation is None and self.best_model is not None and self.X_test is not None:
+            proba = None
+            try:
+                proba = self.best_model.predict_proba(self.X_test)
+            except Exception:
+                pass
+            self.evaluation = self._evaluation_arrays(self.y_test, self.best_model.predict(self.X_test), proba)
+        return self.evaluation
+
     def export_results(self, format: str = 'json', include_models: bool = False) -> Any:
         """Export classification training results (json/csv/excel)."""
         import io as _io
@@ -4,30 +4,49 @@
 import warnings
 warnings.filterwarnings("ignore")
 
+import os
+import time
+import inspect
 import numpy as np
 import pandas as pd
 from datetime import datetime
 import logging
-from typing import Dict, List, Optional, Tuple, Any, Union
+import multiprocessing
+import multiprocessing.connection
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple, Any, Union, Callable
 from dataclasses import dataclass, asdict
 
 # Machine Learning
 from sklearn.cluster import (
     KMeans, DBSCAN, AgglomerativeClustering, SpectralClustering,
-    MeanShift, Birch, MiniBatchKMeans
+    MeanShift, Birch, MiniBatchKMeans, estimate_bandwidth
 )
 from sklearn.mixture import GaussianMixture  # Correct import location
-from sklearn.preprocessing import StandardScaler
+from sklearn.base import BaseEstimator, ClusterMixin
+from sklearn.kernel_approximation import Nystroem
+from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler
 from sklearn.decomposition import PCA
 from sklearn.manifold import TSNE
 from sklearn.metrics import (
-    silhouette_score, calinski_harabasz_score, davies_bouldin_score,
+    silhouette_score, silhouette_samples, calinski_harabasz_score, davies_bouldin_score,
     adjusted_rand_score, normalized_mutual_info_score
 )
 from sklearn.neighbors import NearestNeighbors
 import scipy.cluster.hierarchy as sch
+from scipy import stats, sparse
 from kneed import KneeLocator
 
+from plot_sampling import density_sample_indices, grouped_scatter_indices
+from embedding_cache import embedding_cache, embedding_cache_key
+
+# Conditional openTSNE import (FFT-accelerated t-SNE with out-of-sample transform)
+try:
+    from openTSNE import TSNE as OpenTSNE
+    OPENTSNE_AVAILABLE = True
+except ImportError:
+    OPENTSNE_AVAILABLE = False
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,11 +57,25 @@ class ClusteringConfig:
     max_clusters: int = 10
     min_clusters: int = 2
     algorithms_to_include: List[str] = None
-    scaling_method: str = 'standard'  # 'standard', 'minmax', 'robust'
+    scaling_method: str = 'standard'  # 'standard', 'minmax', 'robust', 'none'
     dimensionality_reduction: str = 'pca'  # 'pca', 'tsne', 'none'
     n_components: int = 2
     random_state: int = 42
     evaluation_metrics: List[str] = None
+    silhouette_mode: str = 'auto'  # 'auto' (exact up to the sample size), 'exact', 'sampled'
+    silhouette_sample_size: int = 5000
+    silhouette_confidence: float = 0.95
+    n_jobs: int = -1  # Algorithms compared in parallel processes; 1 runs them in-process, one after another
+    algorithm_timeout: float = 300.0  # Seconds before an algorithm's process is stopped
+    algorithm_memory_mb: float = 2048.0  # Estimated working memory allowed per algorithm before it fits on a sample
+    fit_mode: str = 'auto'  # 'auto' (coreset above coreset_threshold rows), 'full', 'coreset'
+    coreset_size: int = 20000  # Rows algorithms are fitted on in coreset mode
+    coreset_threshold: int = 200000
+    neighbor_graph_method: str = 'auto'  # 'auto', 'tree' (exact), 'random_projection' (approximate)
+    tsne_perplexity: float = 30.0
+    tsne_max_iter: int = 500  # Total optimization iterations, early exaggeration included
+    tsne_max_samples: int = 10000  # Rows t-SNE is fitted on; the rest are placed next to their neighbors
+    tsne_backend: str = 'auto'  # 'auto' (openTSNE when installed), 'opentsne', 'sklearn'
     
     def __post_init__(self):
         if self.algorithms_to_include is None:
@@ -55,72 +88,554 @@ class ClusteringConfig:
                 'silhouette', 'calinski_harabasz', 'davies_bouldin'
             ]
 
+# t-SNE embedding
+TSNE_PLACEMENT_NEIGHBORS = 10  # Embedded neighbors a row left out of the t-SNE fit is placed among
+TSNE_PLACEMENT_CHUNK_ROWS = 65536
+# scikit-learn renamed n_iter to max_iter in 1.5; older openTSNE releases also use n_iter
+SKLEARN_TSNE_ITER_PARAM = 'max_iter' if 'max_iter' in inspect.signature(TSNE).parameters else 'n_iter'
+if OPENTSNE_AVAILABLE:
+    OPENTSNE_ITER_PARAM = 'max_iter' if 'max_iter' in inspect.signature(OpenTSNE).parameters else 'n_iter'
+
+class TSNEEmbedder:
+    """PCA-initialized t-SNE that bounds its cost on large data and caches its output.
+    
+    Uses openTSNE's FFT-accelerated gradients when installed and scikit-learn's
+    Barnes-Hut otherwise. Above ``max_samples`` rows the embedding is fitted
+    on a uniform sample and every other row is placed at the
+    inverse-distance weighted mean of its nearest fitted rows' coordinates;
+    ``transform`` places rows scored later the same way.
+    Embeddings are cached by the exact input matrix (so the scaling applied
+    is part of the key) and the embedding parameters.
+    """
+    
+    def __init__(self, n_components: int = 2, perplexity: float = 30.0, max_iter: int = 500,
+                 max_samples: int = 10000, backend: str = 'auto', random_state: int = 42):
+        self.n_components = n_components
+        self.perplexity = perplexity
+        self.max_iter = max(250, max_iter)
+        self.max_samples = max_samples
+        self.random_state = random_state
+        if backend == 'opentsne' and not OPENTSNE_AVAILABLE:
+            logger.warning("openTSNE is not installed; using scikit-learn t-SNE")
+        # openTSNE's FFT gradients only cover one- and two-dimensional embeddings
+        self.backend = 'opentsne' if (backend in ('auto', 'opentsne') and OPENTSNE_AVAILABLE
+                                      and n_components <= 2) else 'sklearn'
+        self.info = {}
+        self.fit_data = None
+        self.fit_index = None
+        self.fit_embedding = None
+    
+    def _params(self, n_fit: int) -> Dict[str, Any]:
+        return {
+            'n_components': self.n_components,
+            'perplexity': self.perplexity,
+            'max_iter': self.max_iter,
+            'n_fit': n_fit,
+            'backend': self.backend,
+            'random_state': self.random_state
+        }
+    
+    def _fit(self, data: np.ndarray) -> np.ndarray:
+        # Perplexity must stay well below the number of rows
+        perplexity = float(max(1.0, min(self.perplexity, (len(data) - 1) / 3)))
+        if self.backend == 'opentsne':
+            early_iter = min(250, self.max_iter // 2)
+            tsne = OpenTSNE(
+                n_components=self.n_components, perplexity=perplexity, initialization='pca',
+                learning_rate='auto', negative_gradient_method='fft', early_exaggeration_iter=early_iter,
+                random_state=self.random_state, **{OPENTSNE_ITER_PARAM: self.max_iter - early_iter}
+            )
+            return np.asarray(tsne.fit(data))
+        tsne = TSNE(
+            n_components=self.n_components, perplexity=perplexity, init='pca', learning_rate='auto',
+            method='barnes_hut' if self.n_components < 4 else 'exact',
+            random_state=self.random_state, **{SKLEARN_TSNE_ITER_PARAM: self.max_iter}
+        )
+        return tsne.fit_transform(data)
+    
+    @staticmethod
+    def _place(nearest: NearestNeighbors, fit_embedding: np.ndarray, data: np.ndarray) -> np.ndarray:
+        placed = np.empty((len(data), fit_embedding.shape[1]), dtype=fit_embedding.dtype)
+        for start in range(0, len(data), TSNE_PLACEMENT_CHUNK_ROWS):
+            distances, indices = nearest.kneighbors(data[start:start + TSNE_PLACEMENT_CHUNK_ROWS])
+            weights = 1.0 / (distances + 1e-9)
+            weights /= weights.sum(axis=1, keepdims=True)
+            placed[start:start + len(indices)] = np.einsum('ij,ijk->ik', weights, fit_embedding[indices])
+        return placed
+    
+    def fit_transform(self, data: np.ndarray) -> np.ndarray:
+        start_time = time.time()
+        n = len(data)
+        n_fit = min(n, self.max_samples)
+        fit_mask = np.ones(n, dtype=bool)
+        if n_fit < n:
+            rng = np.random.default_rng(self.random_state)
+            fit_mask[:] = False
+            fit_mask[rng.choice(n, size=n_fit, replace=False)] = True
+        key = embedding_cache_key(data, self._params(n_fit))
+        embedding = embedding_cache.get(key)
+        cached = embedding is not None and embedding.shape == (n, self.n_components)
+        # Fitted rows, their neighbor index and their coordinates also place rows scored later
+        self.fit_data = np.asarray(data[fit_mask], dtype=np.float32)
+        self.fit_index = NearestNeighbors(n_neighbors=min(TSNE_PLACEMENT_NEIGHBORS, n_fit)).fit(self.fit_data)
+        if not cached:
+            if n_fit < n:
+                embedding = np.empty((n, self.n_components), dtype=np.float32)
+                embedding[fit_mask] = self._fit(data[fit_mask])
+                embedding[~fit_mask] = self._place(self.fit_index, embedding[fit_mask], data[~fit_mask])
+            else:
+                embedding = self._fit(data).astype(np.float32)
+            embedding_cache.put(key, embedding)
+        self.fit_embedding = embedding[fit_mask]
+        self.info = {
+            'backend': self.backend,
+            'perplexity': self.perplexity,
+            'max_iter': self.max_iter,
+            'n_fit': int(n_fit),
+            'n_placed': int(n - n_fit),
+            'cached': cached,
+            'seconds': round(time.time() - start_time, 2)
+        }
+        return embedding
+    
+    def transform(self, data: np.ndarray) -> np.ndarray:
+        """Place new rows among the fitted rows' coordinates."""
+        if self.fit_data is None:
+            raise ValueError("t-SNE embedding has not been fitted")
+        return self._place(self.fit_index, self.fit_embedding, np.asarray(data, dtype=np.float32))
+    
+    def summary(self) -> str:
+        parts = [f"{'openTSNE' if self.info['backend'] == 'opentsne' else 'scikit-learn'}, perplexity {self.info['perplexity']:g}"]
+        if self.info['n_placed']:
+            parts.append(f"fitted on {self.info['n_fit']} rows, {self.info['n_placed']} placed by nearest neighbors")
+        if self.info['cached']:
+            parts.append("from cache")
+        return ', '.join(parts)
+
+# Scalers by ClusteringConfig.scaling_method; any other value leaves features unscaled
+SCALERS = {'standard': StandardScaler, 'minmax': MinMaxScaler, 'robust': RobustScaler}
+
 class DataPreprocessor:
-    """Handle data preprocessing for clustering."""
+    """Handle data preprocessing for clustering.
+    
+    ``preprocess_data`` fits the stage once: numeric feature columns, their
+    median fill values, the scaler and the dimensionality reduction. The
+    numeric columns are copied once into a float32 matrix that every step
+    then modifies in place. ``transform`` applies the fitted stage to new
+    rows, so rows assigned to clusters later are scaled exactly like the
+    rows the clusters were found on.
+    """
     
     def __init__(self, config: ClusteringConfig):
         self.config = config
+        self.feature_columns = None
+        self.fill_values = None
         self.scaler = None
         self.pca = None
+        self.tsne_pca = None  # PCA to 50 components ahead of t-SNE on wide data
         self.tsne = None
-        
+    
+    @staticmethod
+    def _to_matrix(data: pd.DataFrame, columns: List[str]) -> np.ndarray:
+        # One float32 copy, filled column by column; absent columns and missing values become NaN
+        matrix = np.empty((len(data), len(columns)), dtype=np.float32)
+        for j, column in enumerate(columns):
+            if column not in data.columns:
+                matrix[:, j] = np.nan
+                continue
+            values = data[column]
+            if values.dtype == object:
+                values = pd.to_numeric(values, errors='coerce')
+            matrix[:, j] = values.to_numpy(dtype=np.float32, na_value=np.nan)
+        return matrix
+    
+    def _fill_missing(self, matrix: np.ndarray) -> bool:
+        missing = np.isnan(matrix)
+        if not missing.any():
+            return False
+        rows, cols = np.nonzero(missing)
+        matrix[rows, cols] = self.fill_values[cols]
+        return True
+    
     def preprocess_data(self, data: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
         """Preprocess data for clustering."""
         processing_steps = []
         
-        # Remove non-numeric columns
-        numeric_data = data.select_dtypes(include=[np.number])
-        if len(numeric_data.columns) == 0:
+        # Numeric, non-boolean columns, chosen from the dtypes without copying the frame
+        self.feature_columns = [
+            column for column, dtype in data.dtypes.items()
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+        ]
+        if len(self.feature_columns) == 0:
             raise ValueError("No numeric columns found for clustering")
         
-        processing_steps.append(f"Selected {len(numeric_data.columns)} numeric features")
+        processed = self._to_matrix(data, self.feature_columns)
+        processing_steps.append(f"Selected {len(self.feature_columns)} numeric features")
         
-        # Handle missing values
-        if numeric_data.isnull().sum().sum() > 0:
-            numeric_data = numeric_data.fillna(numeric_data.median())
+        # Handle missing values; fill values are kept for rows scored later
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-missing columns
+            self.fill_values = np.nan_to_num(np.nanmedian(processed, axis=0)).astype(np.float32)
+        if self._fill_missing(processed):
             processing_steps.append("Filled missing values with median")
         
         # Scale features
-        if self.config.scaling_method == 'standard':
-            self.scaler = StandardScaler()
-            scaled_data = self.scaler.fit_transform(numeric_data)
-            processing_steps.append("Applied standard scaling")
+        scaler_class = SCALERS.get(self.config.scaling_method)
+        if scaler_class is not None:
+            self.scaler = scaler_class(copy=False)
+            processed = self.scaler.fit_transform(processed)
+            processing_steps.append(f"Applied {self.config.scaling_method} scaling")
         else:
-            scaled_data = numeric_data.values
             processing_steps.append("No scaling applied")
         
         # Dimensionality reduction
-        if self.config.dimensionality_reduction == 'pca' and scaled_data.shape[1] > self.config.n_components:
+        if self.config.dimensionality_reduction == 'pca' and processed.shape[1] > self.config.n_components:
             self.pca = PCA(n_components=self.config.n_components, random_state=self.config.random_state)
-            reduced_data = self.pca.fit_transform(scaled_data)
+            reduced_data = self.pca.fit_transform(processed)
             processing_steps.append(f"Applied PCA reduction to {self.config.n_components} components")
             return reduced_data, processing_steps
-        elif self.config.dimensionality_reduction == 'tsne' and scaled_data.shape[1] > self.config.n_components:
+        elif self.config.dimensionality_reduction == 'tsne' and processed.shape[1] > self.config.n_components:
             # Use PCA first if too many dimensions for t-SNE
-            if scaled_data.shape[1] > 50:
-                pca_temp = PCA(n_components=50, random_state=self.config.random_state)
-                scaled_data = pca_temp.fit_transform(scaled_data)
+            if processed.shape[1] > 50:
+                self.tsne_pca = PCA(n_components=50, random_state=self.config.random_state)
+                processed = self.tsne_pca.fit_transform(processed)
             
-            self.tsne = TSNE(n_components=self.config.n_components, random_state=self.config.random_state)
-            reduced_data = self.tsne.fit_transform(scaled_data)
-            processing_steps.append(f"Applied t-SNE reduction to {self.config.n_components} components")
+            self.tsne = TSNEEmbedder(
+                n_components=self.config.n_components,
+                perplexity=self.config.tsne_perplexity,
+                max_iter=self.config.tsne_max_iter,
+                max_samples=self.config.tsne_max_samples,
+                backend=self.config.tsne_backend,
+                random_state=self.config.random_state
+            )
+            reduced_data = self.tsne.fit_transform(processed)
+            processing_steps.append(f"Applied t-SNE reduction to {self.config.n_components} components ({self.tsne.summary()})")
             return reduced_data, processing_steps
         
-        return scaled_data, processing_steps
+        return processed, processing_steps
+    
+    def transform(self, data: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
+        """Apply the fitted stage to new rows without refitting.
+        
+        Returns the processed rows and the feature columns ``data`` lacks;
+        those are filled with the training medians.
+        """
+        if self.feature_columns is None:
+            raise ValueError("Preprocessing has not been fitted")
+        missing_features = [column for column in self.feature_columns if column not in data.columns]
+        processed = self._to_matrix(data, self.feature_columns)
+        self._fill_missing(processed)
+        if self.scaler is not None:
+            processed = self.scaler.transform(processed)
+        if self.pca is not None:
+            processed = self.pca.transform(processed)
+        elif self.tsne is not None:
+            if self.tsne_pca is not None:
+                processed = self.tsne_pca.transform(processed)
+            processed = self.tsne.transform(processed)
+        return processed, missing_features
+
+class SilhouetteEstimator:
+    """Silhouette score that stays affordable on large data.
+    
+    The exact score needs all pairwise distances (O(n^2) time and memory).
+    Above ``sample_size`` rows the score is estimated from a sample stratified
+    by cluster: every cluster contributes in proportion to its size (at least
+    two points), per-cluster mean silhouettes are weighted by the true
+    cluster sizes, and a normal-approximation confidence interval is reported
+    with the estimate. Small data is scored exactly.
+    """
+    
+    def __init__(self, mode: str = 'auto', sample_size: int = 5000,
+                 confidence: float = 0.95, random_state: int = 42):
+        if mode not in ('auto', 'exact', 'sampled'):
+            raise ValueError(f"Unknown silhouette mode: {mode}")
+        self.mode = mode
+        self.sample_size = sample_size
+        self.confidence = confidence
+        self.random_state = random_state
+    
+    @classmethod
+    def from_config(cls, config: ClusteringConfig) -> 'SilhouetteEstimator':
+        return cls(config.silhouette_mode, config.silhouette_sample_size,
+                   config.silhouette_confidence, config.random_state)
+    
+    def uses_exact(self, n_samples: int) -> bool:
+        return self.mode == 'exact' or (self.mode == 'auto' and n_samples <= self.sample_size)
+    
+    def estimate(self, data: np.ndarray, labels: np.ndarray) -> Dict[str, Any]:
+        """Score, confidence interval, whether it is exact, and how many points were used."""
+        labels = np.asarray(labels)
+        n = len(labels)
+        if self.uses_exact(n):
+            score = float(silhouette_score(data, labels))
+            return {'score': score, 'ci': [score, score], 'exact': True, 'n_used': n}
+        
+        idx, counts, alloc = self._stratified_sample(labels)
+        sample_labels = labels[idx]
+        point_scores = silhouette_samples(data[idx], sample_labels)
+        
+        # Stratified mean and variance, with finite population correction per cluster
+        clusters = np.unique(labels)
+        weights = counts / n
+        means = np.array([point_scores[sample_labels == c].mean() for c in clusters])
+        variances = np.array([
+            point_scores[sample_labels == c].var(ddof=1) if a > 1 else 0.0
+            for c, a in zip(clusters, alloc)
+        ])
+        score = float(np.dot(weights, means))
+        std_err = float(np.sqrt(np.sum(weights ** 2 * variances / alloc * (1 - alloc / counts))))
+        z = float(stats.norm.ppf(0.5 + self.confidence / 2))
+        return {
+            'score': score,
+            'ci': [score - z * std_err, score + z * std_err],
+            'exact': False,
+            'n_used': int(len(idx))
+        }
+    
+    def _stratified_sample(self, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n = len(labels)
+        _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+        alloc = np.minimum(counts, np.maximum(2, (counts * self.sample_size) // n))
+        
+        # Random order within each cluster; keep the first alloc[c] points of cluster c
+        rng = np.random.default_rng(self.random_state)
+        order = rng.permutation(n)
+        order = order[np.argsort(inverse[order], kind='stable')]
+        rank = np.arange(n) - np.repeat(np.cumsum(counts) - counts, counts)
+        keep = rank < np.repeat(alloc, counts)
+        return np.sort(order[keep]), counts, alloc
+
+# Algorithms fitted on the weighted coreset; the others use the stratified sample
+WEIGHTED_ALGORITHMS = ('kmeans', 'mini_batch_kmeans')
+ASSIGN_CHUNK_ROWS = 65536  # Rows labelled per predict / nearest-neighbor batch
+
+class Coreset:
+    """Small subsets of a large dataset that algorithms are fitted on in place of every row.
+    
+    ``weighted_indices``/``weights`` form a lightweight coreset: rows drawn
+    with probability half uniform, half proportional to their squared
+    distance from the mean, weighted by the inverse of that probability, so
+    weighted k-means cost on the coreset approximates the cost on the full
+    data. Algorithms without sample weights use ``stratified_indices``
+    instead, a sample stratified over a grid of the two highest-variance
+    features in which every occupied cell keeps at least one row.
+    """
+    
+    def __init__(self, data: np.ndarray, size: int = 20000, random_state: int = 42):
+        n = len(data)
+        self.n_samples = n
+        self.size = min(size, n)
+        rng = np.random.default_rng(random_state)
+        
+        sq_dist = ((data - data.mean(axis=0)) ** 2).sum(axis=1, dtype=np.float64)
+        total = sq_dist.sum()
+        prob = 0.5 / n + (0.5 * sq_dist / total if total > 0 else 0.5 / n)
+        draws = rng.choice(n, size=self.size, replace=True, p=prob / prob.sum())
+        # Repeated draws of a row become one row with their combined weight
+        self.weighted_indices, counts = np.unique(draws, return_counts=True)
+        self.weights = counts / (self.size * prob[self.weighted_indices])
+        
+        top = np.argsort(data.var(axis=0))[::-1]
+        x, y = data[:, top[0]], data[:, top[min(1, len(top) - 1)]]
+        self.stratified_indices = density_sample_indices(x, y, self.size, seed=random_state)
+    
+    def fit_rows(self, algo_name: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Row indices to fit ``algo_name`` on, and their sample weights (None if unweighted)."""
+        if algo_name in WEIGHTED_ALGORITHMS:
+            return self.weighted_indices, self.weights
+        return self.stratified_indices, None
+    
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'n_samples': int(self.n_samples),
+            'weighted_rows': int(len(self.weighted_indices)),
+            'stratified_rows': int(len(self.stratified_indices))
+        }
+
+def assign_labels(model: Any, fit_data: np.ndarray, fit_labels: np.ndarray, data: np.ndarray,
+                  chunk_rows: int = ASSIGN_CHUNK_ROWS, nearest: Optional[NearestNeighbors] = None) -> np.ndarray:
+    """int32 labels for every row of ``data`` from a model fitted on ``fit_data``.
+    
+    Uses the model's ``predict`` when it has one; otherwise each row takes the
+    label of its nearest fitted row, which keeps non-convex clusters and
+    DBSCAN noise intact. ``nearest`` is an index already fitted on
+    ``fit_data``, built here when omitted. Rows are labelled in chunks to
+    bound memory.
+    """
+    labels = np.empty(len(data), dtype=np.int32)
+    if hasattr(model, 'predict'):
+        nearest = None
+    else:
+        nearest = nearest or NearestNeighbors(n_neighbors=1).fit(fit_data)
+        fit_labels = np.asarray(fit_labels, dtype=np.int32)
+    for start in range(0, len(data), chunk_rows):
+        chunk = data[start:start + chunk_rows]
+        if nearest is None:
+            labels[start:start + chunk_rows] = model.predict(chunk)
+        else:
+            labels[start:start + chunk_rows] = fit_labels[nearest.kneighbors(chunk, return_distance=False)[:, 0]]
+    return labels
+
+# Shared k-nearest-neighbor graph
+NEIGHBOR_GRAPH_K = 10  # Neighbors per row, the row itself excluded
+GRAPH_ALGORITHMS = ('dbscan', 'spectral', 'hierarchical')
+RP_MIN_FEATURES = 20  # 'auto' uses the random-projection index above this many features...
+RP_MIN_SAMPLES = 50000  # ...and this many rows
+RP_COMPONENTS = 12  # Dimensions of the random projection
+RP_CANDIDATES = 4  # Candidates per neighbor re-ranked by exact distance
+
+class NeighborGraph:
+    """Sparse k-nearest-neighbor distance graph (CSR) over one set of rows, built once and shared.
+    
+    Row i holds the distances to its ``n_neighbors`` nearest other rows,
+    sorted. DBSCAN picks eps from it and clusters it with
+    ``metric='precomputed'``, spectral clustering uses it as a
+    ``precomputed_nearest_neighbors`` affinity and connectivity-constrained
+    hierarchical clustering as its connectivity. DBSCAN runs on the
+    symmetrized graph (an edge in either direction links both rows), so it
+    links a point to at least its k nearest rows within eps; in very dense
+    regions that approximates the full radius search.
+    
+    Neighbors come from a KD/ball tree (exact) or, for large
+    high-dimensional data, a random-projection index whose candidates are
+    re-ranked by their exact distance.
+    """
+    
+    def __init__(self, graph: sparse.csr_matrix, n_neighbors: int, method: str):
+        self.graph = graph
+        self.n_neighbors = n_neighbors
+        self.method = method
+        self._symmetric = None
+    
+    @classmethod
+    def build(cls, data: np.ndarray, n_neighbors: int = NEIGHBOR_GRAPH_K, method: str = 'auto',
+              random_state: int = 42) -> 'NeighborGraph':
+        n, d = data.shape
+        k = max(1, min(n_neighbors, n - 1))
+        if method == 'auto':
+            method = 'random_projection' if d > RP_MIN_FEATURES and n > RP_MIN_SAMPLES else 'tree'
+        if method == 'random_projection':
+            distances, indices = cls._random_projection_neighbors(data, k, random_state)
+        else:
+            # Without a query, kneighbors leaves each row out of its own neighbors
+            distances, indices = NearestNeighbors(n_neighbors=k).fit(data).kneighbors()
+        graph = sparse.csr_matrix(
+            (distances.ravel(), indices.ravel().astype(np.int32), np.arange(0, n * k + 1, k)), shape=(n, n)
+        )
+        return cls(graph, k, method)
+    
+    @staticmethod
+    def _random_projection_neighbors(data: np.ndarray, k: int, random_state: int,
+                                     chunk_rows: int = 4096) -> Tuple[np.ndarray, np.ndarray]:
+        n, d = data.shape
+        rng = np.random.default_rng(random_state)
+        projected = data @ (rng.standard_normal((d, RP_COMPONENTS)) / np.sqrt(RP_COMPONENTS))
+        n_candidates = min(n - 1, k * RP_CANDIDATES)
+        candidates = NearestNeighbors(n_neighbors=n_candidates).fit(projected).kneighbors(return_distance=False)
+        
+        distances = np.empty((n, k))
+        indices = np.empty((n, k), dtype=np.int64)
+        for start in range(0, n, chunk_rows):
+            cand = candidates[start:start + chunk_rows]
+            exact = np.sqrt(((data[cand] - data[start:start + chunk_rows, None, :]) ** 2).sum(axis=2))
+            order = np.argsort(exact, axis=1)[:, :k]
+            distances[start:start + chunk_rows] = np.take_along_axis(exact, order, axis=1)
+            indices[start:start + chunk_rows] = np.take_along_axis(cand, order, axis=1)
+        return distances, indices
+    
+    def symmetric(self) -> sparse.csr_matrix:
+        """The graph with every edge in both directions, as density-based clustering needs."""
+        if self._symmetric is None:
+            # Shift distances off zero so edges between duplicate rows survive the sparse maximum
+            shifted = self.graph.copy()
+            shifted.data += 1.0
+            symmetric = shifted.maximum(shifted.T).tocsr()
+            symmetric.data -= 1.0
+            self._symmetric = symmetric
+        return self._symmetric
+    
+    def k_distance(self, k: int) -> np.ndarray:
+        """Distance from every row to its k-th nearest other row."""
+        return self.graph.data.reshape(-1, self.n_neighbors)[:, min(k, self.n_neighbors) - 1]
+    
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'n_rows': int(self.graph.shape[0]),
+            'n_neighbors': int(self.n_neighbors),
+            'method': self.method,
+            'memory_mb': round((self.graph.data.nbytes + self.graph.indices.nbytes
+                                + self.graph.indptr.nbytes) / 1024 ** 2, 1)
+        }
+
+class KSweep:
+    """One KMeans fit per k, shared by the elbow and silhouette methods and the final clustering.
+    
+    Each k in 1..max_k is fitted once; the sweep keeps the fitted model (its
+    centroids and labels), the inertia and, for k >= 2, the silhouette score.
+    With a ``coreset``, each k is fitted on the weighted coreset (inertia is
+    the weighted coreset cost) and every row is then assigned to its nearest
+    centroid.
+    """
+    
+    def __init__(self, data: np.ndarray, max_k: int = 10, random_state: int = 42, n_init: int = 10,
+                 silhouette: Optional[SilhouetteEstimator] = None, coreset: Optional[Coreset] = None):
+        self.data = data
+        self.coreset = coreset
+        # Cannot ask for more clusters than there are samples
+        self.max_k = max(1, min(max_k, len(data)))
+        self.random_state = random_state
+        self.n_init = n_init
+        self.silhouette = silhouette or SilhouetteEstimator(random_state=random_state)
+        self.models: Dict[int, KMeans] = {}
+        self._labels: Dict[int, np.ndarray] = {}
+        self.inertias: Dict[int, float] = {}
+        self.silhouettes: Dict[int, Dict[str, Any]] = {}
+    
+    def run(self, on_k: Optional[Callable[[int, int, Dict[str, float]], None]] = None) -> 'KSweep':
+        """Fit every k not fitted yet; ``on_k(k, max_k, scores)`` is called after each one."""
+        for k in range(1, self.max_k + 1):
+            if k in self.models:
+                continue
+            kmeans = KMeans(n_clusters=k, random_state=self.random_state, n_init=self.n_init)
+            if self.coreset is None:
+                kmeans.fit(self.data)
+                self._labels[k] = kmeans.labels_.astype(np.int32)
+            else:
+                kmeans.fit(self.data[self.coreset.weighted_indices], sample_weight=self.coreset.weights)
+                self._labels[k] = assign_labels(kmeans, None, None, self.data)
+            self.models[k] = kmeans
+            self.inertias[k] = float(kmeans.inertia_)
+            scores = {'inertia': self.inertias[k]}
+            if k >= 2 and len(np.unique(self._labels[k])) >= 2:
+                self.silhouettes[k] = self.silhouette.estimate(self.data, self._labels[k])
+                scores['silhouette'] = self.silhouettes[k]['score']
+            if on_k is not None:
+                on_k(k, self.max_k, scores)
+        return self
+    
+    def model(self, k: int) -> Optional[KMeans]:
+        """The fitted KMeans for ``k`` (labels_, cluster_centers_), or None if k was not swept."""
+        return self.models.get(k)
+    
+    def labels(self, k: int) -> Optional[np.ndarray]:
+        """int32 labels of every row of ``data`` at ``k``, or None if k was not swept."""
+        return self._labels.get(k)
 
 class OptimalClusters:
     """Determine optimal number of clusters."""
     
     @staticmethod
-    def elbow_method(data: np.ndarray, max_k: int = 10) -> Dict[str, Any]:
+    def elbow_method(data: np.ndarray, max_k: int = 10,
+                     on_k: Optional[Callable[[int, int, float], None]] = None,
+                     sweep: Optional[KSweep] = None) -> Dict[str, Any]:
         """Find optimal clusters using elbow method."""
-        K = range(1, max_k + 1)
-        distortions = []
-        
-        for k in K:
-            kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-            kmeans.fit(data)
-            distortions.append(kmeans.inertia_)
+        if sweep is None:
+            sweep = KSweep(data, max_k).run(
+                on_k=None if on_k is None else lambda k, max_k, scores: on_k(k, max_k, scores['inertia'])
+            )
+        K = range(1, sweep.max_k + 1)
+        distortions = [sweep.inertias[k] for k in K]
         
         # Find elbow using kneed
         try:
@@ -136,16 +651,18 @@ class OptimalClusters:
         }
     
     @staticmethod
-    def silhouette_method(data: np.ndarray, max_k: int = 10) -> Dict[str, Any]:
+    def silhouette_method(data: np.ndarray, max_k: int = 10,
+                          on_k: Optional[Callable[[int, int, float], None]] = None,
+                          sweep: Optional[KSweep] = None) -> Dict[str, Any]:
         """Find optimal clusters using silhouette analysis."""
-        K = range(2, max_k + 1)
-        silhouette_scores = []
-        
-        for k in K:
-            kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-            cluster_labels = kmeans.fit_predict(data)
-            silhouette_avg = silhouette_score(data, cluster_labels)
-            silhouette_scores.append(silhouette_avg)
+        if sweep is None:
+            def report(k: int, max_k: int, scores: Dict[str, float]):
+                if on_k is not None and 'silhouette' in scores:
+                    on_k(k, max_k, scores['silhouette'])
+            sweep = KSweep(data, max_k).run(on_k=report)
+        K = range(2, sweep.max_k + 1)
+        estimates = [sweep.silhouettes.get(k) for k in K]
+        silhouette_scores = [e['score'] if e else -1.0 for e in estimates]
         
         optimal_k = K[np.argmax(silhouette_scores)]
         
@@ -153,6 +670,8 @@ class OptimalClusters:
             'optimal_clusters': optimal_k,
             'k_values': list(K),
             'silhouette_scores': silhouette_scores,
+            'confidence_intervals': [e['ci'] if e else None for e in estimates],
+            'exact': all(e['exact'] for e in estimates if e),
             'best_score': max(silhouette_scores)
         }
 
@@ -223,12 +742,439 @@ class ClusteringAlgorithms:
             }
         
         return algorithms
+    
+    def fit_predict(self, algo_name: str, data: np.ndarray, n_clusters: int,
+                    variant: str = 'exact', sample_weight: Optional[np.ndarray] = None,
+                    graph: Optional[NeighborGraph] = None) -> Tuple[Any, np.ndarray]:
+        """Fit one algorithm on ``data``; returns the fitted model and its labels.
+        
+        ``variant`` selects a scalable form chosen by ``ClusteringPlanner``
+        (see ``SCALABLE_VARIANTS``); 'exact' is the algorithm as configured.
+        ``sample_weight`` is only passed to ``WEIGHTED_ALGORITHMS``.
+        ``graph`` is the ``NeighborGraph`` of ``data`` for the graph-based
+        algorithms; it is built here when they need one and none is given.
+        """
+        algo_info = self.get_algorithms()[algo_name]
+        if graph is None and ((algo_name in ('dbscan', 'spectral') and variant == 'exact') or variant == 'connectivity'):
+            graph = NeighborGraph.build(data, method=self.config.neighbor_graph_method,
+                                        random_state=self.config.random_state)
+        fit_input = data
+        if variant == 'connectivity':
+            # Ward merges restricted to k-nearest-neighbor edges: sparse instead of all pairs
+            model = AgglomerativeClustering(n_clusters=n_clusters, connectivity=graph.graph)
+        elif variant == 'birch_seeded':
+            # BIRCH compresses the data into subclusters; only their centroids are merged hierarchically
+            model = Birch(n_clusters=AgglomerativeClustering(n_clusters=n_clusters))
+        elif variant == 'nystroem':
+            model = NystroemSpectralClustering(n_clusters=n_clusters, random_state=self.config.random_state)
+        elif variant == 'bin_seeded':
+            bandwidth = estimate_bandwidth(data, quantile=0.3, n_samples=min(len(data), BANDWIDTH_SAMPLES),
+                                           random_state=self.config.random_state)
+            model = MeanShift(bandwidth=bandwidth if bandwidth > 0 else None, bin_seeding=True)
+        elif algo_info['requires_n_clusters']:
+            if algo_name == 'gaussian_mixture':
+                model = algo_info['algorithm'](n_components=n_clusters, random_state=self.config.random_state)
+            elif algo_name == 'hierarchical' or algo_info['algorithm'] is AgglomerativeClustering:
+                # AgglomerativeClustering does not accept random_state
+                model = algo_info['algorithm'](n_clusters=n_clusters)
+            elif algo_name == 'birch' or algo_info['algorithm'] is Birch:
+                # Birch does not accept random_state
+                model = algo_info['algorithm'](n_clusters=n_clusters)
+            elif algo_name == 'spectral':
+                # Affinity from the shared neighbor graph instead of a dense RBF kernel
+                model = algo_info['algorithm'](n_clusters=n_clusters, affinity='precomputed_nearest_neighbors',
+                                               n_neighbors=graph.n_neighbors, random_state=self.config.random_state)
+                fit_input = graph.graph
+            else:
+                # Safe default for algorithms that accept random_state (e.g., KMeans, MiniBatchKMeans, SpectralClustering)
+                model = algo_info['algorithm'](n_clusters=n_clusters, random_state=self.config.random_state)
+        elif algo_name == 'dbscan':
+            # Auto-determine eps using k-distance (3rd nearest other row), then cluster the same graph
+            eps = np.percentile(graph.k_distance(3), 90)
+            
+            model = algo_info['algorithm'](eps=eps, min_samples=5, metric='precomputed')
+            fit_input = graph.symmetric()
+        else:
+            model = algo_info['algorithm']()
+        
+        if sample_weight is not None and algo_name in WEIGHTED_ALGORITHMS:
+            labels = model.fit_predict(fit_input, sample_weight=sample_weight)
+        else:
+            labels = model.fit_predict(fit_input)
+        return model, labels
+
+class NystroemSpectralClustering(ClusterMixin, BaseEstimator):
+    """Spectral clustering on a Nystroem approximation of the RBF affinity.
+    
+    The affinity matrix is approximated as ``F @ F.T`` with ``F`` the
+    Nystroem features over ``n_components`` landmarks, so the normalized
+    affinity's leading eigenvectors come from a thin SVD of the degree-scaled
+    ``F``: O(n * n_components) memory instead of O(n^2). Labels are KMeans
+    on the row-normalized embedding, as in ``SpectralClustering``.
+    """
+    
+    def __init__(self, n_clusters: int = 8, n_components: int = 300, gamma: float = 1.0,
+                 random_state: Optional[int] = None):
+        self.n_clusters = n_clusters
+        self.n_components = n_components
+        self.gamma = gamma
+        self.random_state = random_state
+    
+    def fit(self, X: np.ndarray, y=None) -> 'NystroemSpectralClustering':
+        features = Nystroem(kernel='rbf', gamma=self.gamma, n_components=min(self.n_components, len(X)),
+                            random_state=self.random_state).fit_transform(X)
+        degrees = features @ features.sum(axis=0)
+        features /= np.sqrt(np.maximum(degrees, 1e-12))[:, None]
+        embedding = np.linalg.svd(features, full_matrices=False)[0][:, :self.n_clusters]
+        embedding /= np.maximum(np.linalg.norm(embedding, axis=1, keepdims=True), 1e-12)
+        self.labels_ = KMeans(n_clusters=self.n_clusters, n_init=10,
+                              random_state=self.random_state).fit_predict(embedding)
+        return self
+
+# Smallest sample an algorithm is fitted on; below it the algorithm is skipped
+MIN_FIT_SAMPLES = 200
+
+# Planner settings
+PLANNER_OPS_PER_SECOND = 2e8  # Rough throughput that turns operation counts into seconds
+CONNECTIVITY_MAX_SAMPLES = 50000  # Above this, hierarchical clustering is BIRCH-seeded instead
+NYSTROEM_COMPONENTS = 300  # Landmarks of the approximate spectral affinity
+BANDWIDTH_SAMPLES = 1000  # Rows used to estimate the Mean Shift bandwidth
+PARALLEL_MIN_SECONDS = 10.0  # Planned fit time below which algorithms run in-process: each spawned worker takes seconds to start
+
+# Scalable variants the planner switches to when the exact algorithm does not fit
+SCALABLE_VARIANTS = {
+    'hierarchical': ('connectivity', 'birch_seeded'),
+    'spectral': ('nystroem',),
+    'meanshift': ('bin_seeded',)
+}
+
+VARIANT_STRATEGIES = {
+    'exact': 'Algorithm as configured',
+    'connectivity': f'Ward linkage constrained to a {NEIGHBOR_GRAPH_K}-nearest-neighbor graph',
+    'birch_seeded': 'BIRCH subclusters merged by Ward linkage',
+    'nystroem': f'Spectral embedding of a {NYSTROEM_COMPONENTS}-landmark Nystroem affinity',
+    'bin_seeded': f'Bin-seeded Mean Shift, bandwidth estimated on {BANDWIDTH_SAMPLES} rows'
+}
+
+COMPLEXITY = {
+    ('kmeans', 'exact'): 'O(n·k·d)',
+    ('mini_batch_kmeans', 'exact'): 'O(n·k·d)',
+    ('birch', 'exact'): 'O(n·d)',
+    ('gaussian_mixture', 'exact'): 'O(n·k·d²)',
+    ('dbscan', 'exact'): 'O(n·log n·d)',
+    ('spectral', 'exact'): 'O(n·log n·d)',
+    ('hierarchical', 'exact'): 'O(n²)',
+    ('hierarchical', 'connectivity'): 'O(n·log n)',
+    ('hierarchical', 'birch_seeded'): 'O(n·d)',
+    ('spectral', 'nystroem'): 'O(n·m²)',
+    ('meanshift', 'exact'): 'O(n²·d)',
+    ('meanshift', 'bin_seeded'): 'O(n·d)'
+}
+
+def estimate_algorithm_memory(algo_name: str, n_samples: int, n_features: int, n_clusters: int,
+                              variant: str = 'exact') -> float:
+    """Rough peak working memory (bytes) of fitting an algorithm on float64 data."""
+    n, d, k = float(n_samples), float(n_features), float(max(n_clusters, 1))
+    data = n * d * 8
+    if variant == 'connectivity':
+        # kNN graph (indices and distances) and the merge tree
+        return data + n * NEIGHBOR_GRAPH_K * 16 * 3
+    if variant == 'birch_seeded':
+        return data * 3 + n * k * 8
+    if variant == 'nystroem':
+        # Features, their SVD and the embedding
+        m = min(n, NYSTROEM_COMPONENTS)
+        return data + n * m * 8 * 3 + m * m * 8
+    if variant == 'bin_seeded':
+        s = min(n, BANDWIDTH_SAMPLES)
+        return data * 2 + s * s * 16
+    if algo_name in ('kmeans', 'mini_batch_kmeans', 'birch'):
+        return data * 2 + n * k * 8
+    if algo_name == 'gaussian_mixture':
+        return data + 3 * n * k * 8 + k * d * d * 8
+    if algo_name == 'dbscan':
+        # Neighbor graph plus DBSCAN's neighborhood lists over it
+        return data + n * NEIGHBOR_GRAPH_K * 12 * 3
+    if algo_name == 'hierarchical':
+        # Condensed pairwise distance matrix for the linkage
+        return data + n * (n - 1) / 2 * 8
+    if algo_name == 'spectral':
+        # Neighbor graph, its symmetrized affinity and Laplacian, and the eigenvectors
+        return data + n * NEIGHBOR_GRAPH_K * 12 * 4 + n * (k + 1) * 8 * 4
+    if algo_name == 'meanshift':
+        # Bandwidth estimation queries neighbors over a large share of the data
+        return data + 0.3 * n * n * 16
+    return data * 4
+
+def estimate_algorithm_operations(algo_name: str, n_samples: int, n_features: int, n_clusters: int,
+                                  variant: str = 'exact') -> float:
+    """Rough floating-point operation count of fitting an algorithm (order of magnitude only)."""
+    n, d, k = float(n_samples), float(n_features), float(max(n_clusters, 1))
+    log_n = np.log2(max(n, 2.0))
+    if variant == 'connectivity':
+        return n * NEIGHBOR_GRAPH_K * (d + 10) * log_n * 10
+    if variant == 'birch_seeded':
+        return n * d * log_n * 20 + n * k * d
+    if variant == 'nystroem':
+        m = min(n, NYSTROEM_COMPONENTS)
+        return n * m * (d + m) + n * k * k * 300
+    if variant == 'bin_seeded':
+        s = min(n, BANDWIDTH_SAMPLES)
+        # Seeds are the occupied bins, a few hundred on typical data; each iteration averages its window
+        return s * s * d + 300 * 0.3 * n * d * 10
+    if algo_name == 'kmeans':
+        return n * k * d * 300
+    if algo_name == 'mini_batch_kmeans':
+        return n * k * d * 10
+    if algo_name == 'birch':
+        return n * d * log_n * 20
+    if algo_name == 'gaussian_mixture':
+        return n * k * d * d * 100
+    if algo_name == 'dbscan':
+        return n * log_n * d * 50
+    if algo_name == 'hierarchical':
+        return n * n * (d + 10)
+    if algo_name == 'spectral':
+        # Neighbor graph plus iterative sparse eigensolver passes
+        return n * NEIGHBOR_GRAPH_K * (d * log_n + 1000 * k)
+    if algo_name == 'meanshift':
+        # One seed per row, each iterating over its neighborhood
+        return n * n * d * 5
+    return n * d * 100
+
+def max_fit_samples(algo_name: str, n_samples: int, n_features: int, n_clusters: int, budget_bytes: float,
+                    variant: str = 'exact', budget_seconds: float = float('inf')) -> int:
+    """Largest sample size whose estimated memory and time fit the budgets (n_samples if everything fits)."""
+    def fits(size: int) -> bool:
+        return (estimate_algorithm_memory(algo_name, size, n_features, n_clusters, variant) <= budget_bytes
+                and estimate_algorithm_operations(algo_name, size, n_features, n_clusters, variant)
+                / PLANNER_OPS_PER_SECOND <= budget_seconds)
+    
+    low, high = 0, n_samples
+    while low < high:
+        mid = (low + high + 1) // 2
+        if fits(mid):
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+class ClusteringPlanner:
+    """Size-aware plan: which form of each algorithm to run on an (n, d) dataset, and at what cost.
+    
+    An algorithm runs exactly as configured while its estimated memory fits
+    ``algorithm_memory_mb`` and its estimated time fits ``algorithm_timeout``.
+    Past either limit, the O(n^2) algorithms switch to a scalable variant:
+    connectivity-constrained hierarchical clustering (BIRCH-seeded above
+    ``CONNECTIVITY_MAX_SAMPLES`` rows), Nystroem-approximated spectral
+    clustering and bin-seeded Mean Shift. If even the chosen variant exceeds
+    either limit, it is fitted on a sample (``fit_samples``) that fits both
+    and the remaining rows are assigned afterwards.
+    """
+    
+    def __init__(self, config: ClusteringConfig):
+        self.config = config
+    
+    def _cost(self, algo_name: str, n: int, d: int, k: int, variant: str) -> Tuple[float, float]:
+        memory = float(estimate_algorithm_memory(algo_name, n, d, k, variant))
+        seconds = float(estimate_algorithm_operations(algo_name, n, d, k, variant)) / PLANNER_OPS_PER_SECOND
+        return memory, seconds
+    
+    def plan_algorithm(self, algo_name: str, n_samples: int, n_features: int, n_clusters: int) -> Dict[str, Any]:
+        """Plan entry for one algorithm: variant, estimated cost and fit sample size."""
+        budget = self.config.algorithm_memory_mb * 1024 ** 2
+        variant = 'exact'
+        memory, seconds = self._cost(algo_name, n_samples, n_features, n_clusters, variant)
+        reason = None
+        
+        over_memory, over_time = memory > budget, seconds > self.config.algorithm_timeout
+        if algo_name in SCALABLE_VARIANTS and (over_memory or over_time):
+            candidates = SCALABLE_VARIANTS[algo_name]
+            variant = candidates[0] if len(candidates) == 1 or n_samples <= CONNECTIVITY_MAX_SAMPLES else candidates[1]
+            reason = (f"Exact form estimated at {memory / 1024 ** 2:.0f} MB and {seconds:.0f}s "
+                      f"for {n_samples} rows exceeds the "
+                      f"{'memory budget' if over_memory else 'time limit'}")
+            memory, seconds = self._cost(algo_name, n_samples, n_features, n_clusters, variant)
+        
+        memory_fit = max_fit_samples(algo_name, n_samples, n_features, n_clusters, budget, variant)
+        time_fit = max_fit_samples(algo_name, n_samples, n_features, n_clusters, float('inf'), variant,
+                                   self.config.algorithm_timeout)
+        fit_samples = min(memory_fit, time_fit)
+        limits = ' and '.join(name for name, size in (('memory budget', memory_fit), ('time limit', time_fit))
+                              if size < n_samples)
+        min_samples = min(MIN_FIT_SAMPLES, n_samples)
+        skipped = fit_samples < min_samples
+        if skipped:
+            exceeded = []
+            if memory_fit < min_samples:
+                exceeded.append(f"{memory / 1024 ** 2:.1f} MB exceeds the {self.config.algorithm_memory_mb:.0f} MB budget")
+            if time_fit < min_samples:
+                exceeded.append(f"{seconds:.1f}s exceeds the {self.config.algorithm_timeout:g}s time limit")
+            reason = f"Estimated {' and '.join(exceeded)} even on a sample"
+        elif fit_samples < n_samples:
+            memory, seconds = self._cost(algo_name, fit_samples, n_features, n_clusters, variant)
+            reason = f"{reason + '; ' if reason else ''}fitted on {fit_samples} rows to stay within the {limits}"
+        
+        return {
+            'variant': variant,
+            'strategy': VARIANT_STRATEGIES[variant],
+            'complexity': COMPLEXITY.get((algo_name, variant), 'O(n·d)'),
+            'estimated_memory_mb': round(memory / 1024 ** 2, 1),
+            'estimated_seconds': round(seconds, 2),
+            'fit_samples': fit_samples,
+            'downsampled': not skipped and fit_samples < n_samples,
+            'skipped': skipped,
+            'reason': reason
+        }
+    
+    def plan_silhouette(self, n_samples: int, n_features: int) -> Dict[str, Any]:
+        """Cost of one silhouette evaluation (exact or stratified-sample estimate)."""
+        estimator = SilhouetteEstimator.from_config(self.config)
+        exact = estimator.uses_exact(n_samples)
+        n_used = n_samples if exact else min(n_samples, estimator.sample_size)
+        return {
+            'exact': exact,
+            'n_used': n_used,
+            'complexity': 'O(n²·d)' if exact else 'O(s²·d)',
+            # scikit-learn computes pairwise distances in chunks of at most ~1 GB
+            'estimated_memory_mb': round(min(n_used * n_used * 8, 1024 ** 3) / 1024 ** 2, 1),
+            'estimated_seconds': round(n_used * n_used * (n_features + 2) / PLANNER_OPS_PER_SECOND, 2)
+        }
+    
+    def plan(self, algo_names: List[str], n_samples: int, n_features: int, n_clusters: int) -> Dict[str, Any]:
+        """Plan for every algorithm plus silhouette scoring on an ``n_samples`` x ``n_features`` dataset."""
+        algorithms = {
+            algo_name: self.plan_algorithm(algo_name, n_samples, n_features, n_clusters)
+            for algo_name in algo_names
+        }
+        return {
+            'n_samples': int(n_samples),
+            'n_features': int(n_features),
+            'n_clusters': int(n_clusters),
+            'algorithms': algorithms,
+            'silhouette': self.plan_silhouette(n_samples, n_features),
+            'estimated_seconds': round(sum(entry['estimated_seconds'] for entry in algorithms.values()), 2)
+        }
+
+def run_clustering_algorithm(algo_name: str, data: np.ndarray, n_clusters: int, config: ClusteringConfig,
+                             silhouette: Optional[SilhouetteEstimator] = None,
+                             plan: Optional[Dict[str, Any]] = None,
+                             coreset: Optional[Coreset] = None,
+                             graph: Optional[NeighborGraph] = None) -> Dict[str, Any]:
+    """Fit one algorithm as planned and evaluate it on every row.
+    
+    With a ``coreset``, the algorithm is fitted on its coreset rows only.
+    ``graph`` is the shared ``NeighborGraph`` of the rows graph-based
+    algorithms are fitted on (the stratified coreset rows, or every row).
+    ``plan`` is the algorithm's ``ClusteringPlanner`` entry for that many
+    rows (planned here when omitted); when even the planned variant would
+    exceed ``config.algorithm_memory_mb`` or ``config.algorithm_timeout``, it
+    is fitted on a random sample of them. Rows not fitted on are assigned by ``assign_labels``. Returns the
+    result entry with int32 ``labels`` for the full data.
+    """
+    algorithms = ClusteringAlgorithms(config)
+    if coreset is not None:
+        fit_rows, fit_weights = coreset.fit_rows(algo_name)
+    else:
+        fit_rows, fit_weights = np.arange(len(data)), None
+    n_samples, n_features = len(fit_rows), data.shape[1]
+    plan = plan or ClusteringPlanner(config).plan_algorithm(algo_name, n_samples, n_features, n_clusters)
+    fit_size = plan['fit_samples']
+    
+    result = {
+        'name': algorithms.get_algorithms()[algo_name]['name'],
+        'variant': plan['variant'],
+        'memory_estimate_mb': plan['estimated_memory_mb'],
+        'fit_samples': fit_size
+    }
+    if plan['skipped']:
+        result['skipped'] = True
+        result['error'] = plan['reason']
+        return result
+    
+    started = time.time()
+    if fit_size < n_samples:
+        rng = np.random.default_rng(config.random_state)
+        keep = np.sort(rng.choice(n_samples, size=fit_size, replace=False))
+        fit_rows = fit_rows[keep]
+        fit_weights = None if fit_weights is None else fit_weights[keep]
+        # The shared graph covers rows this fit no longer uses
+        graph = None
+        result['downsampled'] = True
+    result['fit_samples'] = int(len(fit_rows))
+    if len(fit_rows) < len(data):
+        fit_data = data[fit_rows]
+        model, fit_labels = algorithms.fit_predict(algo_name, fit_data, n_clusters, plan['variant'], fit_weights,
+                                                   graph)
+        labels = assign_labels(model, fit_data, fit_labels, data)
+    else:
+        _, labels = algorithms.fit_predict(algo_name, data, n_clusters, plan['variant'], graph=graph)
+        labels = np.asarray(labels, dtype=np.int32)
+    
+    result.update({
+        'labels': labels,
+        'n_clusters': len(np.unique(labels[labels != -1])),
+        'evaluation': ClusterEvaluator.evaluate_clustering(data, labels, silhouette),
+        'elapsed_s': round(time.time() - started, 2)
+    })
+    return result
+
+def _share_array(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, Tuple[str, Tuple[int, ...], str]]:
+    """Copy ``array`` into a new shared memory block; returns the block and the spec children attach with."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+def _attach_array(spec: Tuple[str, Tuple[int, ...], str]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+def _close_shared(shm: shared_memory.SharedMemory):
+    try:
+        shm.close()
+    except BufferError:
+        # A fitted model still references the buffer; it is unmapped when the process exits
+        pass
+
+def _algorithm_process(algo_name: str, data_spec: Tuple, labels_spec: Tuple, row: int, n_clusters: int,
+                       config: ClusteringConfig, silhouette: SilhouetteEstimator, plan: Dict[str, Any],
+                       coreset: Optional[Coreset], graph_spec: Optional[Tuple], conn):
+    """Child process entry: read the shared data, write labels into the shared row, send the rest."""
+    data_shm, data = _attach_array(data_spec)
+    labels_shm, labels_out = _attach_array(labels_spec)
+    graph_shms, graph = [], None
+    try:
+        if graph_spec is not None:
+            array_specs, shape, n_neighbors, method = graph_spec
+            for spec in array_specs:
+                graph_shms.append(_attach_array(spec))
+            arrays = tuple(array for _, array in graph_shms)
+            graph = NeighborGraph(sparse.csr_matrix(arrays, shape=shape, copy=False), n_neighbors, method)
+        # Imports are done: the algorithm's timeout starts now
+        conn.send({'started': True})
+        result = run_clustering_algorithm(algo_name, data, n_clusters, config, silhouette, plan, coreset, graph)
+        labels = result.pop('labels', None)
+        if labels is not None:
+            labels_out[row] = labels
+            result['has_labels'] = True
+        conn.send(result)
+    except Exception as e:
+        conn.send({'error': str(e)})
+    finally:
+        del data, labels_out, graph
+        data_shm.close()
+        labels_shm.close()
+        for shm, _ in graph_shms:
+            _close_shared(shm)
+        conn.close()
 
 class ClusterEvaluator:
     """Evaluate clustering results."""
     
     @staticmethod
-    def evaluate_clustering(data: np.ndarray, labels: np.ndarray) -> Dict[str, float]:
+    def evaluate_clustering(data: np.ndarray, labels: np.ndarray,
+                            silhouette: Optional[SilhouetteEstimator] = None) -> Dict[str, float]:
         """Evaluate clustering performance."""
         metrics = {}
         
@@ -246,7 +1192,10 @@ class ClusterEvaluator:
             return {'error': 'Less than 2 clusters found'}
         
         try:
-            metrics['silhouette_score'] = float(silhouette_score(valid_data, valid_labels))
+            estimate = (silhouette or SilhouetteEstimator()).estimate(valid_data, valid_labels)
+            metrics['silhouette_score'] = estimate['score']
+            metrics['silhouette_ci'] = estimate['ci']
+            metrics['silhouette_exact'] = estimate['exact']
         except:
             metrics['silhouette_score'] = 0.0
         
@@ -265,6 +1214,8 @@ class ClusterEvaluator:
         
         return metrics
 
+SCORING_REFERENCE_ROWS = 20000  # Labelled processed rows persisted to assign new rows to clusters
+
 class ClusteringWorkflow:
     """Main workflow orchestrator for clustering analysis."""
     
@@ -273,8 +1224,29 @@ class ClusteringWorkflow:
         self.preprocessor = DataPreprocessor(self.config)
         self.algorithms = ClusteringAlgorithms(self.config)
         self.evaluator = ClusterEvaluator()
+        self.silhouette = SilhouetteEstimator.from_config(self.config)
         self.results = {}
         self.processed_data = None
+        self.k_sweep = None  # KSweep over processed_data, shared by find_optimal_clusters and perform_clustering
+        self.plan = None  # ClusteringPlanner output of the last perform_clustering
+        self.coreset = None  # Coreset of processed_data when fitting in coreset mode
+        self.neighbor_graph = None  # NeighborGraph shared by DBSCAN, spectral and connectivity hierarchical
+        self.projection = None  # (coords, source) 2-D view of processed_data for plots
+        self.reference_indices = None  # Rows of processed_data kept, with their labels, to assign new rows
+        self.reference = None  # Restored reference rows and labels (see restore_serving_state)
+        self.reference_labels = None
+        self.reference_index = None
+        self.assignment_algorithm = None
+        self.progress_callback = None  # Optional (event, progress, data) hook for live progress
+    
+    def _report(self, event: str, progress: float, data: Optional[Dict[str, Any]] = None):
+        """Forward a progress event; reporting failures never interrupt clustering."""
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback(event, progress, data)
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
         
     def validate_data(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Validate data for clustering analysis."""
@@ -319,12 +1291,20 @@ class ClusteringWorkflow:
         try:
             processed_data, steps = self.preprocessor.preprocess_data(data)
             self.processed_data = processed_data
+            self.k_sweep = None
+            self.neighbor_graph = None
+            self.projection = None
+            self.reference_indices = None
+            self.coreset = self._build_coreset(processed_data)
+            if self.coreset is not None:
+                steps.append(f"Built a {self.coreset.size}-row coreset; every row is assigned after fitting")
             
             return {
                 'success': True,
                 'preprocessing_steps': steps,
                 'processed_shape': processed_data.shape,
-                'original_shape': data.shape
+                'original_shape': data.shape,
+                'fit_mode': 'coreset' if self.coreset is not None else 'full'
             }
         except Exception as e:
             return {
@@ -332,6 +1312,14 @@ class ClusteringWorkflow:
                 'error': str(e)
             }
     
+    def _build_coreset(self, data: np.ndarray) -> Optional[Coreset]:
+        mode = self.config.fit_mode
+        if mode == 'full' or len(data) <= self.config.coreset_size:
+            return None
+        if mode == 'auto' and len(data) <= self.config.coreset_threshold:
+            return None
+        return Coreset(data, self.config.coreset_size, self.config.random_state)
+    
     def find_optimal_clusters(self) -> Dict[str, Any]:
         """Find optimal number of clusters."""
         try:
@@ -341,8 +1329,17 @@ class ClusteringWorkflow:
                     'error': 'No preprocessed data available'
                 }
             
-            elbow_result = OptimalClusters.elbow_method(self.processed_data, self.config.max_clusters)
-            silhouette_result = OptimalClusters.silhouette_method(self.processed_data, self.config.max_clusters)
+            # One KMeans fit per k serves both methods (and later the final K-Means result)
+            if self.k_sweep is None or self.k_sweep.data is not self.processed_data:
+                self.k_sweep = KSweep(self.processed_data, self.config.max_clusters, self.config.random_state,
+                                      silhouette=self.silhouette, coreset=self.coreset)
+            self.k_sweep.run(
+                on_k=lambda k, max_k, scores: self._report('k_evaluated', k / max_k, {
+                    'method': 'sweep', 'k': k, 'max_k': max_k, **scores
+                })
+            )
+            elbow_result = OptimalClusters.elbow_method(self.processed_data, sweep=self.k_sweep)
+            silhouette_result = OptimalClusters.silhouette_method(self.processed_data, sweep=self.k_sweep)
             
             return {
                 'success': True,
@@ -376,55 +1373,60 @@ class ClusteringWorkflow:
                 else:
                     n_clusters = 3  # Default fallback
             
-            for algo_name, algo_info in algorithms.items():
-                try:
-                    if algo_info['requires_n_clusters']:
-                        if algo_name == 'gaussian_mixture':
-                            model = algo_info['algorithm'](n_components=n_clusters, random_state=self.config.random_state)
-                            labels = model.fit_predict(self.processed_data)
-                        elif algo_name == 'hierarchical' or algo_info['algorithm'] is AgglomerativeClustering:
-                            # AgglomerativeClustering does not accept random_state
-                            model = algo_info['algorithm'](n_clusters=n_clusters)
-                            labels = model.fit_predict(self.processed_data)
-                        elif algo_name == 'birch' or algo_info['algorithm'] is Birch:
-                            # Birch does not accept random_state
-                            model = algo_info['algorithm'](n_clusters=n_clusters)
-                            labels = model.fit_predict(self.processed_data)
-                        else:
-                            # Safe default for algorithms that accept random_state (e.g., KMeans, MiniBatchKMeans, SpectralClustering)
-                            model = algo_info['algorithm'](n_clusters=n_clusters, random_state=self.config.random_state)
-                            labels = model.fit_predict(self.processed_data)
-                    else:
-                        if algo_name == 'dbscan':
-                            # Auto-determine eps using k-distance
-                            k = min(4, len(self.processed_data) - 1)
-                            nbrs = NearestNeighbors(n_neighbors=k).fit(self.processed_data)
-                            distances, indices = nbrs.kneighbors(self.processed_data)
-                            distances = np.sort(distances[:, k-1], axis=0)
-                            eps = np.percentile(distances, 90)
-                            
-                            model = algo_info['algorithm'](eps=eps, min_samples=5)
-                        else:
-                            model = algo_info['algorithm']()
-                        
-                        labels = model.fit_predict(self.processed_data)
-                    
-                    # Evaluate clustering
-                    evaluation = self.evaluator.evaluate_clustering(self.processed_data, labels)
-                    
-                    clustering_results[algo_name] = {
-                        'name': algo_info['name'],
-                        'labels': labels.tolist(),
-                        'n_clusters': len(np.unique(labels[labels != -1])),
-                        'evaluation': evaluation
-                    }
-                    
-                except Exception as algo_error:
-                    logger.warning(f"Failed to run {algo_name}: {str(algo_error)}")
-                    clustering_results[algo_name] = {
-                        'name': algo_info['name'],
-                        'error': str(algo_error)
-                    }
+            # Variant and cost of every algorithm for the number of rows it is fitted on
+            n_fit = self.coreset.size if self.coreset is not None else len(self.processed_data)
+            self.plan = ClusteringPlanner(self.config).plan(list(algorithms), n_fit, self.processed_data.shape[1],
+                                                            n_clusters)
+            self.plan['fit_mode'] = 'coreset' if self.coreset is not None else 'full'
+            if self.coreset is not None:
+                self.plan['coreset'] = self.coreset.describe()
+            algorithm_plans = self.plan['algorithms']
+            graph = self._shared_neighbor_graph(algorithm_plans)
+            if graph is not None:
+                self.plan['neighbor_graph'] = graph.describe()
+            self._report('planned', 0.0, {'plan': self.plan})
+            
+            n_algorithms = len(algorithms)
+            completed = 0
+            
+            def record(algo_name: str, result: Dict[str, Any]):
+                nonlocal completed
+                completed += 1
+                result = {'name': algorithms[algo_name]['name'], **result}
+                if 'error' in result:
+                    logger.warning(f"Failed to run {algo_name}: {result['error']}")
+                clustering_results[algo_name] = result
+                
+                # Partial result: the algorithm's evaluation (labels stay server-side until the end)
+                partial = {k: v for k, v in result.items() if k != 'labels'}
+                self._report('algorithm_complete', completed / n_algorithms, {
+                    'algorithm': algo_name, 'index': completed, 'n_algorithms': n_algorithms, **partial
+                })
+            
+            def started(algo_name: str):
+                self._report('algorithm_started', completed / n_algorithms, {
+                    'algorithm': algo_name, 'index': completed + 1, 'n_algorithms': n_algorithms
+                })
+            
+            to_fit = list(algorithms)
+            swept = self.k_sweep.labels(n_clusters) if self.k_sweep is not None else None
+            if 'kmeans' in algorithms and swept is not None:
+                # Already fitted at this k during the sweep
+                started('kmeans')
+                labels = swept
+                record('kmeans', {
+                    'variant': 'exact',
+                    'labels': labels,
+                    'n_clusters': len(np.unique(labels)),
+                    'evaluation': self.evaluator.evaluate_clustering(self.processed_data, labels, self.silhouette)
+                })
+                to_fit.remove('kmeans')
+            
+            for algo_name, result in self._run_algorithms(to_fit, n_clusters, algorithm_plans, graph, started):
+                record(algo_name, result)
+            
+            # Report order aside, keep results in the configured algorithm order
+            clustering_results = {name: clustering_results[name] for name in algorithms}
             
             # Find best algorithm based on silhouette score
             best_algorithm = None
@@ -442,7 +1444,8 @@ class ClusteringWorkflow:
                 'best_algorithm': best_algorithm,
                 'best_score': best_score,
                 'processed_data': self.processed_data,
-                'n_clusters_used': n_clusters
+                'n_clusters_used': n_clusters,
+                'plan': self.plan
             }
             
             return {
@@ -450,6 +1453,7 @@ class ClusteringWorkflow:
                 'clustering_results': clustering_results,
                 'best_algorithm': best_algorithm,
                 'best_score': best_score,
+                'plan': self.plan,
                 'summary': {
                     'algorithms_run': len(clustering_results),
                     'successful_algorithms': len([r for r in clustering_results.values() if 'error' not in r]),
@@ -465,6 +1469,274 @@ class ClusteringWorkflow:
                 'error': str(e)
             }
     
+    def _shared_neighbor_graph(self, plans: Dict[str, Dict[str, Any]]) -> Optional[NeighborGraph]:
+        """The neighbor graph of the rows graph-based algorithms fit on, built once if any planned fit uses it."""
+        uses_graph = any(
+            algo_name in GRAPH_ALGORITHMS and not plan['skipped'] and not plan['downsampled']
+            and (algo_name != 'hierarchical' or plan['variant'] == 'connectivity')
+            and (algo_name != 'spectral' or plan['variant'] == 'exact')
+            for algo_name, plan in plans.items()
+        )
+        if uses_graph and self.neighbor_graph is None:
+            rows = self.processed_data
+            if self.coreset is not None:
+                rows = rows[self.coreset.stratified_indices]
+            self.neighbor_graph = NeighborGraph.build(rows, method=self.config.neighbor_graph_method,
+                                                      random_state=self.config.random_state)
+        return self.neighbor_graph if uses_graph else None
+    
+    def _n_workers(self, algo_names: List[str], plans: Dict[str, Dict[str, Any]]) -> int:
+        """Worker processes for ``algo_names``; 1 means in-process.
+        
+        Small jobs stay in-process: below ``PARALLEL_MIN_SECONDS`` of planned
+        fitting, process start-up would cost more than running in parallel saves.
+        """
+        n_jobs = self.config.n_jobs
+        if n_jobs is None or n_jobs == 0:
+            n_jobs = 1
+        elif n_jobs < 0:
+            n_jobs = max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+        planned_seconds = sum(
+            plans[algo_name]['estimated_seconds'] for algo_name in algo_names
+            if algo_name in plans and not plans[algo_name]['skipped']
+        )
+        if planned_seconds < PARALLEL_MIN_SECONDS:
+            return 1
+        return max(1, min(n_jobs, len(algo_names)))
+    
+    def _run_algorithms(self, algo_names: List[str], n_clusters: int, plans: Dict[str, Dict[str, Any]],
+                        graph: Optional[NeighborGraph], on_start: Callable[[str], None]):
+        """Yield (algo_name, result) for each algorithm as it finishes.
+        
+        With more than one worker (see ``_n_workers``), each algorithm runs in
+        its own spawned process reading ``processed_data`` and the neighbor
+        graph from shared memory and writing its labels into a shared int32
+        matrix, so none of them is copied per process.
+        A process still running after ``algorithm_timeout`` is stopped and
+        reported as timed out; the other algorithms carry on. In-process runs
+        are small by construction and are not timed.
+        """
+        n_workers = self._n_workers(algo_names, plans)
+        if n_workers == 1:
+            for algo_name in algo_names:
+                on_start(algo_name)
+                try:
+                    yield algo_name, run_clustering_algorithm(
+                        algo_name, self.processed_data, n_clusters, self.config, self.silhouette,
+                        plans.get(algo_name), self.coreset, graph
+                    )
+                except Exception as algo_error:
+                    yield algo_name, {'error': str(algo_error)}
+            return
+        
+        data = np.ascontiguousarray(self.processed_data)
+        context = multiprocessing.get_context('spawn')
+        data_shm, data_spec = _share_array(data)
+        labels_shm = shared_memory.SharedMemory(create=True, size=max(len(algo_names) * len(data) * 4, 1))
+        graph_shms, graph_spec = [], None
+        running = {}  # row -> (algo_name, process, receiver, started_at); started_at is None until imports finish
+        try:
+            labels = np.ndarray((len(algo_names), len(data)), dtype=np.int32, buffer=labels_shm.buf)
+            labels_spec = (labels_shm.name, labels.shape, labels.dtype.str)
+            if graph is not None:
+                array_specs = []
+                for array in (graph.graph.data, graph.graph.indices, graph.graph.indptr):
+                    shm, spec = _share_array(array)
+                    graph_shms.append(shm)
+                    array_specs.append(spec)
+                graph_spec = (tuple(array_specs), graph.graph.shape, graph.n_neighbors, graph.method)
+            
+            pending = list(enumerate(algo_names))
+            while pending or running:
+                while pending and len(running) < n_workers:
+                    row, algo_name = pending.pop(0)
+                    receiver, sender = context.Pipe(duplex=False)
+                    process = context.Process(
+                        target=_algorithm_process,
+                        args=(algo_name, data_spec, labels_spec, row, n_clusters, self.config, self.silhouette,
+                              plans.get(algo_name), self.coreset,
+                              graph_spec if algo_name in GRAPH_ALGORITHMS else None, sender),
+                        name=f"clustering-{algo_name}", daemon=True
+                    )
+                    process.start()
+                    sender.close()
+                    running[row] = (algo_name, process, receiver, None)
+                    on_start(algo_name)
+                
+                multiprocessing.connection.wait([entry[2] for entry in running.values()], timeout=1.0)
+                for row, (algo_name, process, receiver, started_at) in list(running.items()):
+                    result = None
+                    if receiver.poll():
+                        try:
+                            result = receiver.recv()
+                        except EOFError:
+                            # Died without a result, e.g. killed for memory
+                            process.join(5)
+                            result = {'error': f"Process exited with code {process.exitcode}"}
+                        if result.get('started'):
+                            # Process start-up (interpreter and imports) does not count against the timeout
+                            running[row] = (algo_name, process, receiver, time.time())
+                            continue
+                    elif started_at is not None and time.time() - started_at > self.config.algorithm_timeout:
+                        result = {'error': f"Timed out after {self.config.algorithm_timeout:.0f}s", 'timed_out': True}
+                    if result is None:
+                        continue
+                    
+                    self._stop_process(process)
+                    receiver.close()
+                    del running[row]
+                    if result.pop('has_labels', False):
+                        result['labels'] = labels[row].copy()
+                    yield algo_name, result
+            del labels
+        finally:
+            for algo_name, process, receiver, _ in running.values():
+                self._stop_process(process)
+                receiver.close()
+            data_shm.close()
+            data_shm.unlink()
+            labels_shm.close()
+            labels_shm.unlink()
+            for shm in graph_shms:
+                shm.close()
+                shm.unlink()
+    
+    @staticmethod
+    def _stop_process(process: multiprocessing.Process):
+        process.join(1)
+        if process.is_alive():
+            process.terminate()
+            process.join(10)
+        if process.is_alive():
+            process.kill()
+            process.join()
+    
+    def _reference_rows(self) -> np.ndarray:
+        """Indices of the processed rows new rows are assigned against: all of them up to a cap,
+        then a sample stratified over the two highest-variance features."""
+        if self.reference_indices is None:
+            data = self.processed_data
+            if len(data) <= SCORING_REFERENCE_ROWS:
+                self.reference_indices = np.arange(len(data))
+            else:
+                top = np.argsort(data.var(axis=0))[::-1]
+                x, y = data[:, top[0]], data[:, top[min(1, len(top) - 1)]]
+                self.reference_indices = density_sample_indices(x, y, SCORING_REFERENCE_ROWS,
+                                                                seed=self.config.random_state)
+        return self.reference_indices
+    
+    def get_reference_labels(self) -> Dict[str, np.ndarray]:
+        """Every successful algorithm's int32 labels of the reference rows."""
+        rows = self._reference_rows()
+        return {
+            algo_name: np.asarray(result['labels'], dtype=np.int32)[rows]
+            for algo_name, result in (self.results.get('clustering_results') or {}).items()
+            if isinstance(result, dict) and result.get('labels') is not None
+        }
+    
+    def get_serving_state(self) -> Dict[str, Any]:
+        """State needed, besides an algorithm's reference labels, to assign new rows to clusters later."""
+        reference = np.ascontiguousarray(self.processed_data[self._reference_rows()], dtype=np.float32)
+        return {
+            'feature_columns': self.preprocessor.feature_columns,
+            'preprocessor': self.preprocessor,
+            'reference': reference,
+            # Fitted once here and persisted, so scoring requests never rebuild it
+            'reference_index': NearestNeighbors(n_neighbors=1).fit(reference),
+            'best_algorithm': self.results.get('best_algorithm'),
+            'n_clusters_used': self.results.get('n_clusters_used'),
+            'config': asdict(self.config)
+        }
+    
+    def restore_serving_state(self, state: Dict[str, Any], model: Any, model_name: str):
+        """Load persisted preprocessing and one algorithm's reference labels into this workflow."""
+        self.preprocessor = state.get('preprocessor')
+        self.reference = state.get('reference')
+        self.reference_index = state.get('reference_index')
+        self.reference_labels = model
+        self.assignment_algorithm = model_name
+        self.results = {'best_algorithm': state.get('best_algorithm'), 'n_clusters_used': state.get('n_clusters_used')}
+    
+    def make_batch_prediction(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """Assign new rows to clusters with the persisted preprocessing (nothing is refitted).
+        
+        Each row takes the label of its nearest reference row in the
+        processed space, which also keeps DBSCAN noise as -1.
+        """
+        try:
+            if self.reference_labels is None:
+                return {
+                    'success': False,
+                    'error': 'No clustering results available'
+                }
+            
+            processed, missing_features = self.preprocessor.transform(data)
+            labels = assign_labels(None, self.reference, self.reference_labels, processed,
+                                   nearest=self.reference_index)
+            
+            return {
+                'success': True,
+                'predictions': labels.tolist(),
+                'n_rows': int(len(data)),
+                'model_used': self.assignment_algorithm,
+                'missing_features': missing_features
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def get_projection(self) -> Tuple[np.ndarray, str]:
+        """2-D coordinates of every processed row and where they came from.
+        
+        The preprocessing output is reused when it is already 2-D (PCA,
+        t-SNE or two features); with more PCA components its first two are
+        the same projection a fresh 2-component PCA would give. Only other
+        data is projected here, once.
+        """
+        if self.projection is None:
+            data = self.processed_data
+            if data.shape[1] == 2:
+                source = 'tsne' if self.preprocessor.tsne is not None else (
+                    'pca' if self.preprocessor.pca is not None else 'features')
+                coords = data
+            elif self.preprocessor.pca is not None:
+                coords, source = data[:, :2], 'pca'
+            elif data.shape[1] < 2:
+                coords, source = np.column_stack([data[:, 0], np.zeros(len(data))]), 'features'
+            else:
+                coords = PCA(n_components=2, random_state=self.config.random_state).fit_transform(data)
+                source = 'pca_refit'
+            self.projection = (np.asarray(coords, dtype=np.float64), source)
+        return self.projection
+    
+    def get_visualization_data(self, labels: Optional[np.ndarray] = None,
+                               max_points: Optional[int] = None) -> Dict[str, Any]:
+        """Scatter points (x, y, cluster, size) for the 2-D projection, downsampled per cluster.
+        
+        ``size`` is always the cluster's true row count, whatever number of
+        its points is shown.
+        """
+        coords, source = self.get_projection()
+        n = len(coords)
+        labels = np.zeros(n, dtype=np.int32) if labels is None else np.asarray(labels, dtype=np.int32)
+        cluster_ids, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+        
+        shown = grouped_scatter_indices(coords[:, 0], coords[:, 1], labels, max_points)
+        points = zip(coords[shown, 0].tolist(), coords[shown, 1].tolist(),
+                     labels[shown].tolist(), counts[inverse[shown]].tolist())
+        return {
+            'points': [{'x': x, 'y': y, 'cluster': c, 'size': size} for x, y, c, size in points],
+            'summary': {
+                'n_points': int(n),
+                'n_shown': int(len(shown)),
+                'projection': source,
+                'cluster_sizes': {int(c): int(count) for c, count in zip(cluster_ids, counts)}
+            }
+        }
+    
     def get_cluster_insights(self) -> Dict[str, Any]:
         """Generate insights from clustering results."""
         try:
@@ -0,0 +1,282 @@
+"""
+Dataset store for preprocessed training matrices
+Keeps feature blocks as float32 arrays (dense or CSR) and per-row cluster labels as packed integer arrays on disk, so large outputs never travel as per-row Python objects
+"""
+
+import os
+import re
+import json
+import shutil
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+# Store configuration
+DATASET_STORAGE_PATH = os.getenv("DATASET_STORAGE_PATH", "/tmp/ml_datasets")
+PREVIEW_ROWS = int(os.getenv("PREPROCESS_PREVIEW_ROWS", "20"))  # Rows returned to the client
+
+FEATURES_FILE = "X.npy"
+SPARSE_FEATURES_FILE = "X.npz"
+TARGET_FILE = "y.npy"
+PREPROCESSOR_FILE = "preprocessor.joblib"
+METADATA_FILE = "metadata.json"
+LABELS_DIR = "labels"
+
+
+def pack_labels(labels: Any) -> np.ndarray:
+    """Labels in the narrowest signed integer type that holds them (int8, int16 or int32); -1 stays noise."""
+    labels = np.asarray(labels)
+    if labels.size == 0:
+        return labels.astype(np.int8)
+    low, high = int(labels.min()), int(labels.max())
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return labels.astype(dtype, copy=False)
+    raise ValueError(f"Cluster labels out of int32 range: {low}..{high}")
+
+
+def label_summary(labels: np.ndarray) -> Dict[str, Any]:
+    """Row count, dtype, cluster count, noise count and per-cluster sizes of a label array."""
+    cluster_ids, counts = np.unique(labels, return_counts=True)
+    sizes = {int(c): int(n) for c, n in zip(cluster_ids, counts)}
+    return {
+        'n_rows': int(len(labels)),
+        'dtype': str(labels.dtype),
+        'n_clusters': len([c for c in sizes if c != -1]),
+        'n_noise': sizes.pop(-1, 0),
+        'cluster_sizes': sizes
+    }
+
+
+@dataclass
+class MatrixArtifact:
+    """A preprocessed training set: one float32 feature block (dense or CSR), the target vector and column names.
+
+    ``preprocessor`` is the fitted transformer that produced the block, kept so
+    prediction-time rows can be transformed identically.
+    """
+    X: Any
+    y: np.ndarray
+    feature_columns: List[str]
+    target_column: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    preprocessor: Any = None
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, target_column: str,
+                   feature_columns: Optional[List[str]] = None, **metadata: Any) -> 'MatrixArtifact':
+        """Copy the feature columns of ``data`` into a single C-contiguous float32 block."""
+        feature_columns = feature_columns or [col for col in data.columns if col != target_column]
+        X = np.ascontiguousarray(data[feature_columns].to_numpy(dtype=np.float32))
+        return cls(X, cls._target_array(data[target_column]), list(feature_columns), target_column, metadata)
+
+    @classmethod
+    def from_matrix(cls, X: Any, y: Any, feature_columns: List[str], target_column: str,
+                    preprocessor: Any = None, **metadata: Any) -> 'MatrixArtifact':
+        """Wrap an already transformed matrix; sparse input is kept as float32 CSR."""
+        if sparse.issparse(X):
+            X = sparse.csr_matrix(X, dtype=np.float32)
+        else:
+            X = np.ascontiguousarray(X, dtype=np.float32)
+        return cls(X, cls._target_array(y), list(feature_columns), target_column, metadata, preprocessor)
+
+    @staticmethod
+    def _target_array(y: Any) -> np.ndarray:
+        y = np.asarray(y)
+        return y.astype(str) if y.dtype == object else y
+
+    @property
+    def is_sparse(self) -> bool:
+        return sparse.issparse(self.X)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Wrap a dense block as a DataFrame (no copy of X) with the target appended."""
+        if self.is_sparse:
+            raise ValueError("Sparse matrices cannot be wrapped as a DataFrame without densifying")
+        frame = pd.DataFrame(self.X, columns=self.feature_columns, copy=False)
+        frame[self.target_column] = self.y
+        return frame
+
+    def preview(self, n_rows: int = PREVIEW_ROWS) -> List[Dict[str, Any]]:
+        """First rows as records, for display only."""
+        block = self.X[:n_rows]
+        head = pd.DataFrame(block.toarray() if self.is_sparse else block, columns=self.feature_columns)
+        head[self.target_column] = self.y[:n_rows]
+        return head.to_dict('records')
+
+    @property
+    def shape(self) -> tuple:
+        return (int(self.X.shape[0]), int(self.X.shape[1]) + 1)
+
+    @property
+    def nbytes(self) -> int:
+        if self.is_sparse:
+            return int(self.X.data.nbytes + self.X.indices.nbytes + self.X.indptr.nbytes)
+        return int(self.X.nbytes)
+
+    def summary(self) -> Dict[str, Any]:
+        n_rows, n_features = self.X.shape
+        summary = {
+            'n_rows': int(n_rows),
+            'n_features': int(n_features),
+            'dtype': str(self.X.dtype),
+            'sparse': self.is_sparse,
+            'memory_mb': round((self.nbytes + self.y.nbytes) / (1024 * 1024), 3)
+        }
+        if self.is_sparse:
+            summary['density'] = round(self.X.nnz / max(1, n_rows * n_features), 6)
+            summary['dense_equivalent_mb'] = round(n_rows * n_features * 4 / (1024 * 1024), 3)
+        return summary
+
+
+class DatasetStore:
+    """Per-session on-disk store of MatrixArtifacts.
+
+    Arrays are written as plain .npy files and loaded with ``mmap_mode='r'``,
+    so training reads pages on demand instead of unpickling the matrix.
+    """
+
+    def __init__(self, storage_path: str = DATASET_STORAGE_PATH):
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        logger.info(f"✅ Dataset store initialized at {self.storage_path}")
+
+    def _session_dir(self, session_id: str) -> Path:
+        safe_id = re.sub(r'[^\w.-]', '_', session_id)
+        return self.storage_path / safe_id
+
+    def _artifact_dir(self, session_id: str, name: str) -> Path:
+        safe_name = re.sub(r'[^\w.-]', '_', name)
+        return self._session_dir(session_id) / safe_name
+
+    def _labels_path(self, session_id: str, name: str) -> Path:
+        safe_name = re.sub(r'[^\w.-]', '_', name)
+        return self._session_dir(session_id) / LABELS_DIR / f"{safe_name}.npy"
+
+    def save(self, session_id: str, name: str, artifact: MatrixArtifact) -> Dict[str, Any]:
+        """Write an artifact and return the metadata to keep in the session."""
+        artifact_dir = self._artifact_dir(session_id, name)
+        if artifact_dir.exists():
+            shutil.rmtree(artifact_dir)
+        artifact_dir.mkdir(parents=True, exist_ok=True)
+
+        if artifact.is_sparse:
+            sparse.save_npz(artifact_dir / SPARSE_FEATURES_FILE, artifact.X, compressed=False)
+        else:
+            np.save(artifact_dir / FEATURES_FILE, artifact.X, allow_pickle=False)
+        np.save(artifact_dir / TARGET_FILE, artifact.y, allow_pickle=False)
+        if artifact.preprocessor is not None:
+            joblib.dump(artifact.preprocessor, artifact_dir / PREPROCESSOR_FILE)
+
+        metadata = {
+            'name': name,
+            'feature_columns': artifact.feature_columns,
+            'target_column': artifact.target_column,
+            'saved_at': datetime.now().isoformat(),
+            **artifact.summary(),
+            **artifact.metadata
+        }
+        with open(artifact_dir / METADATA_FILE, 'w') as f:
+            json.dump(metadata, f)
+
+        logger.info(f"Stored {name} matrix for session {session_id}: {artifact.summary()}")
+        return metadata
+
+    def exists(self, session_id: str, name: str) -> bool:
+        return (self._artifact_dir(session_id, name) / METADATA_FILE).exists()
+
+    def load(self, session_id: str, name: str, mmap: bool = True) -> MatrixArtifact:
+        """Load an artifact; a dense feature block is memory-mapped read-only by default."""
+        artifact_dir = self._artifact_dir(session_id, name)
+        if not (artifact_dir / METADATA_FILE).exists():
+            raise KeyError(f"No {name} matrix stored for session {session_id}")
+
+        with open(artifact_dir / METADATA_FILE, 'r') as f:
+            metadata = json.load(f)
+
+        if (artifact_dir / SPARSE_FEATURES_FILE).exists():
+            X = sparse.load_npz(artifact_dir / SPARSE_FEATURES_FILE)
+        else:
+            X = np.load(artifact_dir / FEATURES_FILE, mmap_mode='r' if mmap else None, allow_pickle=False)
+        y = np.load(artifact_dir / TARGET_FILE, allow_pickle=False)
+        preprocessor_path = artifact_dir / PREPROCESSOR_FILE
+        preprocessor = joblib.load(preprocessor_path) if preprocessor_path.exists() else None
+        feature_columns = metadata.pop('feature_columns')
+        target_column = metadata.pop('target_column')
+        return MatrixArtifact(X, y, feature_columns, target_column, metadata, preprocessor)
+
+    def save_labels(self, session_id: str, labels: Dict[str, Any], default: Optional[str] = None) -> Dict[str, Any]:
+        """Store one packed label array per algorithm, replacing earlier labels; returns their summaries.
+
+        ``default`` names the array served when no algorithm is requested
+        (e.g. the best scoring one).
+        """
+        labels_dir = self._session_dir(session_id) / LABELS_DIR
+        if labels_dir.exists():
+            shutil.rmtree(labels_dir)
+        labels_dir.mkdir(parents=True, exist_ok=True)
+
+        summaries = {}
+        for name, values in labels.items():
+            packed = pack_labels(values)
+            np.save(self._labels_path(session_id, name), packed, allow_pickle=False)
+            summaries[name] = label_summary(packed)
+
+        metadata = {
+            'default': default if default in summaries else next(iter(summaries), None),
+            'algorithms': summaries,
+            'saved_at': datetime.now().isoformat()
+        }
+        with open(labels_dir / METADATA_FILE, 'w') as f:
+            json.dump(metadata, f)
+        return metadata
+
+    def labels_metadata(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Summaries of a session's stored labels, or None if none are stored."""
+        metadata_path = self._session_dir(session_id) / LABELS_DIR / METADATA_FILE
+        if not metadata_path.exists():
+            return None
+        with open(metadata_path, 'r') as f:
+            return json.load(f)
+
+    def load_labels(self, session_id: str, name: Optional[str] = None) -> np.ndarray:
+        """One algorithm's labels (the default ones without ``name``), memory-mapped read-only."""
+        metadata = self.labels_metadata(session_id)
+        if not metadata:
+            raise KeyError(f"No cluster labels stored for session {session_id}")
+        name = name or metadata['default']
+        if name not in metadata['algorithms']:
+            raise KeyError(f"No labels stored for algorithm '{name}'")
+        return np.load(self._labels_path(session_id, name), mmap_mode='r', allow_pickle=False)
+
+    def delete(self, session_id: str) -> bool:
+        """Remove every stored matrix for a session."""
+        session_dir = self._session_dir(session_id)
+        if session_dir.exists():
+            shutil.rmtree(session_dir)
+            return True
+        return False
+
+    def cleanup_old_datasets(self, max_age_hours: int = 24) -> int:
+        """Remove stored matrices older than the session lifetime."""
+        cutoff_time = datetime.now().timestamp() - (max_age_hours * 3600)
+        removed = 0
+        for session_dir in self.storage_path.iterdir():
+            if session_dir.is_dir() and session_dir.stat().st_mtime < cutoff_time:
+                shutil.rmtree(session_dir, ignore_errors=True)
+                removed += 1
+        return removed
+
+
+# Global store instance
+dataset_store = DatasetStore()
@@ -0,0 +1,103 @@
+"""
+Embedding cache
+Stores t-SNE embeddings on disk keyed by the exact input matrix and embedding parameters, so re-running an analysis on the same data returns the embedding instead of recomputing it
+"""
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "/tmp/ml_embedding_cache")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100"))
+EMBEDDING_CACHE_TTL_HOURS = int(os.getenv("EMBEDDING_CACHE_TTL_HOURS", "24"))
+
+
+def array_fingerprint(data: np.ndarray) -> str:
+    """Content hash of a numeric matrix: shape, dtype and every value."""
+    data = np.ascontiguousarray(data)
+    digest = hashlib.sha256()
+    digest.update(json.dumps([list(data.shape), data.dtype.str]).encode())
+    digest.update(data.data)
+    return digest.hexdigest()
+
+
+def embedding_cache_key(data: np.ndarray, params: Dict[str, Any]) -> str:
+    """Key for embedding ``data`` (the matrix actually embedded, so it reflects scaling) with ``params``."""
+    payload = {'data': array_fingerprint(data), 'params': params}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """Disk-backed cache of float32 embeddings, one .npy file per key.
+
+    Entries are written to a temporary file and renamed into place, so
+    concurrent analyses never read a partial embedding.
+    """
+
+    def __init__(self, storage_path: str = EMBEDDING_CACHE_PATH, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        logger.info(f"✅ Embedding cache initialized at {self.storage_path}")
+
+    def _entry_path(self, key: str) -> Path:
+        return self.storage_path / f"{key}.npy"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """The cached embedding for a key, or None."""
+        path = self._entry_path(key)
+        try:
+            if time.time() - path.stat().st_mtime > EMBEDDING_CACHE_TTL_HOURS * 3600:
+                return None
+            return np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, embedding: np.ndarray) -> bool:
+        """Store an embedding under a key."""
+        tmp_path = self.storage_path / f".{key}.{uuid.uuid4().hex[:8]}.npy"
+        try:
+            np.save(tmp_path, np.asarray(embedding, dtype=np.float32), allow_pickle=False)
+            os.replace(tmp_path, self._entry_path(key))
+        except OSError as e:
+            logger.warning(f"Failed to cache embedding {key[:12]}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return False
+        self._trim()
+        return True
+
+    def _trim(self):
+        entries = sorted(
+            (p for p in self.storage_path.glob("*.npy") if not p.name.startswith('.')),
+            key=lambda p: p.stat().st_mtime
+        )
+        for path in entries[:max(0, len(entries) - self.max_entries)]:
+            path.unlink(missing_ok=True)
+
+    def cleanup(self, max_age_hours: int = EMBEDDING_CACHE_TTL_HOURS) -> int:
+        """Remove entries older than the cache lifetime (and abandoned temporary files)."""
+        cutoff_time = time.time() - max_age_hours * 3600
+        removed = 0
+        for path in self.storage_path.glob("*.npy"):
+            if path.stat().st_mtime < cutoff_time:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries = [p for p in self.storage_path.glob("*.npy") if not p.name.startswith('.')]
+        return {'entries': len(entries), 'max_entries': self.max_entries}
+
+
+# Global cache instance
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,177 @@
+"""
+Model explanation service
+Permutation feature importance for any fitted estimator, computed off the request path and cached
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Callable
+
+import numpy as np
+import pandas as pd
+import joblib
+from joblib import Parallel, delayed
+from scipy import sparse
+from sklearn.metrics import r2_score, accuracy_score
+
+from memory_utils import fingerprint_data
+
+logger = logging.getLogger(__name__)
+
+# Explanation configuration
+EXPLANATION_MAX_SAMPLES = int(os.getenv("EXPLANATION_MAX_SAMPLES", "2000"))  # Rows scored per shuffle
+EXPLANATION_N_REPEATS = int(os.getenv("EXPLANATION_N_REPEATS", "5"))
+EXPLANATION_N_JOBS = int(os.getenv("EXPLANATION_N_JOBS", "-1"))
+EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", "64"))
+MAX_STACKED_BYTES = 64 * 1024 * 1024  # Upper bound for one stacked predict batch
+
+SCORE_FUNCTIONS: Dict[str, Callable[[np.ndarray, np.ndarray], float]] = {
+    'regression': r2_score,
+    'classification': accuracy_score
+}
+
+
+def _permutation_drops(model: Any, X: np.ndarray, y: np.ndarray, columns: List[int],
+                       feature_names: Optional[List[str]], score_func: Callable,
+                       baseline: float, n_repeats: int, seed: int) -> List[np.ndarray]:
+    """Score drops for a block of features.
+
+    All repeats for a feature are stacked into one matrix so the model is
+    called once per feature (or per memory-bounded batch of repeats) instead of
+    once per shuffle.
+    """
+    rng = np.random.RandomState(seed)
+    n_rows = X.shape[0]
+    repeats_per_batch = max(1, min(n_repeats, MAX_STACKED_BYTES // max(1, X.nbytes)))
+    drops = []
+
+    for col in columns:
+        scores = np.empty(n_repeats)
+        done = 0
+        while done < n_repeats:
+            batch = min(repeats_per_batch, n_repeats - done)
+            stacked = np.tile(X, (batch, 1))
+            for r in range(batch):
+                stacked[r * n_rows:(r + 1) * n_rows, col] = X[rng.permutation(n_rows), col]
+
+            model_input = pd.DataFrame(stacked, columns=feature_names) if feature_names else stacked
+            predictions = np.asarray(model.predict(model_input))
+            for r in range(batch):
+                scores[done + r] = score_func(y, predictions[r * n_rows:(r + 1) * n_rows])
+            done += batch
+
+        drops.append(baseline - scores)
+
+    return drops
+
+
+class ExplanationService:
+    """Computes and caches permutation importance per (model, dataset) pair."""
+
+    def __init__(self, max_samples: int = EXPLANATION_MAX_SAMPLES, n_repeats: int = EXPLANATION_N_REPEATS,
+                 n_jobs: int = EXPLANATION_N_JOBS, cache_size: int = EXPLANATION_CACHE_SIZE):
+        self.max_samples = max_samples
+        self.n_repeats = n_repeats
+        self.n_jobs = n_jobs
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(model: Any, X: Any, y: Any) -> str:
+        """Key on the fitted model's content and the evaluation data's content."""
+        return f"{joblib.hash(model)}:{fingerprint_data(X, y)}"
+
+    def get_cached(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return None
+
+    def _store(self, key: str, result: Dict[str, Any]):
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def compute_permutation_importance(self, model: Any, X: Any, y: Any, task: str,
+                                       feature_names: Optional[List[str]] = None,
+                                       random_state: int = 42) -> Dict[str, Any]:
+        """Permutation importance on a capped sample, parallel over feature blocks."""
+        score_func = SCORE_FUNCTIONS[task]
+        if feature_names is None and isinstance(X, pd.DataFrame):
+            feature_names = X.columns.tolist()
+
+        X_values = X if sparse.issparse(X) else np.asarray(X)
+        y_values = np.asarray(y)
+
+        rng = np.random.RandomState(random_state)
+        if X_values.shape[0] > self.max_samples:
+            idx = rng.choice(X_values.shape[0], self.max_samples, replace=False)
+            X_values, y_values = X_values[idx], y_values[idx]
+
+        # Shuffling needs a dense block; only the capped sample is densified
+        if sparse.issparse(X_values):
+            X_values = X_values.toarray()
+        if X_values.dtype.kind in 'biuf':
+            X_values = X_values.astype(np.float64)
+
+        model_input = pd.DataFrame(X_values, columns=feature_names) if feature_names else X_values
+        baseline = float(score_func(y_values, np.asarray(model.predict(model_input))))
+
+        n_features = X_values.shape[1]
+        n_blocks = min(n_features, joblib.cpu_count() if self.n_jobs == -1 else max(1, self.n_jobs))
+        blocks = [block.tolist() for block in np.array_split(np.arange(n_features), n_blocks) if len(block)]
+        seeds = rng.randint(np.iinfo(np.int32).max, size=len(blocks))
+
+        block_drops = Parallel(n_jobs=self.n_jobs)(
+            delayed(_permutation_drops)(
+                model, X_values, y_values, block, feature_names, score_func,
+                baseline, self.n_repeats, int(seed)
+            )
+            for block, seed in zip(blocks, seeds)
+        )
+        drops = np.vstack([d for block in block_drops for d in block])
+
+        names = feature_names or [f"feature_{i}" for i in range(n_features)]
+        importance = [
+            {
+                'feature': names[i],
+                'importance': float(drops[i].mean()),
+                'std': float(drops[i].std())
+            }
+            for i in range(n_features)
+        ]
+        importance.sort(key=lambda x: x['importance'], reverse=True)
+
+        return {
+            'method': 'permutation',
+            'feature_importance': importance,
+            'baseline_score': baseline,
+            'scoring': score_func.__name__,
+            'n_samples': int(X_values.shape[0]),
+            'n_repeats': self.n_repeats,
+            'computed_at': datetime.now().isoformat()
+        }
+
+    def explain(self, model: Any, X: Any, y: Any, task: str,
+                feature_names: Optional[List[str]] = None, random_state: int = 42) -> Dict[str, Any]:
+        """Return cached importance for (model, data) or compute and cache it."""
+        key = self.cache_key(model, X, y)
+        cached = self.get_cached(key)
+        if cached is not None:
+            return dict(cached, cached=True)
+
+        result = self.compute_permutation_importance(model, X, y, task, feature_names, random_state)
+        result['cache_key'] = key
+        self._store(key, result)
+        logger.info(f"Computed permutation importance for {len(result['feature_importance'])} features")
+        return dict(result, cached=False)
+
+
+# Global service instance
+explanation_service = ExplanationService()
@@ -0,0 +1,498 @@
+"""
+Out-of-core model training
+Streams a dataset in chunks through partial_fit estimators so training memory is bounded by the chunk size
+"""
+
+import os
+import copy
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator, Union, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin, RegressorMixin
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.linear_model import SGDRegressor, SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler, MinMaxScaler, LabelEncoder
+
+logger = logging.getLogger(__name__)
+
+# Streaming configuration
+INCREMENTAL_CHUNK_SIZE = int(os.getenv("INCREMENTAL_CHUNK_SIZE", "50000"))  # Rows held in memory at once
+INCREMENTAL_HOLDOUT_SAMPLE = int(os.getenv("INCREMENTAL_HOLDOUT_SAMPLE", "5000"))  # Holdout rows kept for charts
+AUC_BINS = 1000  # Histogram resolution for the streaming ROC AUC
+
+STREAMABLE_EXTENSIONS = {'.csv', '.tsv'}  # Delimited text: counted by lines, sampled by head
+
+
+def iter_chunks(source: Union[str, Path, pd.DataFrame], chunk_size: int = INCREMENTAL_CHUNK_SIZE,
+                column_names: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield a dataset chunk by chunk from a DataFrame or a CSV/TSV file.
+
+    ``column_names`` replaces the file header so chunks carry the same
+    sanitized names the session sample was given.
+    """
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield source.iloc[start:start + chunk_size]
+        return
+
+    path = Path(source)
+    file_ext = path.suffix.lower()
+    if file_ext in ('.csv', '.tsv'):
+        reader = pd.read_csv(path, sep='\t' if file_ext == '.tsv' else ',', chunksize=chunk_size)
+    else:
+        raise ValueError(f"Streaming is not supported for {file_ext} files")
+
+    for chunk in reader:
+        if column_names is not None:
+            chunk.columns = column_names
+        yield chunk
+
+
+class StreamingFeatureTransformer(BaseEstimator, TransformerMixin):
+    """Turns raw rows into a dense float matrix using statistics gathered chunk by chunk.
+
+    Numeric columns are imputed with their running mean and scaled; categorical
+    columns are hashed, so no vocabulary has to be held in memory. Optionally
+    appends distances to MiniBatchKMeans centroids as extra features.
+    """
+
+    def __init__(self, numeric_columns: List[str], categorical_columns: List[str],
+                 n_hash_features: int = 32, n_clusters: int = 8, output: str = 'standard',
+                 random_state: int = 42):
+        self.numeric_columns = numeric_columns
+        self.categorical_columns = categorical_columns
+        self.n_hash_features = n_hash_features
+        self.n_clusters = n_clusters
+        self.output = output
+        self.random_state = random_state
+
+        self.standard_scaler_ = StandardScaler()
+        self.range_scaler_ = MinMaxScaler(clip=True)
+        self.kmeans_ = (
+            MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3)
+            if n_clusters else None
+        )
+        self.hasher_ = FeatureHasher(n_features=n_hash_features, input_type='string', alternate_sign=False)
+
+    def _encode(self, X: pd.DataFrame) -> np.ndarray:
+        """Raw numeric values (NaN kept) followed by hashed categorical counts."""
+        blocks = []
+        if self.numeric_columns:
+            numeric = X.reindex(columns=self.numeric_columns).apply(pd.to_numeric, errors='coerce')
+            blocks.append(numeric.to_numpy(dtype=np.float64))
+        if self.categorical_columns and self.n_hash_features:
+            categorical = X.reindex(columns=self.categorical_columns).astype(str)
+            tokens = [(col + '=' + categorical[col]).to_numpy() for col in self.categorical_columns]
+            blocks.append(self.hasher_.transform(zip(*tokens)).toarray())
+        return np.hstack(blocks) if blocks else np.empty((len(X), 0))
+
+    def _impute(self, encoded: np.ndarray) -> np.ndarray:
+        missing = np.isnan(encoded)
+        if missing.any():
+            encoded[missing] = np.take(np.nan_to_num(self.standard_scaler_.mean_), np.nonzero(missing)[1])
+        return encoded
+
+    def partial_fit_scaling(self, X: pd.DataFrame):
+        """Update running mean/variance and min/max; both scalers skip NaNs."""
+        encoded = self._encode(X)
+        self.standard_scaler_.partial_fit(encoded)
+        self.range_scaler_.partial_fit(encoded)
+        return self
+
+    def partial_fit_clusters(self, X: pd.DataFrame):
+        """Update centroids on standardized rows; call after scaling is complete."""
+        if self.kmeans_ is not None:
+            standardized = self.standard_scaler_.transform(self._impute(self._encode(X)))
+            if len(standardized) >= self.n_clusters:
+                self.kmeans_.partial_fit(standardized)
+        return self
+
+    def fit(self, X: pd.DataFrame, y: Any = None):
+        self.partial_fit_scaling(X)
+        return self.partial_fit_clusters(X)
+
+    def transform(self, X: pd.DataFrame) -> np.ndarray:
+        return self.transform_outputs(X, [self.output])[self.output]
+
+    def transform_outputs(self, X: pd.DataFrame, outputs: List[str]) -> Dict[str, np.ndarray]:
+        """Rows transformed for several output scalings, encoding and imputing them only once."""
+        encoded = self._impute(self._encode(X))
+        standardized = self.standard_scaler_.transform(encoded)
+        distances = None
+        if self.kmeans_ is not None and hasattr(self.kmeans_, 'cluster_centers_'):
+            distances = self.kmeans_.transform(standardized)
+        transformed = {}
+        for output in outputs:
+            base = standardized if output == 'standard' else self.range_scaler_.transform(encoded)
+            transformed[output] = base if distances is None else np.hstack([base, distances])
+        return transformed
+
+    def with_output(self, output: str) -> 'StreamingFeatureTransformer':
+        """Same fitted statistics, different output scaling (MultinomialNB needs non-negative input)."""
+        variant = copy.copy(self)
+        variant.output = output
+        return variant
+
+    def get_feature_names_out(self, input_features: Any = None) -> np.ndarray:
+        names = list(self.numeric_columns)
+        if self.categorical_columns and self.n_hash_features:
+            names += [f"hashed_{i}" for i in range(self.n_hash_features)]
+        if self.kmeans_ is not None and hasattr(self.kmeans_, 'cluster_centers_'):
+            names += [f"cluster_distance_{i}" for i in range(self.n_clusters)]
+        return np.asarray(names, dtype=object)
+
+
+class StandardizedTargetRegressor(BaseEstimator, RegressorMixin):
+    """Trains an SGD regressor on a standardized target and predicts on the original scale.
+
+    SGD step sizes assume unit-scale targets; the target mean and scale come
+    from the first streaming pass.
+    """
+
+    def __init__(self, estimator: Any, target_mean: float = 0.0, target_scale: float = 1.0):
+        self.estimator = estimator
+        self.target_mean = target_mean
+        self.target_scale = target_scale
+
+    def fit(self, X: np.ndarray, y: np.ndarray):
+        self.estimator.fit(X, (y - self.target_mean) / self.target_scale)
+        return self
+
+    def partial_fit(self, X: np.ndarray, y: np.ndarray):
+        self.estimator.partial_fit(X, (y - self.target_mean) / self.target_scale)
+        return self
+
+    def __sklearn_is_fitted__(self) -> bool:
+        return hasattr(self.estimator, 'coef_')
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.estimator.predict(X) * self.target_scale + self.target_mean
+
+    @property
+    def coef_(self) -> np.ndarray:
+        return self.estimator.coef_ * self.target_scale
+
+
+class StreamingRegressionMetrics:
+    """Accumulates holdout error statistics without keeping predictions."""
+
+    def __init__(self):
+        self.n = 0
+        self.sum_y = 0.0
+        self.sum_y2 = 0.0
+        self.sse = 0.0
+        self.sae = 0.0
+        self.chunk_scores: List[float] = []
+
+    def update(self, y_true: np.ndarray, y_pred: np.ndarray, y_proba: Optional[np.ndarray] = None):
+        if len(y_true) == 0:
+            return
+        residuals = y_true - y_pred
+        self.n += len(y_true)
+        self.sum_y += float(y_true.sum())
+        self.sum_y2 += float(np.square(y_true).sum())
+        self.sse += float(np.square(residuals).sum())
+        self.sae += float(np.abs(residuals).sum())
+        sst = float(np.square(y_true - y_true.mean()).sum())
+        if len(y_true) > 1 and sst > 0:
+            self.chunk_scores.append(1.0 - float(np.square(residuals).sum()) / sst)
+
+    def result(self) -> Dict[str, float]:
+        if self.n == 0:
+            return {'test_r2': 0.0, 'test_rmse': 0.0, 'test_mae': 0.0, 'cv_mean': 0.0, 'cv_std': 0.0}
+        sst = self.sum_y2 - self.sum_y ** 2 / self.n
+        scores = np.asarray(self.chunk_scores or [0.0])
+        return {
+            # Spread of per-chunk holdout scores stands in for cross-validation variance
+            'cv_mean': float(scores.mean()),
+            'cv_std': float(scores.std()),
+            'test_r2': float(1.0 - self.sse / sst) if sst > 0 else 0.0,
+            'test_rmse': float(np.sqrt(self.sse / self.n)),
+            'test_mae': float(self.sae / self.n)
+        }
+
+
+class StreamingClassificationMetrics:
+    """Accumulates a holdout confusion matrix (and a binned ROC for binary targets)."""
+
+    def __init__(self, n_classes: int):
+        self.n_classes = n_classes
+        self.confusion = np.zeros((n_classes, n_classes), dtype=np.int64)
+        self.positive_hist = np.zeros(AUC_BINS, dtype=np.int64)
+        self.negative_hist = np.zeros(AUC_BINS, dtype=np.int64)
+        self.has_proba = False
+        self.chunk_scores: List[float] = []
+
+    def update(self, y_true: np.ndarray, y_pred: np.ndarray, y_proba: Optional[np.ndarray] = None):
+        if len(y_true) == 0:
+            return
+        np.add.at(self.confusion, (y_true, y_pred), 1)
+        self.chunk_scores.append(float(np.mean(y_true == y_pred)))
+        if y_proba is not None and self.n_classes == 2:
+            self.has_proba = True
+            bins = np.minimum((y_proba[:, 1] * AUC_BINS).astype(int), AUC_BINS - 1)
+            self.positive_hist += np.bincount(bins[y_true == 1], minlength=AUC_BINS)
+            self.negative_hist += np.bincount(bins[y_true == 0], minlength=AUC_BINS)
+
+    def _auc(self) -> Optional[float]:
+        """Binned ROC AUC; None when it is undefined (no probabilities, or a single class seen)."""
+        n_pos, n_neg = self.positive_hist.sum(), self.negative_hist.sum()
+        if not self.has_proba or n_pos == 0 or n_neg == 0:
+            return None
+        # P(score_pos > score_neg) with ties inside a bin counted as one half
+        negatives_below = np.cumsum(self.negative_hist) - self.negative_hist
+        wins = (self.positive_hist * (negatives_below + 0.5 * self.negative_hist)).sum()
+        return float(wins / (n_pos * n_neg))
+
+    def result(self) -> Dict[str, Optional[float]]:
+        support = self.confusion.sum(axis=1)
+        predicted = self.confusion.sum(axis=0)
+        true_positive = np.diag(self.confusion)
+        total = max(1, int(support.sum()))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = np.nan_to_num(true_positive / predicted)
+            recall = np.nan_to_num(true_positive / support)
+            f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+        weights = support / total
+        scores = np.asarray(self.chunk_scores or [0.0])
+        return {
+            'cv_mean': float(scores.mean()),
+            'cv_std': float(scores.std()),
+            'test_accuracy': float(true_positive.sum() / total),
+            'test_precision': float((precision * weights).sum()),
+            'test_recall': float((recall * weights).sum()),
+            'test_f1': float((f1 * weights).sum()),
+            'test_auc': self._auc()
+        }
+
+
+class IncrementalTrainer:
+    """Trains partial_fit estimators over a chunked dataset for one supervised task.
+
+    Passes over the data: one for scaling statistics and target classes, one for
+    the MiniBatchKMeans features (if enabled), ``incremental_epochs`` training
+    passes, and a final holdout evaluation pass. Holdout membership is drawn per
+    chunk from a fixed seed, so every pass sees the same split.
+    """
+
+    MODELS = {
+        'regression': ['sgd', 'sgd_huber'],
+        'classification': ['sgd_logistic', 'sgd_hinge', 'multinomial_nb']
+    }
+
+    def __init__(self, task: str, config: Any):
+        if task not in self.MODELS:
+            raise ValueError(f"Incremental training not available for {task}")
+        self.task = task
+        self.config = config
+        self.chunk_size = getattr(config, 'chunk_size', INCREMENTAL_CHUNK_SIZE)
+        self.epochs = getattr(config, 'incremental_epochs', 3)
+        self.random_state = getattr(config, 'random_state', 42)
+        self.test_size = getattr(config, 'test_size', 0.2)
+
+        self.transformer: Optional[StreamingFeatureTransformer] = None
+        self.feature_columns: List[str] = []
+        self.target_encoder: Optional[LabelEncoder] = None
+        self.target_mean = 0.0
+        self.target_scale = 1.0
+        self.models: Dict[str, Any] = {}
+        self.stats: Dict[str, Any] = {}
+
+    def _create_models(self) -> Dict[str, Any]:
+        rs = self.random_state
+        available = {
+            'sgd': lambda: SGDRegressor(penalty='l2', alpha=1e-4, random_state=rs),
+            'sgd_huber': lambda: SGDRegressor(loss='huber', penalty='l2', alpha=1e-4, random_state=rs),
+            'sgd_logistic': lambda: SGDClassifier(loss='log_loss', alpha=1e-4, random_state=rs),
+            'sgd_hinge': lambda: SGDClassifier(loss='hinge', alpha=1e-4, random_state=rs),
+            'multinomial_nb': lambda: MultinomialNB(alpha=1.0)
+        }
+        names = [m for m in (getattr(self.config, 'models_to_include', None) or []) if m in self.MODELS[self.task]]
+        models = {name: available[name]() for name in (names or self.MODELS[self.task])}
+        if self.task == 'regression':
+            models = {
+                name: StandardizedTargetRegressor(model, self.target_mean, self.target_scale)
+                for name, model in models.items()
+            }
+        return models
+
+    def _holdout_mask(self, n_rows: int, chunk_index: int) -> np.ndarray:
+        return np.random.RandomState(self.random_state + chunk_index).rand(n_rows) < self.test_size
+
+    def _clean_target(self, chunk: pd.DataFrame, target_column: str) -> Tuple[pd.DataFrame, pd.Series]:
+        chunk = chunk[chunk[target_column].notna()]
+        y = chunk[target_column]
+        if self.task == 'regression':
+            y = pd.to_numeric(y, errors='coerce')
+            chunk, y = chunk[y.notna()], y[y.notna()]
+        elif pd.api.types.is_float_dtype(y) and np.all(np.mod(y, 1) == 0):
+            # A chunk with missing labels is read as float; keep integer labels consistent
+            y = y.astype(np.int64)
+        return chunk, y
+
+    def _split(self, chunks: Iterator[pd.DataFrame], target_column: str) -> Iterator[Tuple[int, pd.DataFrame, pd.Series, np.ndarray]]:
+        for index, chunk in enumerate(chunks):
+            chunk, y = self._clean_target(chunk, target_column)
+            yield index, chunk, y, self._holdout_mask(len(chunk), index)
+
+    @staticmethod
+    def _model_output(name: str) -> str:
+        """Feature scaling a model is trained on (MultinomialNB needs non-negative input)."""
+        return 'minmax' if name == 'multinomial_nb' else 'standard'
+
+    def _model_inputs(self, X: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Rows transformed once for every output scaling the models use."""
+        outputs = sorted({self._model_output(name) for name in self.models})
+        return self.transformer.transform_outputs(X, outputs)
+
+    def fit(self, source: Union[str, Path, pd.DataFrame], target_column: str,
+            feature_columns: Optional[List[str]] = None,
+            column_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run every pass over ``source`` and return per-model holdout metrics."""
+        chunks = lambda: iter_chunks(source, self.chunk_size, column_names)
+
+        # Pass 1: column types, scaling statistics, target classes
+        classes = set()
+        target_sum = target_sq_sum = 0.0
+        n_rows = n_train = n_holdout = n_chunks = 0
+        for index, chunk, y, holdout in self._split(chunks(), target_column):
+            if self.transformer is None:
+                features = feature_columns or [c for c in chunk.columns if c != target_column]
+                numeric = [c for c in features if pd.api.types.is_numeric_dtype(chunk[c])]
+                categorical = [c for c in features if c not in numeric]
+                self.feature_columns = features
+                self.transformer = StreamingFeatureTransformer(
+                    numeric, categorical,
+                    n_hash_features=getattr(self.config, 'hash_features', 32) if categorical else 0,
+                    n_clusters=getattr(self.config, 'cluster_features', 8),
+                    random_state=self.random_state
+                )
+            train_rows = chunk[~holdout]
+            if len(train_rows):
+                self.transformer.partial_fit_scaling(train_rows)
+            if self.task == 'classification':
+                classes.update(y.unique().tolist())
+            else:
+                y_train = y[~holdout].to_numpy(dtype=np.float64)
+                target_sum += float(y_train.sum())
+                target_sq_sum += float(np.square(y_train).sum())
+            n_rows += len(chunk)
+            n_holdout += int(holdout.sum())
+            n_chunks = index + 1
+        n_train = n_rows - n_holdout
+
+        if self.transformer is None or n_train == 0:
+            raise ValueError("No training rows found in the dataset")
+
+        if self.task == 'classification':
+            if len(classes) < 2:
+                raise ValueError("Target column needs at least two classes")
+            self.target_encoder = LabelEncoder().fit(sorted(classes, key=str))
+        else:
+            self.target_mean = target_sum / n_train
+            self.target_scale = float(np.sqrt(max(target_sq_sum / n_train - self.target_mean ** 2, 0.0))) or 1.0
+
+        # Pass 2: centroid features for the linear models
+        if self.transformer.kmeans_ is not None:
+            for _, chunk, _, holdout in self._split(chunks(), target_column):
+                self.transformer.partial_fit_clusters(chunk[~holdout])
+
+        # Training passes: each chunk is transformed once and its rows fed to every model
+        self.models = self._create_models()
+        encoded_classes = np.arange(len(classes)) if self.task == 'classification' else None
+        epoch_scores = {name: [] for name in self.models}
+        rng = np.random.RandomState(self.random_state)
+
+        for epoch in range(self.epochs):
+            epoch_metrics = {name: self._new_metrics() for name in self.models}
+            for _, chunk, y, holdout in self._split(chunks(), target_column):
+                y_values = self._encode_target(y)
+                train_idx = rng.permutation(np.flatnonzero(~holdout))
+                inputs = self._model_inputs(chunk)
+                for name, model in self.models.items():
+                    X_chunk = inputs[self._model_output(name)]
+                    if len(train_idx):
+                        if encoded_classes is not None:
+                            model.partial_fit(X_chunk[train_idx], y_values[train_idx], classes=encoded_classes)
+                        else:
+                            model.partial_fit(X_chunk[train_idx], y_values[train_idx])
+                    # Streaming holdout score with the model as it stands mid-epoch
+                    if holdout.any():
+                        epoch_metrics[name].update(y_values[holdout], model.predict(X_chunk[holdout]))
+            for name, metrics in epoch_metrics.items():
+                epoch_scores[name].append(metrics.result()['test_r2' if self.task == 'regression' else 'test_accuracy'])
+            logger.info(f"Incremental epoch {epoch + 1}/{self.epochs} complete over {n_chunks} chunks")
+
+        # Final holdout pass with the fully trained models; keep a small sample for charts
+        final_metrics = {name: self._new_metrics() for name in self.models}
+        holdout_sample_X, holdout_sample_y = [], []
+        kept = 0
+        for _, chunk, y, holdout in self._split(chunks(), target_column):
+            if not holdout.any():
+                continue
+            y_values = self._encode_target(y)
+            inputs = self._model_inputs(chunk[holdout])
+            for name, model in self.models.items():
+                X_holdout = inputs[self._model_output(name)]
+                proba = model.predict_proba(X_holdout) if hasattr(model, 'predict_proba') else None
+                final_metrics[name].update(y_values[holdout], model.predict(X_holdout), proba)
+            if kept < INCREMENTAL_HOLDOUT_SAMPLE:
+                take = chunk[holdout].iloc[:INCREMENTAL_HOLDOUT_SAMPLE - kept]
+                holdout_sample_X.append(take[self.feature_columns])
+                holdout_sample_y.append(pd.Series(y_values[holdout][:len(take)], index=take.index))
+                kept += len(take)
+
+        self.holdout_X = pd.concat(holdout_sample_X) if holdout_sample_X else None
+        self.holdout_y = pd.concat(holdout_sample_y) if holdout_sample_y else None
+        self.stats = {
+            'rows_seen': n_rows,
+            'train_rows': n_train,
+            'holdout_rows': n_holdout,
+            'n_chunks': n_chunks,
+            'chunk_size': self.chunk_size,
+            'epochs': self.epochs,
+            'epoch_scores': epoch_scores,
+            'cluster_features': self.transformer.n_clusters if self.transformer.kmeans_ is not None else 0,
+            'hashed_categorical_columns': self.transformer.categorical_columns
+        }
+        return {name: metrics for name, metrics in final_metrics.items()}
+
+    def _new_metrics(self):
+        if self.task == 'regression':
+            return StreamingRegressionMetrics()
+        return StreamingClassificationMetrics(len(self.target_encoder.classes_))
+
+    def _encode_target(self, y: pd.Series) -> np.ndarray:
+        if self.target_encoder is None:
+            return y.to_numpy(dtype=np.float64)
+        return self.target_encoder.transform(y.to_numpy())
+
+    def get_pipelines(self) -> Dict[str, Pipeline]:
+        """Fitted models wrapped with their feature transformer so they accept raw rows."""
+        pipelines = {}
+        for name, model in self.models.items():
+            pipelines[name] = Pipeline([
+                ('features', self.transformer.with_output(self._model_output(name))),
+                ('model', model)
+            ])
+        return pipelines
+
+    def get_feature_importance(self, name: str) -> Optional[List[Dict[str, Any]]]:
+        """Absolute linear coefficients over the transformed feature space."""
+        model = self.models.get(name)
+        if not hasattr(model, 'coef_'):
+            return None
+        coef = np.abs(np.atleast_2d(model.coef_)).mean(axis=0)
+        names = self.transformer.get_feature_names_out()
+        importance = [
+            {'feature': str(feature), 'importance': float(value)}
+            for feature, value in zip(names, coef)
+        ]
+        importance.sort(key=lambda x: x['importance'], reverse=True)
+        return importance
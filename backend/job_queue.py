@@ -0,0 +1,462 @@
+"""
+Durable job queue for long-running ML work
+Jobs are persisted in Redis, or in SQLite when Redis is not available, so they survive API restarts and are executed by separate worker processes
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+# Conditional Redis import
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from session_storage import REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD
+
+# Queue configuration
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "auto")  # auto, redis or sqlite
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "/tmp/ml_jobs/jobs.db")
+JOB_MAX_RETRIES = int(os.getenv("JOB_MAX_RETRIES", "2"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))  # Renewed by the worker while a job runs
+JOB_RETENTION_HOURS = int(os.getenv("JOB_RETENTION_HOURS", "24"))
+
+# Lower value runs first; equal priorities run in submission order
+PRIORITY_PREMIUM = 0
+PRIORITY_STANDARD = 10
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+@dataclass
+class Job:
+    """A unit of queued work and its lifecycle state."""
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    priority: int = PRIORITY_STANDARD
+    user_id: Optional[str] = None
+    session_id: Optional[str] = None
+    status: str = QUEUED
+    attempts: int = 0
+    max_retries: int = JOB_MAX_RETRIES
+    cancel_requested: bool = False
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Job':
+        return cls(**data)
+
+    def public_view(self) -> Dict[str, Any]:
+        """Status fields safe to return to the job owner."""
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'session_id': self.session_id,
+            'status': self.status,
+            'priority': 'premium' if self.priority <= PRIORITY_PREMIUM else 'standard',
+            'attempts': self.attempts,
+            'max_retries': self.max_retries,
+            'cancel_requested': self.cancel_requested,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+            'result': self.result
+        }
+
+
+class JobQueue:
+    """Abstract base class for job queues.
+
+    Workers ``claim`` the highest-priority queued job, which moves it to
+    ``running`` under a lease. Outcomes are recorded only by the worker that
+    still holds the lease. A job whose lease runs out (its worker died) is
+    failed by ``requeue_expired`` so it is retried like any other failure.
+    """
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], priority: int = PRIORITY_STANDARD,
+                user_id: Optional[str] = None, session_id: Optional[str] = None,
+                max_retries: int = JOB_MAX_RETRIES) -> Job:
+        job = Job(
+            id=uuid.uuid4().hex, kind=kind, payload=payload, priority=priority,
+            user_id=user_id, session_id=session_id, max_retries=max_retries
+        )
+        self._insert(job)
+        logger.info(f"Queued {kind} job {job.id} (priority {priority}) for session {session_id}")
+        return job
+
+    @staticmethod
+    def _owned(job: Job, worker_id: str) -> bool:
+        return job.status == RUNNING and job.worker_id == worker_id
+
+    @staticmethod
+    def _record_failure(job: Job, error: str, retry: bool) -> Job:
+        job.error = error
+        job.worker_id = None
+        job.lease_expires_at = None
+        if retry and not job.cancel_requested and job.attempts <= job.max_retries:
+            job.status = QUEUED
+            logger.warning(f"Job {job.id} attempt {job.attempts} failed, retrying: {error}")
+        else:
+            job.status = CANCELLED if job.cancel_requested else FAILED
+            job.finished_at = time.time()
+            logger.error(f"Job {job.id} failed after {job.attempts} attempts: {error}")
+        return job
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> Optional[Job]:
+        """Record a failed attempt; the job is requeued while retries remain.
+
+        A no-op (returns None) unless the job is still running under ``worker_id``'s
+        lease, so a worker whose lease lapsed cannot touch a later attempt.
+        """
+        def apply(job: Job) -> Optional[Job]:
+            if not self._owned(job, worker_id):
+                return None
+            return self._record_failure(job, error, retry)
+        return self._update(job_id, apply)
+
+    def complete(self, job_id: str, worker_id: str, result: Optional[Dict[str, Any]] = None) -> Optional[Job]:
+        """Record a successful attempt; a no-op (returns None) unless ``worker_id`` still holds the lease."""
+        def apply(job: Job) -> Optional[Job]:
+            if not self._owned(job, worker_id):
+                return None
+            job.status = SUCCEEDED
+            job.result = result
+            job.error = None
+            job.finished_at = time.time()
+            job.lease_expires_at = None
+            return job
+        return self._update(job_id, apply)
+
+    def _expire(self, job_id: str) -> Optional[Job]:
+        """Fail a running job whose lease has run out, re-checked atomically with the update."""
+        def apply(job: Job) -> Optional[Job]:
+            if job.status != RUNNING or job.lease_expires_at is None or job.lease_expires_at >= time.time():
+                return None
+            return self._record_failure(job, "Worker stopped responding (lease expired)", True)
+        return self._update(job_id, apply)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job immediately; a running job is flagged for its worker to stop."""
+        def apply(job: Job) -> Job:
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished_at = time.time()
+            elif job.status == RUNNING:
+                job.cancel_requested = True
+            return job
+        return self._update(job_id, apply)
+
+    def mark_cancelled(self, job_id: str, worker_id: str) -> Optional[Job]:
+        """Called by the worker once a running job has actually been stopped."""
+        def apply(job: Job) -> Optional[Job]:
+            if not self._owned(job, worker_id):
+                return None
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            job.lease_expires_at = None
+            return job
+        return self._update(job_id, apply)
+
+    def renew_lease(self, job_id: str, worker_id: str) -> Optional[Job]:
+        def apply(job: Job) -> Job:
+            if job.status == RUNNING and job.worker_id == worker_id:
+                job.lease_expires_at = time.time() + JOB_LEASE_SECONDS
+            return job
+        return self._update(job_id, apply)
+
+    def _start(self, job: Job, worker_id: str) -> Job:
+        job.status = RUNNING
+        job.attempts += 1
+        job.worker_id = worker_id
+        job.started_at = time.time()
+        job.lease_expires_at = job.started_at + JOB_LEASE_SECONDS
+        return job
+
+    # Backend-specific operations
+    def _insert(self, job: Job):
+        raise NotImplementedError
+
+    def _update(self, job_id: str, apply: Callable[[Job], Optional[Job]]) -> Optional[Job]:
+        """Atomically read, modify and write a job; ``apply`` returning None leaves it untouched."""
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Job]:
+        raise NotImplementedError
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        raise NotImplementedError
+
+    def requeue_expired(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def cleanup_finished(self, max_age_hours: int = JOB_RETENTION_HOURS) -> int:
+        raise NotImplementedError
+
+
+class RedisJobQueue(JobQueue):
+    """Redis-backed queue: job records as JSON strings, pending ids in a sorted set scored by priority then age."""
+
+    JOB_KEY = "job:{}"
+    QUEUED_KEY = "jobs:queued"
+    RUNNING_KEY = "jobs:running"
+    FINISHED_KEY = "jobs:finished"
+
+    def __init__(self):
+        try:
+            self.redis_client = redis.Redis(
+                host=REDIS_HOST,
+                port=REDIS_PORT,
+                db=REDIS_DB,
+                password=REDIS_PASSWORD,
+                decode_responses=True
+            )
+            self.redis_client.ping()
+            self.backend = 'redis'
+            logger.info("✅ Redis job queue initialized")
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis job queue: {e}")
+            raise
+
+    @staticmethod
+    def _score(job: Job) -> float:
+        # Priority dominates; submission time orders jobs within a priority
+        return job.priority * 1e10 + job.created_at
+
+    def _save(self, job: Job, pipe: Any):
+        pipe.set(self.JOB_KEY.format(job.id), json.dumps(job.to_dict()))
+        pipe.zrem(self.QUEUED_KEY, job.id)
+        pipe.zrem(self.RUNNING_KEY, job.id)
+        pipe.zrem(self.FINISHED_KEY, job.id)
+        if job.status == QUEUED:
+            pipe.zadd(self.QUEUED_KEY, {job.id: self._score(job)})
+        elif job.status == RUNNING:
+            pipe.zadd(self.RUNNING_KEY, {job.id: job.lease_expires_at or time.time()})
+        else:
+            pipe.zadd(self.FINISHED_KEY, {job.id: job.finished_at or time.time()})
+
+    def _insert(self, job: Job):
+        pipe = self.redis_client.pipeline()
+        self._save(job, pipe)
+        pipe.execute()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        data = self.redis_client.get(self.JOB_KEY.format(job_id))
+        return Job.from_dict(json.loads(data)) if data else None
+
+    def _update(self, job_id: str, apply: Callable[[Job], Optional[Job]]) -> Optional[Job]:
+        key = self.JOB_KEY.format(job_id)
+        with self.redis_client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    data = pipe.get(key)
+                    if not data:
+                        pipe.unwatch()
+                        return None
+                    job = apply(Job.from_dict(json.loads(data)))
+                    if job is None:
+                        pipe.unwatch()
+                        return None
+                    pipe.multi()
+                    self._save(job, pipe)
+                    pipe.execute()
+                    return job
+                except redis.WatchError:
+                    continue
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        # ZPOPMIN is atomic, so two workers never receive the same id
+        popped = self.redis_client.zpopmin(self.QUEUED_KEY)
+        if not popped:
+            return None
+        job_id = popped[0][0]
+
+        def apply(job: Job) -> Job:
+            return self._start(job, worker_id) if job.status == QUEUED else job
+        job = self._update(job_id, apply)
+        if job is None or job.worker_id != worker_id or job.status != RUNNING:
+            return None
+        return job
+
+    def requeue_expired(self) -> int:
+        expired = self.redis_client.zrangebyscore(self.RUNNING_KEY, 0, time.time())
+        return sum(self._expire(job_id) is not None for job_id in expired)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': self.backend,
+            'queued': int(self.redis_client.zcard(self.QUEUED_KEY)),
+            'running': int(self.redis_client.zcard(self.RUNNING_KEY))
+        }
+
+    def cleanup_finished(self, max_age_hours: int = JOB_RETENTION_HOURS) -> int:
+        cutoff = time.time() - max_age_hours * 3600
+        old = self.redis_client.zrangebyscore(self.FINISHED_KEY, 0, cutoff)
+        if old:
+            pipe = self.redis_client.pipeline()
+            for job_id in old:
+                pipe.delete(self.JOB_KEY.format(job_id))
+            pipe.zrem(self.FINISHED_KEY, *old)
+            pipe.execute()
+        return len(old)
+
+
+class SQLiteJobQueue(JobQueue):
+    """SQLite-backed queue (fallback when Redis is not available).
+
+    Claims run inside ``BEGIN IMMEDIATE`` transactions, so concurrent worker
+    processes on the same host never take the same job.
+    """
+
+    def __init__(self, db_path: str = JOB_QUEUE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.backend = 'sqlite'
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, status TEXT NOT NULL, priority INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, lease_expires_at REAL, finished_at REAL, data TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority, created_at)")
+        logger.info(f"✅ SQLite job queue initialized at {self.db_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; autocommit mode with explicit transactions
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(job: Job) -> tuple:
+        return (job.status, job.priority, job.created_at, job.lease_expires_at,
+                job.finished_at, json.dumps(job.to_dict()), job.id)
+
+    def _insert(self, job: Job):
+        self._connect().execute(
+            "INSERT INTO jobs (status, priority, created_at, lease_expires_at, finished_at, data, id)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self._row(job)
+        )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connect().execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_dict(json.loads(row[0])) if row else None
+
+    def _update(self, job_id: str, apply: Callable[[Job], Optional[Job]]) -> Optional[Job]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                return None
+            job = apply(Job.from_dict(json.loads(row[0])))
+            if job is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, priority = ?, created_at = ?, lease_expires_at = ?,"
+                " finished_at = ?, data = ? WHERE id = ?",
+                self._row(job)
+            )
+            conn.execute("COMMIT")
+            return job
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data FROM jobs WHERE status = ? ORDER BY priority, created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                return None
+            job = self._start(Job.from_dict(json.loads(row[0])), worker_id)
+            conn.execute(
+                "UPDATE jobs SET status = ?, priority = ?, created_at = ?, lease_expires_at = ?,"
+                " finished_at = ?, data = ? WHERE id = ?",
+                self._row(job)
+            )
+            conn.execute("COMMIT")
+            return job
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def requeue_expired(self) -> int:
+        rows = self._connect().execute(
+            "SELECT id FROM jobs WHERE status = ? AND lease_expires_at < ?", (RUNNING, time.time())
+        ).fetchall()
+        return sum(self._expire(job_id) is not None for (job_id,) in rows)
+
+    def stats(self) -> Dict[str, Any]:
+        counts = dict(self._connect().execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE status IN (?, ?) GROUP BY status", (QUEUED, RUNNING)
+        ).fetchall())
+        return {
+            'backend': self.backend,
+            'queued': int(counts.get(QUEUED, 0)),
+            'running': int(counts.get(RUNNING, 0))
+        }
+
+    def cleanup_finished(self, max_age_hours: int = JOB_RETENTION_HOURS) -> int:
+        cutoff = time.time() - max_age_hours * 3600
+        cursor = self._connect().execute(
+            f"DELETE FROM jobs WHERE status IN ({','.join('?' * len(FINISHED_STATES))}) AND finished_at < ?",
+            (*FINISHED_STATES, cutoff)
+        )
+        return cursor.rowcount
+
+
+# Factory function to create appropriate queue
+def create_job_queue() -> JobQueue:
+    """Create job queue instance based on availability"""
+    if JOB_QUEUE_BACKEND != 'sqlite' and REDIS_AVAILABLE:
+        try:
+            return RedisJobQueue()
+        except Exception as e:
+            logger.warning(f"Redis connection failed ({e}), falling back to SQLite job queue")
+    return SQLiteJobQueue()
+
+
+# Global queue instance
+job_queue = create_job_queue()
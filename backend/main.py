@@ -30,15 +30,16 @@ except ImportError:
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse, Response
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Tuple, Iterator, Set, Awaitable
 import csv
 import pandas as pd
 import numpy as np
 import io
 import json
 import uuid
+import time
 import asyncio
 from datetime import datetime
 import logging
@@ -89,6 +90,21 @@ from security_utils import (
 )
 from memory_utils import MemoryManager, memory_manager, df_processor
 from session_storage import session_storage, SessionMetadata, session_cleanup_task
+from model_registry import model_registry
+from explanation_service import explanation_service
+from incremental_training import STREAMABLE_EXTENSIONS
+from dataset_store import dataset_store
+from job_queue import job_queue, PRIORITY_PREMIUM, PRIORITY_STANDARD, FINISHED_STATES
+from ml_executor import ml_executor, ExecutorSaturated
+from progress_events import progress_store, ProgressTracker, TERMINAL_EVENTS, PROGRESS_POLL_INTERVAL
+from training_cache import training_cache, dataset_fingerprint, training_cache_key
+from embedding_cache import embedding_cache
+from plot_sampling import VIZ_MAX_POINTS
+from response_encoding import FastJSONResponse, dumps as encode_json, strip_unencodable
+from training_worker import (
+    PREPROCESSED_MATRIX, resolve_training_frame, compute_explanations, create_training_workflow, cacheable_results,
+    record_job_status, start_worker_processes, stop_worker_processes
+)
 
 # Import all ML frameworks
 from regression.enhanced_regression_framework import RegressionWorkflow, RegressionConfig
@@ -151,7 +167,8 @@ except Exception as e:
 app = FastAPI(
     title="EvolvIQ ML Tools API",
     description="Interactive Machine Learning Analysis API with Enterprise Security",
-    version="3.0.0"
+    version="3.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Root endpoint for health checks
@@ -237,6 +254,15 @@ async def security_middleware(request: Request, call_next):
     
     return response
 
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    """Backpressure: the ML executor is full, so ask the client to retry later"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy with other analyses. Please retry shortly.", "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # Mount WebSocket server
 if websocket_app:
     app.mount("/socket.io", websocket_app)
@@ -257,6 +283,29 @@ if guide_router:
     app.include_router(guide_router)
     logger.info("✅ Guide registry router mounted")
 
+# Training workers started with the API process (0 disables them)
+JOB_EMBEDDED_WORKERS = int(os.getenv("JOB_EMBEDDED_WORKERS", "1"))
+embedded_workers: List[Any] = []
+
+# Fire-and-forget tasks stay referenced until they finish; the event loop only keeps weak references
+running_background_tasks: Set[asyncio.Future] = set()
+
+def _forget_background_task(task: asyncio.Future):
+    running_background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task failed: {task.exception()}")
+
+def spawn_background(awaitable: Awaitable[Any]) -> asyncio.Future:
+    """Run ``awaitable`` in the background, holding a reference and logging its failure."""
+    task = asyncio.ensure_future(awaitable)
+    running_background_tasks.add(task)
+    task.add_done_callback(_forget_background_task)
+    return task
+
+# Server-sent progress streams
+PROGRESS_STREAM_MAX_SECONDS = int(os.getenv("PROGRESS_STREAM_MAX_SECONDS", "3600"))
+PROGRESS_HEARTBEAT_SECONDS = 15
+
 # Startup Events
 @app.on_event("startup")
 async def startup_validation():
@@ -277,9 +326,25 @@ async def startup_validation():
         logger.warning("Some features will be disabled")
     
     # Start background tasks
-    asyncio.create_task(session_cleanup_task())
-    asyncio.create_task(cleanup_old_files_task())
+    spawn_background(session_cleanup_task())
+    spawn_background(cleanup_old_files_task())
     await rate_limiter.start_cleanup_task()
+    
+    # Relay workflow progress events into per-session Socket.IO rooms
+    if websocket_server:
+        websocket_server.session_authorizer = authorize_progress_subscription
+        spawn_background(websocket_server.relay_progress())
+    
+    # Training workers run as separate processes; set JOB_EMBEDDED_WORKERS=0 when they are deployed on their own
+    if JOB_EMBEDDED_WORKERS > 0:
+        embedded_workers.extend(start_worker_processes(JOB_EMBEDDED_WORKERS))
+
+@app.on_event("shutdown")
+async def stop_embedded_workers():
+    """Stop embedded training workers (their in-flight jobs are requeued) and the ML executor"""
+    stop_worker_processes(embedded_workers)
+    embedded_workers.clear()
+    ml_executor.shutdown(wait=False)
 
 async def cleanup_old_files_task():
     """Periodic cleanup of old uploaded files"""
@@ -287,7 +352,13 @@ async def cleanup_old_files_task():
         try:
             await asyncio.sleep(3600)  # Run every hour
             secure_storage.cleanup_old_files(max_age_hours=24)
-            logger.info("Cleaned up old uploaded files")
+            model_registry.cleanup_old_models(max_age_hours=24)
+            dataset_store.cleanup_old_datasets(max_age_hours=24)
+            job_queue.cleanup_finished(max_age_hours=24)
+            progress_store.cleanup()
+            training_cache.cleanup()
+            embedding_cache.cleanup()
+            logger.info("Cleaned up old uploaded files, stored models, datasets, finished jobs, progress events, cached training results and cached embeddings")
         except Exception as e:
             logger.error(f"Error in cleanup task: {e}")
 
@@ -321,6 +392,9 @@ class TrainingConfig(BaseModel):
     models_to_include: List[str] = Field(default=['linear', 'ridge', 'lasso', 'elastic_net', 'random_forest'])
     hyperparameter_tuning: bool = Field(default=True)
     cv_folds: int = Field(default=5, ge=3, le=10)
+    training_mode: str = Field(default="batch", description="'batch' or 'incremental' (chunked partial_fit training)")
+    chunk_size: int = Field(default=50000, ge=1000, le=500000)
+    incremental_epochs: int = Field(default=3, ge=1, le=20)
 
 class PredictionRequest(BaseModel):
     data: Dict[str, Union[float, int, str]]
@@ -328,6 +402,7 @@ class PredictionRequest(BaseModel):
 class TrainingRequest(BaseModel):
     config: Optional[TrainingConfig] = TrainingConfig()
     target_column: Optional[str] = None
+    force_retrain: bool = Field(default=False, description="Train even if identical results are cached")
 
 class PreprocessingRequest(BaseModel):
     config: PreprocessingConfig
@@ -340,9 +415,18 @@ class ClusteringAnalyzeRequest(BaseModel):
     algorithms: Optional[List[str]] = None
     minClusters: Optional[int] = 2
     maxClusters: Optional[int] = 8
-    scalingMethod: Optional[str] = 'standard'
+    scalingMethod: Optional[str] = Field('standard', pattern='^(standard|minmax|robust|none)$')
     dimensionalityReduction: Optional[str] = 'pca'
     nComponents: Optional[int] = 2
+    silhouetteMode: Optional[str] = Field('auto', pattern='^(auto|exact|sampled)$')
+    silhouetteSampleSize: Optional[int] = Field(5000, ge=200, le=50000)
+    fitMode: Optional[str] = Field('auto', pattern='^(auto|full|coreset)$')
+    coresetSize: Optional[int] = Field(20000, ge=1000, le=200000)
+    neighborGraph: Optional[str] = Field('auto', pattern='^(auto|tree|random_projection)$')
+    tsnePerplexity: Optional[float] = Field(30.0, ge=2, le=200)
+    tsneMaxIter: Optional[int] = Field(500, ge=250, le=5000)
+    tsneMaxSamples: Optional[int] = Field(10000, ge=1000, le=100000)
+    tsneBackend: Optional[str] = Field('auto', pattern='^(auto|opentsne|sklearn)$')
 
 # PREPROCESS ENDPOINT
 @app.post("/api/{tool_type}/preprocess")
@@ -368,11 +452,15 @@ async def preprocess_data_endpoint(
         if tool_type not in ['regression', 'classification']:
             raise HTTPException(status_code=400, detail="Preprocessing not supported for this tool")
 
-        # Apply preprocessing
-        if tool_type == 'regression':
-            result = workflow.preprocess_data(data, request.target_column)
-        else:
+        # Apply preprocessing on the ML executor; the preprocessed matrix is kept on disk
+        # and the session holds only metadata and a preview
+        def run_preprocessing() -> Dict[str, Any]:
             result = workflow.preprocess_data(data, request.target_column)
+            if result.get('success') and getattr(workflow, 'processed_matrix', None) is not None:
+                result['matrix'] = dataset_store.save(session_id, PREPROCESSED_MATRIX, workflow.processed_matrix)
+            return result
+
+        result = await ml_executor.run(run_preprocessing)
 
         # Save partial results in session
         session_data['status'] = 'preprocessed'
@@ -385,11 +473,43 @@ async def preprocess_data_endpoint(
             "rate_limit": rate_limit
         }
 
+    except (HTTPException, ExecutorSaturated):
+        raise
     except Exception as e:
         logger.error(f"Preprocessing failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # EDA ANALYZE ENDPOINT
+def run_eda_analysis(data: pd.DataFrame, session_id: str) -> Dict[str, Any]:
+    """Quality, univariate, bivariate analyses and insights (blocking; runs on the ML executor)"""
+    tracker = ProgressTracker(session_id, 'eda').start({'rows': len(data), 'columns': len(data.columns)})
+    try:
+        workflow = EDAWorkflow(EDAConfig())
+        quality = workflow.perform_quality_assessment(data)
+        tracker.update('stage_complete', 0.25, {'stage': 'quality', 'assessment': quality.get('assessment')})
+        univariate = workflow.perform_univariate_analysis(data)
+        tracker.update('stage_complete', 0.6, {'stage': 'univariate'})
+        bivariate = workflow.perform_bivariate_analysis(data)
+        tracker.update('stage_complete', 0.85, {'stage': 'bivariate'})
+        insights = workflow.generate_insights(data, {
+            'assessment': quality.get('assessment'),
+            'numeric_analysis': univariate.get('numeric_analysis'),
+            'categorical_analysis': univariate.get('categorical_analysis'),
+            'correlation_analysis': bivariate.get('correlation_analysis')
+        })
+    except Exception as e:
+        tracker.failed(str(e))
+        raise
+    tracker.done({'stage': 'insights'})
+
+    return {
+        "quality": quality,
+        "univariate": univariate,
+        "bivariate": bivariate,
+        "insights": insights,
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.post("/api/eda/analyze")
 async def eda_analyze(
     request: EDAAnalyzeRequest,
@@ -405,25 +525,8 @@ async def eda_analyze(
 
         data = session_data['dataframe']
 
-        # Run analyses
-        workflow = EDAWorkflow(EDAConfig())
-        quality = workflow.perform_quality_assessment(data)
-        univariate = workflow.perform_univariate_analysis(data)
-        bivariate = workflow.perform_bivariate_analysis(data)
-        insights = workflow.generate_insights(data, {
-            'assessment': quality.get('assessment'),
-            'numeric_analysis': univariate.get('numeric_analysis'),
-            'categorical_analysis': univariate.get('categorical_analysis'),
-            'correlation_analysis': bivariate.get('correlation_analysis')
-        })
-
-        analysis = {
-            "quality": quality,
-            "univariate": univariate,
-            "bivariate": bivariate,
-            "insights": insights,
-            "timestamp": datetime.now().isoformat()
-        }
+        # Run analyses on the ML executor
+        analysis = await ml_executor.run(run_eda_analysis, data, session_id)
 
         # Save to session
         session_data['status'] = 'analyzed'
@@ -435,11 +538,129 @@ async def eda_analyze(
             "rate_limit": rate_limit
         }
 
+    except (HTTPException, ExecutorSaturated):
+        raise
     except Exception as e:
         logger.error(f"EDA analyze failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # CLUSTERING ANALYZE ENDPOINT
+def run_clustering_analysis(data: pd.DataFrame, cfg: ClusteringConfig, session_id: str) -> Dict[str, Any]:
+    """Preprocessing, optimal K search, clustering and chart data (blocking; runs on the ML executor)"""
+    tracker = ProgressTracker(session_id, 'clustering').start({'algorithms': cfg.algorithms_to_include})
+    try:
+        analysis = build_clustering_analysis(data, cfg, tracker, session_id)
+    except Exception as e:
+        tracker.failed(e.detail if isinstance(e, HTTPException) else str(e))
+        raise
+    tracker.done({'best_algorithm': analysis['best_algorithm'], 'best_score': analysis['best_score']})
+    return analysis
+
+def build_clustering_analysis(data: pd.DataFrame, cfg: ClusteringConfig, tracker: ProgressTracker,
+                              session_id: str) -> Dict[str, Any]:
+    """Body of run_clustering_analysis, reporting each stage to the tracker"""
+    workflow = ClusteringWorkflow(cfg)
+
+    # Preprocess
+    pre = workflow.preprocess_data(data)
+    if not pre.get('success'):
+        raise HTTPException(status_code=400, detail=f"Preprocessing failed: {pre.get('error')}")
+    tracker.update('preprocessed', 0.05, {'processed_shape': list(pre['processed_shape'])})
+
+    # Compute optimization curves
+    workflow.progress_callback = tracker.scoped(0.05, 0.5)
+    optimal = workflow.find_optimal_clusters()
+
+    # Perform clustering with the recommended K (the sweep above is not repeated)
+    workflow.progress_callback = tracker.scoped(0.5, 0.95)
+    clusters = workflow.perform_clustering(optimal['recommended_clusters'] if optimal.get('success') else None)
+
+    # Build optimization data for charts
+    optimization_data = []
+    if optimal.get('success'):
+        k_values = optimal['silhouette_method']['k_values']
+        sil_scores = optimal['silhouette_method']['silhouette_scores']
+        sil_cis = optimal['silhouette_method'].get('confidence_intervals') or []
+        elbow_k = optimal['elbow_method']['k_values']
+        elbow_vals = optimal['elbow_method']['distortions']
+        # Merge on k index (they should align by construction)
+        for i, k in enumerate(k_values):
+            optimization_data.append({
+                'k': k,
+                'silhouette': float(sil_scores[i]) if i < len(sil_scores) else 0.0,
+                'silhouette_ci': sil_cis[i] if i < len(sil_cis) else None,
+                'elbow': float(elbow_vals[i+1]) if (i+1) < len(elbow_vals) else float(elbow_vals[min(len(elbow_vals)-1, i)])
+            })
+
+    # Build algorithm comparison list
+    comparison = []
+    best_algo_key = clusters.get('best_algorithm')
+    for key, result in clusters.get('clustering_results', {}).items():
+        evalm = result.get('evaluation', {}) if isinstance(result, dict) else {}
+        comparison.append({
+            'algorithm': result.get('name', key),
+            'silhouette': float(evalm.get('silhouette_score', 0) or 0),
+            'silhouette_ci': evalm.get('silhouette_ci'),
+            'silhouette_exact': evalm.get('silhouette_exact'),
+            'calinski': float(evalm.get('calinski_harabasz_score', 0) or 0),
+            'davies': float(evalm.get('davies_bouldin_score', 0) or 0),
+            'n_clusters': int(result.get('n_clusters', 0) or 0),
+            'n_noise': int(evalm.get('n_noise_points', 0) or 0),
+            'variant': result.get('variant'),
+            'downsampled': bool(result.get('downsampled', False)),
+            'skipped': bool(result.get('skipped', False))
+        })
+
+    # Choose labels for best algorithm
+    best_algo_key = clusters.get('best_algorithm')
+    chosen_labels = None
+    if best_algo_key and clusters['clustering_results'].get(best_algo_key):
+        chosen_labels = clusters['clustering_results'][best_algo_key].get('labels')
+    if chosen_labels is None:
+        # pick first available labels if best missing
+        for v in clusters['clustering_results'].values():
+            if isinstance(v, dict) and v.get('labels') is not None:
+                chosen_labels = v['labels']
+                break
+
+    # Per-row labels of every algorithm go to the dataset store as packed arrays; only summaries stay inline
+    labels_summary = dataset_store.save_labels(session_id, {
+        key: result['labels'] for key, result in clusters.get('clustering_results', {}).items()
+        if isinstance(result, dict) and result.get('labels') is not None
+    }, default=best_algo_key)
+
+    # Fitted preprocessing and labelled reference rows, so predict-batch assigns new rows without refitting
+    try:
+        reference_labels = workflow.get_reference_labels()
+        if reference_labels and best_algo_key in reference_labels:
+            model_registry.save(session_id, 'clustering', reference_labels, best_algo_key,
+                                workflow.get_serving_state())
+    except Exception as save_err:
+        logger.warning(f"Could not persist clustering preprocessing for session {session_id}: {save_err}")
+
+    # Scatter of the preprocessing projection, downsampled per cluster (sizes stay the true counts)
+    viz_data, viz_summary = [], None
+    try:
+        viz = workflow.get_visualization_data(chosen_labels)
+        viz_data, viz_summary = viz['points'], viz['summary']
+    except Exception as viz_err:
+        logger.warning(f"Clustering viz creation failed: {viz_err}")
+
+    analysis = {
+        'optimization_data': optimization_data,
+        'clustering_results': comparison,
+        'visualization_data': viz_data,
+        'visualization_summary': viz_summary,
+        'recommended_k': optimal['silhouette_method'].get('optimal_clusters') if optimal.get('success') else None,
+        'best_algorithm': clusters.get('best_algorithm'),
+        'best_score': clusters.get('best_score'),
+        'plan': clusters.get('plan'),
+        # Rows are paged from /api/clustering/labels/{session_id}
+        'labels_summary': labels_summary
+    }
+
+    return analysis
+
 @app.post("/api/clustering/analyze")
 async def clustering_analyze(
     request: ClusteringAnalyzeRequest,
@@ -464,105 +685,33 @@ async def clustering_analyze(
             ]),
             scaling_method=request.scalingMethod or 'standard',
             dimensionality_reduction=request.dimensionalityReduction or 'pca',
-            n_components=request.nComponents or 2
+            n_components=request.nComponents or 2,
+            silhouette_mode=request.silhouetteMode or 'auto',
+            silhouette_sample_size=request.silhouetteSampleSize or 5000,
+            fit_mode=request.fitMode or 'auto',
+            coreset_size=request.coresetSize or 20000,
+            neighbor_graph_method=request.neighborGraph or 'auto',
+            tsne_perplexity=request.tsnePerplexity or 30.0,
+            tsne_max_iter=request.tsneMaxIter or 500,
+            tsne_max_samples=request.tsneMaxSamples or 10000,
+            tsne_backend=request.tsneBackend or 'auto'
         )
 
-        workflow = ClusteringWorkflow(cfg)
-
-        # Preprocess
-        pre = workflow.preprocess_data(data)
-        if not pre.get('success'):
-            raise HTTPException(status_code=400, detail=f"Preprocessing failed: {pre.get('error')}")
-
-        # Compute optimization curves
-        optimal = workflow.find_optimal_clusters()
-
-        # Perform clustering with recommended clusters
-        clusters = workflow.perform_clustering()
-
-        # Build optimization data for charts
-        optimization_data = []
-        if optimal.get('success'):
-            k_values = optimal['silhouette_method']['k_values']
-            sil_scores = optimal['silhouette_method']['silhouette_scores']
-            elbow_k = optimal['elbow_method']['k_values']
-            elbow_vals = optimal['elbow_method']['distortions']
-            # Merge on k index (they should align by construction)
-            for i, k in enumerate(k_values):
-                optimization_data.append({
-                    'k': k,
-                    'silhouette': float(sil_scores[i]) if i < len(sil_scores) else 0.0,
-                    'elbow': float(elbow_vals[i+1]) if (i+1) < len(elbow_vals) else float(elbow_vals[min(len(elbow_vals)-1, i)])
-                })
-
-        # Build algorithm comparison list
-        comparison = []
-        best_algo_key = clusters.get('best_algorithm')
-        for key, result in clusters.get('clustering_results', {}).items():
-            evalm = result.get('evaluation', {}) if isinstance(result, dict) else {}
-            comparison.append({
-                'algorithm': result.get('name', key),
-                'silhouette': float(evalm.get('silhouette_score', 0) or 0),
-                'calinski': float(evalm.get('calinski_harabasz_score', 0) or 0),
-                'davies': float(evalm.get('davies_bouldin_score', 0) or 0),
-                'n_clusters': int(result.get('n_clusters', 0) or 0),
-                'n_noise': int(evalm.get('n_noise_points', 0) or 0)
-            })
-
-        # Choose labels for best algorithm
-        best_algo_key = clusters.get('best_algorithm')
-        chosen_labels = None
-        if best_algo_key and clusters['clustering_results'].get(best_algo_key):
-            chosen_labels = clusters['clustering_results'][best_algo_key].get('labels')
-        if chosen_labels is None:
-            # pick first available labels if best missing
-            for v in clusters['clustering_results'].values():
-                if isinstance(v, dict) and v.get('labels') is not None:
-                    chosen_labels = v['labels']
-                    break
-
-        # Create simple 2D visualization data using PCA on processed data
-        viz_data = []
-        try:
-            import pandas as pd
-            from sklearn.decomposition import PCA
-            proc = workflow.processed_data
-            pca = PCA(n_components=2, random_state=cfg.random_state)
-            coords = pca.fit_transform(proc)
-            labels = chosen_labels or [0] * len(coords)
-            # Build scatter points with simple per-cluster counts
-            import collections
-            counts = collections.Counter(labels)
-            for i, (x, y) in enumerate(coords):
-                viz_data.append({
-                    'x': float(x),
-                    'y': float(y),
-                    'cluster': int(labels[i]) if isinstance(labels, list) else int(labels),
-                    'size': int(counts.get(labels[i], 1))
-                })
-        except Exception as viz_err:
-            logger.warning(f"Clustering viz creation failed: {viz_err}")
-
-        analysis = {
-            'optimization_data': optimization_data,
-            'clustering_results': comparison,
-            'visualization_data': viz_data,
-            'recommended_k': optimal['silhouette_method'].get('optimal_clusters') if optimal.get('success') else None,
-            'best_algorithm': clusters.get('best_algorithm'),
-            'best_score': clusters.get('best_score'),
-            'labels': chosen_labels or []
-        }
+        # Preprocess, optimize K, cluster and build chart data on the ML executor
+        analysis = await ml_executor.run(run_clustering_analysis, data, cfg, session_id)
 
         # Save in session
         session_data['status'] = 'clustering_complete'
         session_data['clustering_analysis'] = analysis
         await session_storage.save_session(session_id, session_data)
 
-        return {
+        return FastJSONResponse({
             'analysis': analysis,
             'rate_limit': rate_limit
-        }
+        })
 
+    except (HTTPException, ExecutorSaturated):
+        raise
     except Exception as e:
         logger.error(f"Clustering analyze failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -600,9 +749,14 @@ class CustomerPortalResponse(BaseModel):
 async def get_session_workflow(
     session_id: str, 
     tool_type: str = 'regression',
-    user_id: Optional[str] = None
+    user_id: Optional[str] = None,
+    restore_model: bool = False
 ) -> Any:
-    """Get workflow for session with persistent storage"""
+    """Get workflow for session with persistent storage.
+    
+    With restore_model=True, the session's trained models are loaded from the
+    model registry so the workflow can serve predictions and exports.
+    """
     # Try to load from persistent storage
     session_data = await session_storage.get_session(session_id)
     
@@ -632,6 +786,12 @@ async def get_session_workflow(
     else:
         raise ValueError(f"Unknown tool type: {tool_type}")
     
+    if restore_model and tool_type in ['regression', 'classification', 'clustering']:
+        try:
+            model_registry.attach(workflow, session_id)
+        except Exception as e:
+            logger.warning(f"Could not restore trained model for session {session_id}: {e}")
+    
     return workflow
 
 async def save_uploaded_file(
@@ -650,6 +810,26 @@ async def save_uploaded_file(
         logger.error(f"Failed to save file: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+OUT_OF_CORE_SAMPLE_ROWS = int(os.getenv("OUT_OF_CORE_SAMPLE_ROWS", "10000"))
+
+def exceeds_dataframe_rows(file_path: str) -> bool:
+    """Count lines of a delimited upload without parsing it"""
+    if Path(file_path).suffix.lower() not in STREAMABLE_EXTENSIONS:
+        return False
+    n_lines = 0
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            n_lines += block.count(b"\n")
+    return n_lines - 1 > MAX_DATAFRAME_ROWS
+
+def load_data_sample(file_path: str, nrows: int = OUT_OF_CORE_SAMPLE_ROWS) -> pd.DataFrame:
+    """Load the head of a file too large for one DataFrame; training streams the rest"""
+    sep = '\t' if Path(file_path).suffix.lower() == '.tsv' else ','
+    data = pd.read_csv(file_path, sep=sep, nrows=nrows)
+    data = memory_manager.optimize_dataframe(data)
+    data.columns = SecurityUtils.validate_column_names(data.columns.tolist())
+    return data
+
 def load_data_file(file_path: str) -> pd.DataFrame:
     """Load data file into pandas DataFrame with validation"""
     try:
@@ -864,21 +1044,39 @@ async def tools_health():
                     "validate": "/api/regression/validate-data",
                     "preprocess": "/api/regression/preprocess",
                     "train": "/api/regression/train",
-                    "results": "/api/regression/results/{session_id}"
+                    "results": "/api/regression/results/{session_id}",
+                    "predict_batch": "/api/regression/predict-batch",
+                    "explanations": "/api/regression/explanations/{session_id}",
+                    "visualizations": "/api/regression/visualizations/{session_id}"
                 },
                 "classification": {
                     "validate": "/api/classification/validate-data",
                     "preprocess": "/api/classification/preprocess",
                     "train": "/api/classification/train",
-                    "results": "/api/classification/results/{session_id}"
+                    "results": "/api/classification/results/{session_id}",
+                    "predict_batch": "/api/classification/predict-batch",
+                    "explanations": "/api/classification/explanations/{session_id}",
+                    "visualizations": "/api/classification/visualizations/{session_id}"
                 },
                 "clustering": {
                     "validate": "/api/clustering/validate-data",
-                    "analyze": "/api/clustering/analyze"
+                    "analyze": "/api/clustering/analyze",
+                    "labels": "/api/clustering/labels/{session_id}",
+                    "predict_batch": "/api/clustering/predict-batch",
+                    "export": "/api/clustering/export/{session_id}"
                 },
                 "eda": {
                     "analyze": "/api/eda/analyze"
                 },
+                "jobs": {
+                    "status": "/api/jobs/{job_id}",
+                    "cancel": "DELETE /api/jobs/{job_id}",
+                    "queue": job_queue.stats()
+                },
+                "executor": {
+                    "metrics": "/api/executor/metrics",
+                    "stats": ml_executor.metrics()
+                },
                 "nlp": {
                     "validate": "/api/nlp/validate-data"
                 }
@@ -888,6 +1086,14 @@ async def tools_health():
         logger.error(f"Tools health error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Executor queue metrics for monitoring and client-side backoff
+@app.get("/api/executor/metrics")
+async def executor_metrics():
+    return {
+        "executor": ml_executor.metrics(),
+        "jobs": job_queue.stats()
+    }
+
 # SESSION ENDPOINTS
 @app.post("/api/{tool_type}/session", response_model=SessionResponse)
 async def create_session(
@@ -959,6 +1165,8 @@ async def delete_session(
         raise HTTPException(status_code=403, detail="Not authorized to delete this session")
     
     success = await session_storage.delete_session(session_id)
+    model_registry.delete(session_id)
+    dataset_store.delete(session_id)
     return {"success": success}
 
 # DATA VALIDATION ENDPOINT
@@ -972,6 +1180,7 @@ async def validate_data(
 ):
     """Validate uploaded data file with rate limiting"""
     temp_file_path = None
+    source_file = None
     
     try:
         # Validate file
@@ -984,8 +1193,13 @@ async def validate_data(
             session_id=session_id
         )
         
-        # Load and validate data
-        data = load_data_file(temp_file_path)
+        # Load and validate data; oversized CSV/TSV files stay on disk for chunked training
+        if tool_type in ['regression', 'classification'] and exceeds_dataframe_rows(temp_file_path):
+            data = load_data_sample(temp_file_path)
+            source_file = temp_file_path
+            logger.info(f"Upload exceeds {MAX_DATAFRAME_ROWS} rows; validating a sample and keeping {source_file} for incremental training")
+        else:
+            data = load_data_file(temp_file_path)
         
         # Get workflow and validate
         workflow = await get_session_workflow(session_id, tool_type, current_user['user_id'])
@@ -1031,7 +1245,10 @@ async def validate_data(
             'status': 'data_uploaded',
             'uploaded_by': current_user['user_id'],
             'upload_time': datetime.now(),
-            'dataframe': data
+            'dataframe': data,
+            'out_of_core': source_file is not None,
+            'source_file': source_file,
+            'source_columns': data.columns.tolist() if source_file else None
         }
         
         # For NLP, also store the detected/selected text column
@@ -1042,7 +1259,10 @@ async def validate_data(
         existing_session = await session_storage.get_session(session_id)
         if existing_session:
             existing_session.update(session_update)
+            existing_session.pop('preprocess', None)
             await session_storage.save_session(session_id, existing_session)
+        # Matrices derived from a previous upload are stale now
+        dataset_store.delete(session_id)
         
         # Normalize response shape across tools
         # If workflow returned nested { validation: {...}, summary: {...} }
@@ -1091,24 +1311,223 @@ async def validate_data(
         logger.error(f"Validation failed: {e}")
         raise HTTPException(status_code=400, detail=str(e))
     finally:
-        # Clean up temp file
-        if temp_file_path and os.path.exists(temp_file_path):
+        # Clean up temp file unless it is kept as the session's streaming source
+        if temp_file_path and temp_file_path != source_file and os.path.exists(temp_file_path):
             try:
                 os.unlink(temp_file_path)
             except:
                 pass
 
 # MODEL TRAINING ENDPOINT
+def run_inline_training(session_id: str, tool_type: str, workflow: Any, data: pd.DataFrame,
+                        target_col: str, tracker: Optional[ProgressTracker] = None) -> tuple:
+    """Train and persist the pipelines (blocking; runs on the ML executor).
+
+    Returns the workflow's training output and the model registry metadata
+    (None when training failed or the models could not be persisted).
+    """
+    tracker = (tracker or ProgressTracker(session_id, 'training')).start({'models': workflow.config.models_to_include})
+    workflow.should_stop = tracker.stop_requested
+    try:
+        # Preprocessed float32 matrix (sets workflow.feature_columns)
+        train_input = resolve_training_frame(session_id, workflow, data, target_col)
+        logger.info(f"Training {tool_type} with {train_input.shape[0]} rows, target: {target_col}")
+        tracker.update('preprocessed', 0.05, {'rows': train_input.shape[0], 'features': len(workflow.feature_columns)})
+        
+        workflow.progress_callback = tracker.scoped(0.05, 0.9)
+        train_out = workflow.train_models(train_input, target_col)
+    except Exception as e:
+        tracker.failed(str(e))
+        raise
+    logger.info(f"Train models returned, success: {train_out.get('success', False)}")
+    if not train_out.get('success'):
+        tracker.failed(train_out.get('error') or 'Training failed')
+        return train_out, None
+    
+    # Persist trained pipelines so predictions can be served after this request
+    registry_meta = None
+    try:
+        registry_meta = model_registry.save_workflow(session_id, tool_type, workflow)
+    except Exception as reg_err:
+        logger.warning(f"Failed to persist trained models for session {session_id}: {reg_err}")
+    
+    tracker.done({'best_model': train_out.get('best_model'), 'training_summary': train_out.get('training_summary')})
+    return train_out, registry_meta
+
+TRAINING_OUTPUT_KEYS = ['success', 'comparison_data', 'comparison_df', 'best_model', 'best_model_name',
+                        'feature_importance', 'training_summary', 'error',
+                        'cross_validation', 'confusion_matrix', 'model_metrics', 'split_info',
+                        'model_substitutions', 'regularization_paths', 'incremental', 'skipped_models']
+
+def clean_training_output(train_out: Dict[str, Any]) -> Dict[str, Any]:
+    """Serializable copy of a workflow's training output.
+    
+    Keeps the known result fields and drops model objects and other values
+    without a JSON form by their type; NumPy and pandas values stay as they
+    are and are converted when the response is encoded.
+    """
+    if not isinstance(train_out, dict):
+        return train_out
+    
+    clean_train_out = {}
+    
+    # Per-model entries may carry the fitted model next to its metrics
+    if isinstance(train_out.get('model_results'), dict):
+        clean_train_out['model_results'] = {
+            name: value['metrics'] if isinstance(value, dict) and 'metrics' in value else value
+            for name, value in train_out['model_results'].items()
+        }
+    
+    # Copy other safe fields - different tools may use different keys
+    for key in TRAINING_OUTPUT_KEYS:
+        if key in train_out:
+            clean_train_out[key] = train_out[key]
+    
+    return strip_unencodable(clean_train_out)
+
+async def store_training_results(session_id: str, session_data: Dict[str, Any], train_out: Dict[str, Any],
+                                 registry_meta: Optional[Dict[str, Any]]):
+    """Record inline training results (or the failure) in the session"""
+    if not train_out.get('success'):
+        session_data['status'] = 'training_failed'
+        session_data['training_results'] = train_out
+        await session_storage.save_session(session_id, session_data)
+        return
+    
+    if registry_meta is not None:
+        session_data['model_registry'] = registry_meta
+    session_data['status'] = 'training_complete'
+    session_data['training_results'] = train_out
+    session_data['explanations'] = {'status': 'pending'}
+    await session_storage.save_session(session_id, session_data)
+
+def ndjson_line(payload: Dict[str, Any]) -> str:
+    return encode_json(payload).decode('utf-8') + "\n"
+
+def training_stream_line(event: Dict[str, Any]) -> Dict[str, Any]:
+    """NDJSON line for a training progress event: finished models carry their metrics and the leaderboard"""
+    if event['event'] == 'model_complete':
+        return {'type': 'model', 'percent': event['percent'], 'eta_s': event['eta_s'], **event['data']}
+    return {'type': 'progress', 'event': event['event'], 'percent': event['percent'],
+            'eta_s': event['eta_s'], 'data': event['data']}
+
+async def follow_training_events(session_id: str, cursor: Optional[str], run_id: Optional[str] = None,
+                                 until: Optional[asyncio.Future] = None):
+    """Training events after ``cursor`` (of one run when ``run_id`` is given) until a terminal event.
+    
+    Also stops once ``until`` has finished and no events are left, and after
+    PROGRESS_STREAM_MAX_SECONDS.
+    """
+    deadline = time.monotonic() + PROGRESS_STREAM_MAX_SECONDS
+    while time.monotonic() < deadline:
+        finished = until is not None and until.done()
+        events = await asyncio.to_thread(progress_store.read, session_id, cursor)
+        for event in events:
+            cursor = event['id']
+            if event.get('task') != 'training' or (run_id and event.get('run_id') != run_id):
+                continue
+            yield event
+            if event['event'] in TERMINAL_EVENTS:
+                return
+        if finished:
+            return
+        await asyncio.sleep(PROGRESS_POLL_INTERVAL)
+
+async def inline_training_stream(session_id: str, tracker: ProgressTracker, cursor: Optional[str],
+                                 outcome: asyncio.Future, rate_limit: dict):
+    """NDJSON body for ``stream=true`` inline training: one line per finished model, then the full results"""
+    async for event in follow_training_events(session_id, cursor, tracker.run_id, until=outcome):
+        if event['event'] not in TERMINAL_EVENTS:
+            yield ndjson_line(training_stream_line(event))
+    
+    # Results are stored by the outcome task even if this client has gone away
+    try:
+        train_out = await asyncio.shield(outcome)
+    except Exception as e:
+        yield ndjson_line({'type': 'error', 'error': str(e)})
+        return
+    if not train_out.get('success'):
+        yield ndjson_line({'type': 'error', 'error': train_out.get('error') or 'Training failed'})
+        return
+    yield ndjson_line({'type': 'result', 'results': train_out, 'rate_limit': rate_limit})
+
+async def queued_training_stream(session_id: str, job_public: Dict[str, Any], cursor: Optional[str]):
+    """NDJSON body for ``stream=true`` queued training: the job, worker progress lines, then the stored results"""
+    yield ndjson_line({'type': 'queued', **job_public})
+    async for event in follow_training_events(session_id, cursor):
+        if event['event'] == 'done':
+            session_data = await session_storage.get_session(session_id)
+            yield ndjson_line({'type': 'result', 'results': (session_data or {}).get('training_results')})
+        elif event['event'] in TERMINAL_EVENTS:
+            yield ndjson_line({'type': 'error' if event['event'] == 'failed' else event['event'], **event['data']})
+        else:
+            yield ndjson_line(training_stream_line(event))
+
+async def resolve_training_cache_key(tool_type: str, session_data: Optional[Dict[str, Any]],
+                                    request: TrainingRequest) -> Optional[str]:
+    """Training cache key for a request, or None when the session's data cannot be keyed"""
+    data = (session_data or {}).get('dataframe')
+    target_col = request.target_column or (session_data or {}).get('target_column')
+    if data is None or not target_col or target_col not in data.columns:
+        return None
+    # Hashing reads every cell, so it runs off the event loop
+    dataset_hash = await ml_executor.run(dataset_fingerprint, data)
+    if not dataset_hash:
+        return None
+    feature_columns = [col for col in data.columns if col != target_col]
+    return training_cache_key(tool_type, dataset_hash, target_col, feature_columns, request.config.dict())
+
+async def serve_cached_training(session_id: str, session_data: Dict[str, Any], cache_key: str,
+                                stream: bool, rate_limit: dict) -> Optional[Any]:
+    """Answer a training request from the training cache; None on a miss"""
+    cached = await asyncio.to_thread(training_cache.get, cache_key)
+    if not cached:
+        return None
+    try:
+        registry_meta = await asyncio.to_thread(training_cache.restore, cache_key, session_id)
+    except Exception as e:
+        logger.warning(f"Failed to restore cached models for session {session_id}: {e}")
+        registry_meta = None
+    if registry_meta is None:
+        return None
+    
+    results = {**cached['results'], 'cache': {'hit': True, 'key': cache_key, 'cached_at': cached['cached_at']}}
+    session_data['status'] = 'training_complete'
+    session_data['training_completed_at'] = datetime.now()
+    session_data['training_results'] = results
+    session_data['model_registry'] = registry_meta
+    session_data['explanations'] = cached.get('explanations') or {
+        'status': 'failed',
+        'error': 'Explanations are not cached for these results; retrain with force_retrain to compute them'
+    }
+    await session_storage.save_session(session_id, session_data)
+    logger.info(f"Training cache hit for session {session_id} ({cache_key[:12]})")
+    
+    response = {"results": results, "rate_limit": rate_limit}
+    if stream:
+        return StreamingResponse(
+            iter([ndjson_line({'type': 'result', **response})]),
+            media_type="application/x-ndjson"
+        )
+    return FastJSONResponse(response)
+
 @app.post("/api/{tool_type}/train")
 async def train_models(
     tool_type: str,
     request: TrainingRequest,
     background_tasks: BackgroundTasks,
     session_id: str = Query(...),
+    stream: bool = Query(False, description="Stream NDJSON lines as each model finishes, then the full results"),
     current_user: dict = Depends(get_current_user),
     rate_limit: dict = Depends(rate_limit_ml_tools)
 ):
-    """Train models with rate limiting and premium checks"""
+    """Train models with rate limiting and premium checks.
+    
+    With ``stream=true`` the response is NDJSON: a line per finished model
+    (metrics, CV scores and the leaderboard so far), then a ``result`` line.
+    POST /api/progress/{session_id}/stop keeps the finished models and skips
+    the rest.
+    """
     try:
         # Premium model check
         premium_models = ['xgboost', 'lightgbm', 'catboost', 'neural_network', 'deep_learning']
@@ -1133,28 +1552,72 @@ async def train_models(
                 detail="Insufficient memory available. Please try again later."
             )
         
-        # For long-running tasks, use background processing
-        if len(request.config.models_to_include) > 3:
-            background_tasks.add_task(
-                train_models_background,
-                session_id,
-                tool_type,
-                request,
-                current_user['user_id']
+        # Chunked training over a file that does not fit in memory always runs in the background
+        session_meta = await session_storage.get_session(session_id)
+        incremental = request.config.training_mode == 'incremental' or bool(session_meta and session_meta.get('out_of_core'))
+        
+        # Same dataset, target, features, models and config as an earlier run: reuse its results
+        cache_key = None
+        if not incremental and tool_type in ['regression', 'classification']:
+            cache_key = await resolve_training_cache_key(tool_type, session_meta, request)
+        if cache_key and not request.force_retrain:
+            cached_response = await serve_cached_training(session_id, session_meta, cache_key, stream, rate_limit)
+            if cached_response is not None:
+                return cached_response
+        
+        # Long-running training goes to the durable job queue and runs in a worker process
+        if len(request.config.models_to_include) > 3 or incremental:
+            if not session_meta:
+                raise HTTPException(status_code=400, detail="No data uploaded for this session")
+            if tool_type not in ['regression', 'classification']:
+                raise HTTPException(status_code=400, detail=f"Background training not implemented for {tool_type}")
+            
+            # Premium subscribers are served first
+            priority = PRIORITY_STANDARD
+            try:
+                premium_status = await premium_verification.sync_premium_status_from_stripe(
+                    current_user['user_id'],
+                    current_user.get('email', '')
+                )
+                if premium_status.is_premium:
+                    priority = PRIORITY_PREMIUM
+            except Exception as premium_err:
+                logger.warning(f"Premium lookup failed, queueing at standard priority: {premium_err}")
+            
+            cursor = progress_store.latest_id(session_id)
+            job = job_queue.enqueue(
+                'train',
+                {'tool_type': tool_type, 'request': request.dict(), 'cache_key': cache_key},
+                priority=priority,
+                user_id=current_user['user_id'],
+                session_id=session_id
             )
+            session_meta['status'] = 'training_queued'
+            session_meta['training_job_id'] = job.id
+            session_meta.pop('training_results', None)
+            await session_storage.save_session(session_id, session_meta)
+            
+            if stream:
+                return StreamingResponse(
+                    queued_training_stream(session_id, job.public_view(), cursor),
+                    media_type="application/x-ndjson"
+                )
+            
             return {
-                "status": "training_started",
+                "status": "training_queued",
                 "session_id": session_id,
-                "message": "Training started in background. Check status for updates.",
+                "job_id": job.id,
+                "job_status_url": f"/api/jobs/{job.id}",
+                "priority": job.public_view()['priority'],
+                "queue": job_queue.stats(),
+                "message": "Training queued. Check job status for updates.",
                 "estimated_time": len(request.config.models_to_include) * 30,  # seconds
                 "rate_limit": rate_limit
             }
         
         # For smaller tasks, process immediately
-        workflow = await get_session_workflow(session_id, tool_type, current_user['user_id'])
-
-        # Get session data and persisted DataFrame
-        session_data = await session_storage.get_session(session_id)
+        # Session data and persisted DataFrame
+        session_data = session_meta
         if not session_data or 'dataframe' not in session_data:
             raise HTTPException(status_code=400, detail="No data uploaded for this session")
 
@@ -1167,291 +1630,397 @@ async def train_models(
             if not target_col:
                 raise HTTPException(status_code=400, detail="target_column is required (provide in request or run preprocess).")
 
-        # Ensure preprocessing has set feature columns if needed
-        if tool_type in ['regression', 'classification']:
-            # If no preprocess results or feature_columns missing, run preprocessing with provided target
-            if not session_data.get('preprocess') or not session_data['preprocess'].get('feature_columns'):
-                _ = workflow.preprocess_data(data, target_col)
-
-        # Train using respective workflow
-        if tool_type == 'regression':
-            train_input_df = data
-            if session_data.get('preprocess') and session_data['preprocess'].get('processed_data'):
-                import pandas as pd
-                train_input_df = pd.DataFrame(session_data['preprocess']['processed_data'])
-            
-            # Validate that train_input_df is a DataFrame
-            if not isinstance(train_input_df, pd.DataFrame):
-                logger.error(f"Invalid training data type: {type(train_input_df)}")
-                raise HTTPException(status_code=400, detail="Invalid training data format")
-                
-            # Ensure workflow has feature_columns from preprocess
-            try:
-                if session_data.get('preprocess') and session_data['preprocess'].get('feature_columns'):
-                    workflow.feature_columns = session_data['preprocess']['feature_columns']
-            except Exception:
-                pass
-            
-            # Log training parameters for debugging
-            logger.info(f"Training regression with {len(train_input_df)} rows, target: {target_col}")
-            
-            try:
-                train_out = workflow.train_models(train_input_df, target_col)
-                logger.info(f"Train models returned, success: {train_out.get('success', False)}")
-                logger.info(f"Train_out keys: {list(train_out.keys()) if isinstance(train_out, dict) else 'Not a dict'}")
-                
-                # Debug: Check what's in model_results
-                if 'model_results' in train_out:
-                    logger.info(f"model_results type: {type(train_out['model_results'])}")
-                    if isinstance(train_out['model_results'], dict):
-                        for k, v in train_out['model_results'].items():
-                            logger.info(f"  {k}: type={type(v)}, keys={list(v.keys()) if isinstance(v, dict) else 'Not a dict'}")
-                
-            except Exception as train_err:
-                logger.error(f"Training execution failed: {train_err}")
-                raise
-            
-            # Attach rich visualizations if training succeeded
-            try:
-                if train_out.get('success'):
-                    viz = workflow.get_visualizations()
-                    if viz.get('success'):
-                        train_out['visualizations'] = viz.get('visualizations', {})
-            except Exception as _viz_err:
-                logger.warning(f"Regression visualization generation failed: {_viz_err}")
-        elif tool_type == 'classification':
-            train_input_df = data
-            if session_data.get('preprocess') and session_data['preprocess'].get('processed_data'):
-                import pandas as pd
-                train_input_df = pd.DataFrame(session_data['preprocess']['processed_data'])
-            
-            # Validate that train_input_df is a DataFrame
-            if not isinstance(train_input_df, pd.DataFrame):
-                logger.error(f"Invalid training data type: {type(train_input_df)}")
-                raise HTTPException(status_code=400, detail="Invalid training data format")
-                
-            # Ensure workflow has feature_columns from preprocess
-            try:
-                if session_data.get('preprocess') and session_data['preprocess'].get('feature_columns'):
-                    workflow.feature_columns = session_data['preprocess']['feature_columns']
-            except Exception:
-                pass
-            
-            # Log training parameters for debugging
-            logger.info(f"Training classification with {len(train_input_df)} rows, target: {target_col}")
-            
+        if tool_type not in ['regression', 'classification']:
+            raise HTTPException(status_code=400, detail="Training not supported for this tool")
+
+        # Workflow built with the requested models and config (as queued jobs are)
+        workflow = create_training_workflow(tool_type, request.config.dict())
+
+        # Train on the ML executor so the event loop keeps serving other requests
+        tracker = ProgressTracker(session_id, 'training')
+        cursor = progress_store.latest_id(session_id)
+        training = ml_executor.submit(run_inline_training, session_id, tool_type, workflow, data, target_col, tracker)
+
+        async def record_outcome() -> Dict[str, Any]:
             try:
-                train_out = workflow.train_models(train_input_df, target_col)
-                logger.info(f"Classification train models returned, success: {train_out.get('success', False)}")
-                logger.info(f"Train_out keys: {list(train_out.keys()) if isinstance(train_out, dict) else 'Not a dict'}")
-                
-                # Debug: Check what's in model_results
-                if 'model_results' in train_out:
-                    logger.info(f"model_results type: {type(train_out['model_results'])}")
-                    if isinstance(train_out['model_results'], dict):
-                        for k, v in train_out['model_results'].items():
-                            logger.info(f"  {k}: type={type(v)}, keys={list(v.keys()) if isinstance(v, dict) else 'Not a dict'}")
-                
-            except Exception as train_err:
-                logger.error(f"Classification training execution failed: {train_err}")
+                train_out, registry_meta = await training
+            except Exception as e:
+                # Recorded here so the session shows the failure even when a streaming client has gone away
+                await store_training_results(session_id, session_data, {'success': False, 'error': str(e)}, None)
                 raise
-            
-            # Attach visualizations if available
-            try:
-                if train_out.get('success'):
-                    viz = workflow.get_visualizations()
-                    if viz.get('success'):
-                        train_out['visualizations'] = viz.get('visualizations', {})
-            except Exception as _viz_err:
-                logger.warning(f"Classification visualization generation failed: {_viz_err}")
-        else:
-            raise HTTPException(status_code=400, detail="Training not supported for this tool")
+            if train_out.get('success'):
+                # Clean train_out to ensure it's serializable
+                train_out = clean_training_output(train_out)
+            await store_training_results(session_id, session_data, train_out, registry_meta)
+            if cache_key and registry_meta is not None and cacheable_results(train_out):
+                await asyncio.to_thread(training_cache.put, cache_key, session_id, tool_type, train_out)
+            if train_out.get('success'):
+                # Permutation importance runs after the results are stored; a streamed
+                # response may lose its client, so it does not wait for the response there
+                if stream:
+                    spawn_background(compute_explanations(session_id, tool_type, workflow, cache_key))
+                else:
+                    background_tasks.add_task(compute_explanations, session_id, tool_type, workflow, cache_key)
+            return train_out
+
+        if stream:
+            outcome = spawn_background(record_outcome())
+            return StreamingResponse(
+                inline_training_stream(session_id, tracker, cursor, outcome, rate_limit),
+                media_type="application/x-ndjson"
+            )
+
+        train_out = await record_outcome()
 
         # If training failed, return 422 with error details
         if not train_out.get('success'):
-            session_data['status'] = 'training_failed'
-            session_data['training_results'] = train_out
-            await session_storage.save_session(session_id, session_data)
             raise HTTPException(status_code=422, detail=train_out.get('error') or 'Training failed')
 
-        # Clean train_out to ensure it's serializable
-        # Remove any model objects that might have slipped through
-        logger.info(f"Cleaning train_out for {tool_type}, original keys: {list(train_out.keys()) if isinstance(train_out, dict) else 'Not a dict'}")
-        
-        if isinstance(train_out, dict):
-            # Create a clean copy of train_out with only serializable data
-            clean_train_out = {}
-            
-            # Handle model_results specially
-            if 'model_results' in train_out:
-                logger.info(f"Processing model_results for serialization")
-                if isinstance(train_out['model_results'], dict):
-                    clean_model_results = {}
-                    for key, value in train_out['model_results'].items():
-                        if isinstance(value, dict):
-                            # If it has 'metrics', use that; if it has 'model', skip it
-                            if 'metrics' in value:
-                                clean_model_results[key] = value['metrics']
-                            elif 'model' not in value:
-                                # Only include if it doesn't have a model object
-                                clean_model_results[key] = value
-                        elif not hasattr(value, 'predict'):  # Skip sklearn models
-                            clean_model_results[key] = value
-                    clean_train_out['model_results'] = clean_model_results
-            
-            # Copy other safe fields - different tools may use different keys
-            safe_keys = ['success', 'comparison_data', 'comparison_df', 'best_model', 'best_model_name',
-                        'feature_importance', 'training_summary', 'error', 'visualizations', 
-                        'cross_validation', 'confusion_matrix', 'model_metrics', 'split_info']
-            for key in safe_keys:
-                if key in train_out:
-                    value = train_out[key]
-                    # Make sure the value is serializable
-                    try:
-                        import json
-                        json.dumps(value)
-                        clean_train_out[key] = value
-                    except:
-                        logger.warning(f"Skipping non-serializable field: {key}")
-            
-            logger.info(f"Clean train_out keys: {list(clean_train_out.keys())}")
-            train_out = clean_train_out
-        
-        # Update session
-        session_data['status'] = 'training_complete'
-        session_data['training_results'] = train_out
-        await session_storage.save_session(session_id, session_data)
-
-        # Try to serialize the response to catch any issues
-        try:
-            import json
-            # Test serialization
-            test_response = {"results": train_out, "rate_limit": rate_limit}
-            json.dumps(test_response)
-            # If successful, return the response
-            return test_response
-        except Exception as json_err:
-            logger.error(f"Response serialization failed: {json_err}")
-            logger.error(f"train_out type: {type(train_out)}")
-            if isinstance(train_out, dict):
-                for key, value in train_out.items():
-                    try:
-                        json.dumps({key: value})
-                    except:
-                        logger.error(f"  Non-serializable field: {key} (type: {type(value)})")
-            
-            # Try to salvage what we can
-            minimal_results = {
-                "success": train_out.get("success", True) if isinstance(train_out, dict) else True,
-                "message": "Training completed successfully",
-                "summary": {
-                    "models_trained": train_out.get("training_summary", {}).get("models_trained", "unknown") if isinstance(train_out, dict) else "unknown",
-                    "best_model": train_out.get("best_model", "unknown") if isinstance(train_out, dict) else "unknown"
-                }
-            }
-            
-            return {
-                "results": minimal_results,
-                "rate_limit": rate_limit
-            }
-        
+        # Returned as a response so the results are encoded once, not walked by jsonable_encoder first
+        return FastJSONResponse({"results": train_out, "rate_limit": rate_limit})
+    
+    except (HTTPException, ExecutorSaturated):
+        raise
     except Exception as e:
         logger.error(f"Training failed: {e}")
         import traceback
         logger.error(f"Training traceback: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# JOB ENDPOINTS
+async def get_owned_job(job_id: str, current_user: dict):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.user_id and job.user_id != current_user.get('user_id') and not current_user.get('is_admin'):
+        raise HTTPException(status_code=403, detail="Not authorized to access this job")
+    return job
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    _: dict = Depends(rate_limit_default)
+):
+    """Status, attempts and outcome of a queued job"""
+    job = await get_owned_job(job_id, current_user)
+    return {**job.public_view(), "queue": job_queue.stats()}
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    _: dict = Depends(rate_limit_default)
+):
+    """Cancel a queued job, or ask the worker to stop a running one"""
+    job = await get_owned_job(job_id, current_user)
+    if job.status in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    job = job_queue.cancel(job_id)
+    await record_job_status(job)
+    return job.public_view()
+
+# PROGRESS ENDPOINTS
+async def can_watch_session(session_id: str, user_id: Optional[str], is_admin: bool = False) -> bool:
+    """Whether a user may see a session's progress events (same rule as its results)"""
+    session_data = await session_storage.get_session(session_id)
+    if not session_data:
+        return False
+    owner = session_data.get('user_id')
+    return not owner or owner == user_id or is_admin
+
+async def authorize_progress_subscription(session_id: str, client_info: Dict[str, Any]) -> bool:
+    """Socket.IO join_session check: the socket's Firebase token must belong to the session owner"""
+    try:
+        token_data = await admin_auth.verify_firebase_token(f"Bearer {client_info.get('token') or ''}")
+    except HTTPException:
+        return False
+    return await can_watch_session(
+        session_id,
+        token_data.get('uid'),
+        admin_auth.is_admin_email(token_data.get('email', ''))
+    )
+
+def format_sse(event: Dict[str, Any]) -> str:
+    # One SSE event type, matching the Socket.IO 'progress' event; the payload carries the kind
+    return f"id: {event['id']}\nevent: progress\ndata: {encode_json(event).decode('utf-8')}\n\n"
+
+async def progress_event_stream(session_id: str, last_event_id: Optional[str], wait: bool):
+    """Server-sent events for a session until its run ends, the client leaves or the stream times out"""
+    if last_event_id:
+        backlog = await asyncio.to_thread(progress_store.read, session_id, last_event_id)
+    else:
+        backlog = await asyncio.to_thread(progress_store.read_latest_run, session_id)
+        if wait and backlog and backlog[-1]['event'] in TERMINAL_EVENTS:
+            # The latest run is over; follow the next one instead
+            last_event_id, backlog = backlog[-1]['id'], []
+    
+    cursor = last_event_id
+    for event in backlog:
+        yield format_sse(event)
+        cursor = event['id']
+        if event['event'] in TERMINAL_EVENTS:
+            return
+    
+    deadline = time.monotonic() + PROGRESS_STREAM_MAX_SECONDS
+    last_write = time.monotonic()
+    while time.monotonic() < deadline:
+        await asyncio.sleep(PROGRESS_POLL_INTERVAL)
+        events = await asyncio.to_thread(progress_store.read, session_id, cursor)
+        for event in events:
+            yield format_sse(event)
+            cursor = event['id']
+            last_write = time.monotonic()
+            if event['event'] in TERMINAL_EVENTS:
+                return
+        if time.monotonic() - last_write > PROGRESS_HEARTBEAT_SECONDS:
+            # Comment line keeps proxies from closing an idle stream
+            yield ": keep-alive\n\n"
+            last_write = time.monotonic()
+
+@app.get("/api/progress/{session_id}")
+async def get_progress(
+    session_id: str,
+    after: Optional[str] = Query(None, description="Return events after this event id"),
+    current_user: dict = Depends(get_current_user),
+    _: dict = Depends(rate_limit_default)
+):
+    """Progress events of the session's latest run (or those after an event id)"""
+    if not await can_watch_session(session_id, current_user.get('user_id'), current_user.get('is_admin', False)):
+        raise HTTPException(status_code=404, detail="Session not found")
+    if after:
+        events = await asyncio.to_thread(progress_store.read, session_id, after)
+    else:
+        events = await asyncio.to_thread(progress_store.read_latest_run, session_id)
+    return {
+        "session_id": session_id,
+        "events": events,
+        "latest": events[-1] if events else None
+    }
+
+@app.post("/api/progress/{session_id}/stop")
+async def stop_training(
+    session_id: str,
+    current_user: dict = Depends(get_current_user),
+    _: dict = Depends(rate_limit_default)
+):
+    """Finish the session's running training after the current model, keeping the models already evaluated"""
+    if not await can_watch_session(session_id, current_user.get('user_id'), current_user.get('is_admin', False)):
+        raise HTTPException(status_code=404, detail="Session not found")
+    await asyncio.to_thread(progress_store.request_stop, session_id)
+    return {"session_id": session_id, "status": "stop_requested"}
+
+@app.get("/api/progress/{session_id}/stream")
+async def stream_progress(
+    session_id: str,
+    request: Request,
+    wait: bool = Query(False, description="If the latest run has finished, wait for the next one"),
+    current_user: dict = Depends(get_current_user)
+):
+    """SSE fallback for clients without Socket.IO: the same events as the session's WebSocket room.
+    
+    Reconnecting clients send Last-Event-ID to resume where they left off. Open
+    the stream with ``wait=true`` before starting an inline analysis so it
+    follows that run rather than ending on the previous one.
+    """
+    if not await can_watch_session(session_id, current_user.get('user_id'), current_user.get('is_admin', False)):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return StreamingResponse(
+        progress_event_stream(session_id, request.headers.get("last-event-id"), wait),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def read_prediction_input(request: Request) -> Tuple[str, Any]:
+    """Receive batch prediction input: ('.csv'/'.parquet', file bytes) or ('records', list of dicts).
+
+    Only the request body is read here; parsing happens in ``parse_prediction_input`` on the ML executor.
+    """
+    content_type = request.headers.get("content-type", "")
+    
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or not hasattr(upload, "filename"):
+            raise HTTPException(status_code=400, detail="Multipart requests must include a 'file' field")
         
-        # Try to provide more helpful error message
-        error_msg = str(e)
-        if "dictionary update sequence" in error_msg:
-            error_msg = "Serialization error in training results. Please try again or contact support."
-        
-        raise HTTPException(status_code=500, detail=error_msg)
+        SecurityUtils.validate_filename(upload.filename)
+        file_ext = Path(upload.filename).suffix.lower()
+        if file_ext not in ('.csv', '.parquet'):
+            raise HTTPException(status_code=400, detail="Batch prediction files must be .csv or .parquet")
+        return file_ext, await upload.read()
+    
+    body = await request.json()
+    records = body.get("records") if isinstance(body, dict) else body
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise HTTPException(status_code=400, detail="JSON body must be an array of records or {\"records\": [...]}")
+    return 'records', records
+
+def parse_prediction_input(kind: str, payload: Any) -> pd.DataFrame:
+    """Batch prediction rows from the output of ``read_prediction_input`` (blocking)"""
+    if kind == '.csv':
+        data = pd.read_csv(io.BytesIO(payload))
+    elif kind == '.parquet':
+        try:
+            data = pd.read_parquet(io.BytesIO(payload))
+        except ImportError:
+            raise HTTPException(status_code=400, detail="Parquet support is not installed on this server")
+    else:
+        data = pd.DataFrame.from_records(payload)
+    
+    if data.empty:
+        raise HTTPException(status_code=400, detail="No rows to score")
+    if len(data) > MAX_DATAFRAME_ROWS:
+        raise HTTPException(status_code=413, detail=f"Batch too large. Maximum is {MAX_DATAFRAME_ROWS} rows")
+    
+    data.columns = SecurityUtils.validate_column_names(data.columns.tolist())
+    return data
 
-# Background training task
-async def train_models_background(
-    session_id: str, 
+def run_batch_prediction(session_id: str, workflow: Any, kind: str, payload: Any,
+                         model_name: Optional[str]) -> Dict[str, Any]:
+    """Parse the input, load the stored model and score every row (blocking; runs on the ML executor)"""
+    data = parse_prediction_input(kind, payload)
+    try:
+        model_registry.attach(workflow, session_id, model_name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    result = workflow.make_batch_prediction(data)
+    if not result.get('success'):
+        raise HTTPException(status_code=422, detail=result.get('error') or 'Prediction failed')
+    return result
+
+# BATCH PREDICTION ENDPOINT
+@app.post("/api/{tool_type}/predict-batch")
+async def predict_batch(
     tool_type: str,
-    request: TrainingRequest, 
-    user_id: str
+    request: Request,
+    session_id: str = Query(...),
+    model_name: Optional[str] = Query(None, description="Stored model to use; defaults to the best model"),
+    current_user: dict = Depends(get_current_user),
+    rate_limit: dict = Depends(rate_limit_ml_tools)
 ):
-    """Background task for model training"""
-    session_data = None
+    """Score CSV/Parquet uploads or JSON arrays with a session's persisted model (cluster labels for clustering)"""
+    if tool_type not in ['regression', 'classification', 'clustering']:
+        raise HTTPException(status_code=400, detail="Batch prediction not supported for this tool")
+    
     try:
-        # Update session status
         session_data = await session_storage.get_session(session_id)
         if not session_data:
-            logger.error(f"Session {session_id} not found for background training")
-            return
-            
-        session_data['status'] = 'training_in_progress'
-        session_data['training_started_at'] = datetime.now()
-        await session_storage.save_session(session_id, session_data)
+            raise HTTPException(status_code=404, detail="Session not found")
+        if session_data.get('user_id') and session_data.get('user_id') != current_user['user_id'] and not current_user.get('is_admin'):
+            raise HTTPException(status_code=403, detail="Not authorized to use this session")
         
-        # Get workflow and data
-        workflow = await get_session_workflow(session_id, tool_type, user_id)
+        if not model_registry.has_models(session_id):
+            raise HTTPException(status_code=404, detail="No trained model stored for this session")
         
-        data = session_data.get('dataframe')
-        # Fix: Check if DataFrame is None or empty, not using "if not data"
-        if data is None or (hasattr(data, 'empty') and data.empty):
-            raise ValueError("No data available for training")
+        kind, payload = await read_prediction_input(request)
+        workflow = await get_session_workflow(session_id, tool_type, current_user['user_id'])
         
-        # Get target column
-        target_col = request.target_column
-        if not target_col:
-            target_col = session_data.get('target_column')
-        if not target_col:
-            raise ValueError("No target column specified")
+        # Parsing, model loading and scoring all run on the ML executor
+        result = await ml_executor.run(run_batch_prediction, session_id, workflow, kind, payload, model_name)
         
-        # Perform actual training based on tool type
-        if tool_type == 'regression':
-            # Get preprocessed data if available
-            train_input_df = data
-            if session_data.get('preprocess') and session_data['preprocess'].get('processed_data'):
-                import pandas as pd
-                train_input_df = pd.DataFrame(session_data['preprocess']['processed_data'])
-            
-            # Ensure workflow has feature_columns from preprocess
-            if session_data.get('preprocess') and session_data['preprocess'].get('feature_columns'):
-                workflow.feature_columns = session_data['preprocess']['feature_columns']
-            
-            # Apply config
-            workflow.config = RegressionConfig(**request.config.dict())
-            
-            # Train models
-            results = workflow.train_models(train_input_df, target_col)
-            
-        elif tool_type == 'classification':
-            # Get preprocessed data if available
-            train_input_df = data
-            if session_data.get('preprocess') and session_data['preprocess'].get('processed_data'):
-                import pandas as pd
-                train_input_df = pd.DataFrame(session_data['preprocess']['processed_data'])
-            
-            # Ensure workflow has feature_columns from preprocess
-            if session_data.get('preprocess') and session_data['preprocess'].get('feature_columns'):
-                workflow.feature_columns = session_data['preprocess']['feature_columns']
-                
-            # Apply config
-            workflow.config = ClassificationConfig(**request.config.dict())
-            
-            # Train models
-            results = workflow.train_models(train_input_df, target_col)
-            
-        else:
-            raise ValueError(f"Background training not implemented for {tool_type}")
-        
-        # Update status when complete
-        session_data['status'] = 'training_complete'
-        session_data['training_completed_at'] = datetime.now()
-        session_data['training_results'] = results
-        await session_storage.save_session(session_id, session_data)
-            
+        return {
+            "results": result,
+            "rate_limit": rate_limit
+        }
+    
+    except (HTTPException, ExecutorSaturated):
+        raise
+    except Exception as e:
+        logger.error(f"Batch prediction failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# MODEL EXPLANATION ENDPOINT
+@app.get("/api/{tool_type}/explanations/{session_id}")
+async def get_explanations(
+    tool_type: str,
+    session_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Permutation feature importance for the session's best model; 202 while it is computing"""
+    if tool_type not in ['regression', 'classification']:
+        raise HTTPException(status_code=400, detail="Explanations not supported for this tool")
+    
+    session_data = await session_storage.get_session(session_id)
+    if not session_data:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session_data.get('user_id') and session_data.get('user_id') != current_user['user_id'] and not current_user.get('is_admin'):
+        raise HTTPException(status_code=403, detail="Not authorized to view this session")
+    
+    explanations = session_data.get('explanations')
+    if not explanations:
+        raise HTTPException(status_code=404, detail="No explanations requested for this session")
+    if explanations.get('status') == 'pending':
+        return JSONResponse(status_code=202, content={"status": "pending"})
+    if explanations.get('status') == 'failed':
+        raise HTTPException(status_code=422, detail=explanations.get('error') or 'Explanation failed')
+    
+    return {"explanations": explanations}
+
+# MODEL VISUALIZATION ENDPOINT
+def render_model_visualizations(session_id: str, tool_type: str, max_points: int) -> Optional[str]:
+    """Plot the session's stored best model as a JSON payload (blocking; runs on the ML executor).
+
+    The figures are built from the test-set predictions saved with the model,
+    so nothing is re-predicted, and cached next to the models until they are
+    replaced. None when the session has no stored models.
+    """
+    artifact_name = f"visualizations_{max_points}.json"
+    cached = model_registry.read_artifact(session_id, artifact_name)
+    if cached is not None:
+        return cached
+    
+    metadata = model_registry.get_metadata(session_id)
+    if not metadata:
+        return None
+    workflow = create_training_workflow(tool_type, {})
+    model_registry.attach(workflow, session_id)
+    viz = workflow.get_visualizations(max_points=max_points)
+    if not viz.get('success'):
+        raise RuntimeError(viz.get('error') or 'Visualization failed')
+    
+    payload = encode_json({
+        'session_id': session_id,
+        'best_model': metadata.get('best_model'),
+        'max_points': max_points,
+        'generated_at': datetime.now().isoformat(),
+        'visualizations': viz.get('visualizations', {})
+    }).decode('utf-8')
+    model_registry.write_artifact(session_id, artifact_name, payload, saved_at=metadata.get('saved_at'))
+    return payload
+
+@app.get("/api/{tool_type}/visualizations/{session_id}")
+async def get_visualizations(
+    tool_type: str,
+    session_id: str,
+    max_points: int = Query(VIZ_MAX_POINTS, ge=100, le=20000, description="Maximum points per scatter/line trace"),
+    current_user: dict = Depends(get_current_user),
+    _: dict = Depends(rate_limit_default)
+):
+    """Plotly figures for the session's best model, computed on first request and then cached"""
+    if tool_type not in ['regression', 'classification']:
+        raise HTTPException(status_code=400, detail="Visualizations not supported for this tool")
+    
+    session_data = await session_storage.get_session(session_id)
+    if not session_data:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session_data.get('user_id') and session_data.get('user_id') != current_user['user_id'] and not current_user.get('is_admin'):
+        raise HTTPException(status_code=403, detail="Not authorized to view this session")
+    if session_data.get('status') in ['training_queued', 'training_in_progress']:
+        return JSONResponse(status_code=202, content={"status": "pending"})
+    
+    try:
+        payload = await ml_executor.run(render_model_visualizations, session_id, tool_type, max_points)
+    except ExecutorSaturated:
+        raise
     except Exception as e:
-        logger.error(f"Background training failed: {e}")
-        if session_data:
-            session_data['status'] = 'training_failed'
-            session_data['error'] = str(e)
-            await session_storage.save_session(session_id, session_data)
+        logger.error(f"Visualization failed for session {session_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if payload is None:
+        raise HTTPException(status_code=404, detail="No trained model stored for this session")
+    
+    return Response(content=payload, media_type="application/json")
 
 # EXPORT ENDPOINT
 @app.get("/api/{tool_type}/export/{session_id}")
@@ -1474,8 +2043,8 @@ async def export_results(
         if session_data.get('user_id') != current_user['user_id'] and not current_user.get('is_admin'):
             raise HTTPException(status_code=403, detail="Not authorized to export this session")
         
-        # Get workflow
-        workflow = await get_session_workflow(session_id, tool_type, current_user['user_id'])
+        # Get workflow with its trained models restored
+        workflow = await get_session_workflow(session_id, tool_type, current_user['user_id'], restore_model=True)
         
         # Export results
         export_data = workflow.export_results(format=format, include_models=include_models)
@@ -1509,63 +2078,104 @@ async def export_results(
         raise HTTPException(status_code=500, detail=str(e))
 
 # CLUSTERING EXPORT ENDPOINT
+LABELS_CSV_CHUNK_ROWS = 65536  # Rows formatted per streamed CSV chunk
+
+async def load_clustering_labels(session_id: str, current_user: dict,
+                                 algorithm: Optional[str] = None) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+    """The session's stored labels for ``algorithm`` (default: the best one) and its clustering analysis.
+
+    Labels are None when the session has an analysis but no stored labels.
+    """
+    session_data = await session_storage.get_session(session_id)
+    if not session_data:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session_data.get('user_id') != current_user['user_id'] and not current_user.get('is_admin'):
+        raise HTTPException(status_code=403, detail="Not authorized to access this session")
+
+    analysis = session_data.get('clustering_analysis')
+    if not analysis:
+        raise HTTPException(status_code=400, detail="No clustering analysis found for session")
+    try:
+        return dataset_store.load_labels(session_id, algorithm), analysis
+    except KeyError as e:
+        if algorithm:
+            raise HTTPException(status_code=404, detail=str(e))
+    # Analyses stored before labels moved to the dataset store kept them inline
+    labels = analysis.get('labels')
+    return (np.asarray(labels) if labels is not None and len(labels) else None), analysis
+
+def iter_labels_csv(labels: np.ndarray) -> Iterator[bytes]:
+    """CSV (row_index,cluster_label) of a label array, formatted one chunk of rows at a time."""
+    yield b"row_index,cluster_label\n"
+    for start in range(0, len(labels), LABELS_CSV_CHUNK_ROWS):
+        chunk = np.asarray(labels[start:start + LABELS_CSV_CHUNK_ROWS]).tolist()
+        yield "".join(f"{i},{label}\n" for i, label in enumerate(chunk, start)).encode('utf-8')
+
+@app.get("/api/clustering/labels/{session_id}")
+async def get_clustering_labels(
+    session_id: str,
+    algorithm: Optional[str] = Query(None, description="Algorithm key; defaults to the best scoring one"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10000, ge=1, le=100000),
+    current_user: dict = Depends(get_current_user),
+    _: dict = Depends(rate_limit_default)
+):
+    """One page of per-row cluster labels."""
+    labels, analysis = await load_clustering_labels(session_id, current_user, algorithm)
+    if labels is None:
+        raise HTTPException(status_code=404, detail="No cluster labels stored for session")
+
+    page = np.array(labels[offset:offset + limit])
+    total = int(len(labels))
+    next_offset = offset + len(page)
+    return FastJSONResponse({
+        'algorithm': algorithm or (analysis.get('labels_summary') or {}).get('default'),
+        'offset': offset,
+        'limit': limit,
+        'total': total,
+        'next_offset': next_offset if next_offset < total else None,
+        'labels': page
+    })
+
 @app.get("/api/clustering/export/{session_id}")
 async def export_clustering_results(
     session_id: str,
+    algorithm: Optional[str] = Query(None, description="Algorithm key; defaults to the best scoring one"),
     current_user: dict = Depends(get_current_user),
     rate_limit: dict = Depends(rate_limit_export)
 ):
-    """Export best clustering labels as CSV (id,label)."""
+    """Export clustering labels as CSV (row_index,cluster_label), or the algorithm summary if no labels exist."""
     try:
-        session_data = await session_storage.get_session(session_id)
-        if not session_data:
-            raise HTTPException(status_code=404, detail="Session not found")
-        if session_data.get('user_id') != current_user['user_id'] and not current_user.get('is_admin'):
-            raise HTTPException(status_code=403, detail="Not authorized to export this session")
+        labels, analysis = await load_clustering_labels(session_id, current_user, algorithm)
+        headers = {
+            "X-RateLimit-Limit": str(rate_limit["limit"]),
+            "X-RateLimit-Remaining": str(rate_limit["remaining"])
+        }
 
-        analysis = session_data.get('clustering_analysis')
-        if not analysis:
-            raise HTTPException(status_code=400, detail="No clustering analysis found for session")
+        if labels is not None:
+            headers["Content-Disposition"] = f"attachment; filename={session_id}_clustering_labels.csv"
+            return StreamingResponse(iter_labels_csv(labels), media_type="text/csv", headers=headers)
 
-        # Extract best algorithm labels if available (stored in session results is summarized; re-run quick labeling is out of scope)
-        # Here we export summary rows as a placeholder CSV for documentation.
-        # If labels are available, export per-row labels; else export summary
-        labels = analysis.get('labels') or []
+        rows = analysis.get('clustering_results', [])
+        if not rows:
+            raise HTTPException(status_code=400, detail="No clustering results to export")
         import io
         output = io.StringIO()
-        if labels:
-            writer = csv.DictWriter(output, fieldnames=['row_index', 'cluster_label'])
-            writer.writeheader()
-            for idx, lab in enumerate(labels):
-                writer.writerow({'row_index': idx, 'cluster_label': lab})
-            filename = f"{session_id}_clustering_labels.csv"
-        else:
-            rows = analysis.get('clustering_results', [])
-            if not rows:
-                raise HTTPException(status_code=400, detail="No clustering results to export")
-            writer = csv.DictWriter(output, fieldnames=['algorithm', 'silhouette', 'calinski', 'davies', 'n_clusters', 'n_noise'])
-            writer.writeheader()
-            for r in rows:
-                writer.writerow({
-                    'algorithm': r.get('algorithm'),
-                    'silhouette': r.get('silhouette'),
-                    'calinski': r.get('calinski'),
-                    'davies': r.get('davies'),
-                    'n_clusters': r.get('n_clusters'),
-                    'n_noise': r.get('n_noise')
-                })
-            filename = f"{session_id}_clustering_summary.csv"
-
-        csv_bytes = output.getvalue().encode('utf-8')
-        return FileResponse(
-            io.BytesIO(csv_bytes),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}",
-                "X-RateLimit-Limit": str(rate_limit["limit"]),
-                "X-RateLimit-Remaining": str(rate_limit["remaining"])
-            }
-        )
+        writer = csv.DictWriter(output, fieldnames=['algorithm', 'silhouette', 'calinski', 'davies', 'n_clusters', 'n_noise'])
+        writer.writeheader()
+        for r in rows:
+            writer.writerow({
+                'algorithm': r.get('algorithm'),
+                'silhouette': r.get('silhouette'),
+                'calinski': r.get('calinski'),
+                'davies': r.get('davies'),
+                'n_clusters': r.get('n_clusters'),
+                'n_noise': r.get('n_noise')
+            })
+        headers["Content-Disposition"] = f"attachment; filename={session_id}_clustering_summary.csv"
+        return Response(content=output.getvalue().encode('utf-8'), media_type="text/csv", headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Clustering export failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1636,7 +2246,7 @@ async def get_regression_results(
         results = session_data.get('training_results')
         if not results:
             # Check if training is still in progress
-            if session_data.get('status') == 'training_in_progress':
+            if session_data.get('status') in ['training_queued', 'training_in_progress']:
                 if attempt < max_retries - 1:
                     await asyncio.sleep(retry_delay)
                     continue
@@ -1646,7 +2256,7 @@ async def get_regression_results(
                 continue
             raise HTTPException(status_code=404, detail="No training results found for this session")
         
-        return results
+        return FastJSONResponse(results)
     
     raise HTTPException(status_code=404, detail="No training results found for this session")
 
@@ -1666,7 +2276,7 @@ async def get_classification_results(
     results = session_data.get('training_results')
     if not results:
         raise HTTPException(status_code=404, detail="No training results found for this session")
-    return results
+    return FastJSONResponse(results)
 
 if __name__ == "__main__":
     import uvicorn
@@ -6,6 +6,7 @@ import pandas as pd
 import numpy as np
 import psutil
 import gc
+import hashlib
 from typing import Dict, Any, Optional, List, Union
 import logging
 from functools import wraps
@@ -269,6 +270,20 @@ def process_in_batches(data: pd.DataFrame, processor_func, batch_size: int = 100
     
     return results
 
+def fingerprint_data(*items: Union[pd.DataFrame, pd.Series, np.ndarray]) -> str:
+    """Content hash of DataFrames/Series/arrays, used as a cache key for derived results"""
+    digest = hashlib.sha256()
+    for item in items:
+        if isinstance(item, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(item, index=False).values.tobytes())
+            columns = item.columns if isinstance(item, pd.DataFrame) else [item.name]
+            digest.update(repr(list(columns)).encode('utf-8'))
+        else:
+            array = np.ascontiguousarray(item)
+            digest.update(str((array.shape, array.dtype.str)).encode('utf-8'))
+            digest.update(array.tobytes() if array.dtype != object else repr(array.tolist()).encode('utf-8'))
+    return digest.hexdigest()
+
 # Export utilities
 memory_manager = MemoryManager()
 df_processor = DataFrameProcessor()
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Bounded executor for synchronous ML work
+Runs blocking pandas/scikit-learn calls off the event loop on a fixed thread pool with a bounded backlog, so heavy requests cannot stall /health or each other
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Executor configuration
+ML_EXECUTOR_WORKERS = int(os.getenv("ML_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+ML_EXECUTOR_MAX_QUEUE = int(os.getenv("ML_EXECUTOR_MAX_QUEUE", str(2 * ML_EXECUTOR_WORKERS)))  # Waiting calls beyond the busy threads
+ML_EXECUTOR_RETRY_AFTER = int(os.getenv("ML_EXECUTOR_RETRY_AFTER", "10"))  # Seconds, used until run times are known
+TIMING_WINDOW = 200  # Recent calls kept for wait/run time statistics
+
+T = TypeVar("T")
+
+
+class ExecutorSaturated(Exception):
+    """Raised instead of queueing when every thread is busy and the backlog is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"ML executor is saturated; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class MLExecutor:
+    """Thread pool with admission control.
+
+    At most ``max_workers`` calls run at once and at most ``max_queue`` more wait
+    for a thread; further calls are rejected with ``ExecutorSaturated`` carrying
+    a Retry-After estimate from recent run times. NumPy, pandas and scikit-learn
+    release the GIL in their heavy loops, so threads give real concurrency here
+    while the event loop stays free.
+    """
+
+    def __init__(self, max_workers: int = ML_EXECUTOR_WORKERS, max_queue: int = ML_EXECUTOR_MAX_QUEUE):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ml-exec")
+        self._lock = threading.Lock()
+        self._pending = 0  # Admitted calls not yet finished (running + waiting)
+        self._active = 0
+        self._counts = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'cancelled': 0}
+        self._wait_times: deque = deque(maxlen=TIMING_WINDOW)
+        self._run_times: deque = deque(maxlen=TIMING_WINDOW)
+        logger.info(f"✅ ML executor initialized ({max_workers} workers, queue {max_queue})")
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: backlog size times mean run time over the workers."""
+        with self._lock:
+            run_times = list(self._run_times)
+            waiting = max(0, self._pending - self.max_workers)
+        if not run_times:
+            return ML_EXECUTOR_RETRY_AFTER
+        mean_run = sum(run_times) / len(run_times)
+        return max(1, int(round(mean_run * (waiting + 1) / self.max_workers)))
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._counts['rejected'] += 1
+                saturated = True
+            else:
+                self._pending += 1
+                self._counts['submitted'] += 1
+                saturated = False
+        if saturated:
+            raise ExecutorSaturated(self.retry_after())
+
+    def _release(self, future: Future):
+        # Runs whether the call finished, failed or was cancelled before starting
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                self._counts['cancelled'] += 1
+            elif future.exception() is not None:
+                self._counts['failed'] += 1
+            else:
+                self._counts['completed'] += 1
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``func(*args, **kwargs)`` on the pool, or raise ExecutorSaturated immediately."""
+        return await self.submit(func, *args, **kwargs)
+
+    def submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> "asyncio.Future[T]":
+        """Admit and start ``func`` now, returning an awaitable for its result.
+
+        For callers that must know the call was admitted (or rejected) before
+        they start responding, e.g. a streaming response that follows the call.
+        """
+        self._admit()
+        submitted_at = time.monotonic()
+
+        def call() -> T:
+            started_at = time.monotonic()
+            with self._lock:
+                self._active += 1
+                self._wait_times.append(started_at - submitted_at)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._run_times.append(time.monotonic() - started_at)
+
+        future = self._executor.submit(call)
+        future.add_done_callback(self._release)
+        return asyncio.wrap_future(future)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            wait_times = list(self._wait_times)
+            run_times = list(self._run_times)
+            pending, active = self._pending, self._active
+            counts = dict(self._counts)
+        capacity = self.max_workers + self.max_queue
+        return {
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'active': active,
+            'queued': max(0, pending - active),
+            'utilization': round(pending / capacity, 3) if capacity else 0.0,
+            'saturated': pending >= capacity,
+            **counts,
+            'avg_wait_ms': round(1000 * sum(wait_times) / len(wait_times), 1) if wait_times else 0.0,
+            'max_wait_ms': round(1000 * max(wait_times), 1) if wait_times else 0.0,
+            'avg_run_ms': round(1000 * sum(run_times) / len(run_times), 1) if run_times else 0.0
+        }
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Global executor instance
+ml_executor = MLExecutor()
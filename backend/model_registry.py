@@ -0,0 +1,304 @@
+"""
+Persistent model registry for trained ML pipelines
+Stores fitted pipelines per session on disk and keeps recently used models warm in memory
+"""
+
+import os
+import re
+import json
+import shutil
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+# Registry configuration
+MODEL_STORAGE_PATH = os.getenv("MODEL_STORAGE_PATH", "/tmp/ml_models")
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "16"))  # Warm models kept in memory
+
+METADATA_FILE = "metadata.json"
+STATE_FILE = "state.joblib"
+ARTIFACTS_DIR = "artifacts"
+VERSIONS_DIR = ".versions"  # Complete session directories; each session path is a symlink to one
+
+
+class ModelRegistry:
+    """Disk-backed store of trained pipelines with an LRU cache of loaded models.
+
+    Models are written uncompressed with joblib so their NumPy buffers can be
+    memory-mapped on load (``mmap_mode='r'``); several workers serving the same
+    session then share one copy of the weights through the page cache.
+
+    A session is written in full to a new directory under ``.versions`` and
+    published by atomically replacing the session's symlink, so readers see
+    either the previous or the new models, never a partial write. Warm
+    entries remember the ``saved_at`` they were loaded from and are reloaded
+    once another process (e.g. a training worker) has saved newer models.
+    """
+
+    def __init__(self, storage_path: str = MODEL_STORAGE_PATH, cache_size: int = MODEL_CACHE_SIZE):
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.cache_size = cache_size
+        (self.storage_path / VERSIONS_DIR).mkdir(exist_ok=True)
+        # Values are (saved_at, object) so entries written by another process are detected
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[str, Any]]" = OrderedDict()
+        self._state_cache: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        logger.info(f"✅ Model registry initialized at {self.storage_path}")
+
+    def _session_dir(self, session_id: str) -> Path:
+        safe_id = re.sub(r'[^\w.-]', '_', session_id)
+        return self.storage_path / safe_id
+
+    @staticmethod
+    def _model_filename(model_name: str) -> str:
+        safe_name = re.sub(r'[^\w.-]', '_', model_name)
+        return f"{safe_name}.joblib"
+
+    def _evict(self):
+        while len(self._cache) > self.cache_size:
+            key, _ = self._cache.popitem(last=False)
+            logger.info(f"Evicted warm model {key[0]}/{key[1]}")
+        while len(self._state_cache) > self.cache_size:
+            self._state_cache.popitem(last=False)
+
+    def _invalidate(self, session_id: str):
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == session_id]:
+                del self._cache[key]
+            self._state_cache.pop(session_id, None)
+
+    def _new_version_dir(self, session_id: str) -> Path:
+        return self.storage_path / VERSIONS_DIR / f"{self._session_dir(session_id).name}.{uuid.uuid4().hex[:12]}"
+
+    def _publish(self, session_id: str, version_dir: Path):
+        """Point the session at a fully written version directory and drop the version it replaces."""
+        session_dir = self._session_dir(session_id)
+        previous = session_dir.resolve() if session_dir.is_symlink() else None
+        link_tmp = self.storage_path / f".{session_dir.name}.{uuid.uuid4().hex[:8]}.link"
+        os.symlink(os.path.relpath(version_dir, self.storage_path), link_tmp)
+        if session_dir.exists() and not session_dir.is_symlink():
+            # Session written before versioned directories were used
+            shutil.rmtree(session_dir)
+        os.replace(link_tmp, session_dir)
+        if previous is not None and previous != version_dir.resolve():
+            shutil.rmtree(previous, ignore_errors=True)
+
+    @staticmethod
+    def _remove_session_dir(session_dir: Path):
+        if session_dir.is_symlink():
+            target = session_dir.resolve()
+            session_dir.unlink()
+            shutil.rmtree(target, ignore_errors=True)
+        else:
+            shutil.rmtree(session_dir, ignore_errors=True)
+
+    def save(self, session_id: str, tool_type: str, models: Dict[str, Any],
+             best_model_name: str, state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Persist fitted models and their serving state for a session."""
+        version_dir = self._new_version_dir(session_id)
+        version_dir.mkdir(parents=True)
+
+        for model_name, model in models.items():
+            joblib.dump(model, version_dir / self._model_filename(model_name))
+
+        joblib.dump(state or {}, version_dir / STATE_FILE)
+
+        metadata = {
+            'session_id': session_id,
+            'tool_type': tool_type,
+            'best_model': best_model_name,
+            'models': sorted(models.keys()),
+            'feature_columns': (state or {}).get('feature_columns'),
+            'saved_at': datetime.now().isoformat()
+        }
+        with open(version_dir / METADATA_FILE, 'w') as f:
+            json.dump(metadata, f)
+
+        self._publish(session_id, version_dir)
+        self._invalidate(session_id)
+        logger.info(f"Saved {len(models)} models for session {session_id} (best: {best_model_name})")
+        return metadata
+
+    def save_workflow(self, session_id: str, tool_type: str, workflow: Any) -> Optional[Dict[str, Any]]:
+        """Persist every trained model of a regression/classification workflow."""
+        trained = getattr(workflow, 'models', None) or {}
+        models = {
+            name: result['model'] for name, result in trained.items()
+            if isinstance(result, dict) and result.get('model') is not None
+        }
+        best_model_name = (getattr(workflow, 'results', None) or {}).get('best_model_name')
+        if not models or not best_model_name:
+            return None
+        return self.save(session_id, tool_type, models, best_model_name, workflow.get_serving_state())
+
+    def get_metadata(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Read registry metadata for a session, or None if nothing is stored."""
+        metadata_path = self._session_dir(session_id) / METADATA_FILE
+        if not metadata_path.exists():
+            return None
+        with open(metadata_path, 'r') as f:
+            return json.load(f)
+
+    def has_models(self, session_id: str) -> bool:
+        return (self._session_dir(session_id) / METADATA_FILE).exists()
+
+    def load_model(self, session_id: str, model_name: Optional[str] = None) -> Tuple[str, Any]:
+        """Return (model_name, model), loading from disk only on a cache miss."""
+        metadata = self.get_metadata(session_id)
+        if not metadata:
+            raise KeyError(f"No trained models stored for session {session_id}")
+
+        model_name = model_name or metadata['best_model']
+        if model_name not in metadata['models']:
+            raise KeyError(f"Model '{model_name}' not stored for session {session_id}")
+
+        key = (session_id, model_name)
+        saved_at = metadata.get('saved_at')
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == saved_at:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return model_name, cached[1]
+            self._misses += 1
+
+        model = joblib.load(self._session_dir(session_id) / self._model_filename(model_name), mmap_mode='r')
+
+        with self._lock:
+            self._cache[key] = (saved_at, model)
+            self._evict()
+
+        return model_name, model
+
+    def load_state(self, session_id: str) -> Dict[str, Any]:
+        """Return the serving state (feature columns, encoders, results) for a session."""
+        saved_at = (self.get_metadata(session_id) or {}).get('saved_at')
+        with self._lock:
+            cached = self._state_cache.get(session_id)
+            if cached is not None and cached[0] == saved_at:
+                self._state_cache.move_to_end(session_id)
+                return cached[1]
+
+        state = joblib.load(self._session_dir(session_id) / STATE_FILE)
+
+        with self._lock:
+            self._state_cache[session_id] = (saved_at, state)
+            self._evict()
+
+        return state
+
+    def attach(self, workflow: Any, session_id: str, model_name: Optional[str] = None) -> bool:
+        """Restore a stored model into a fresh workflow so it can serve predictions."""
+        if not self.has_models(session_id) or not hasattr(workflow, 'restore_serving_state'):
+            return False
+        name, model = self.load_model(session_id, model_name)
+        workflow.restore_serving_state(self.load_state(session_id), model, name)
+        return True
+
+    def read_artifact(self, session_id: str, name: str) -> Optional[str]:
+        """A derived artifact (e.g. rendered plots) stored next to the session's models, or None."""
+        path = self._session_dir(session_id) / ARTIFACTS_DIR / re.sub(r'[^\w.-]', '_', name)
+        try:
+            return path.read_text()
+        except OSError:
+            return None
+
+    def write_artifact(self, session_id: str, name: str, content: str, saved_at: Optional[str] = None) -> bool:
+        """Store a derived artifact; it is dropped with the models when the session retrains.
+
+        With ``saved_at``, the write is skipped if the models were replaced since
+        that save, so a slow computation cannot attach stale output to new models.
+        """
+        metadata = self.get_metadata(session_id)
+        if not metadata or (saved_at and metadata.get('saved_at') != saved_at):
+            return False
+        artifacts_dir = self._session_dir(session_id) / ARTIFACTS_DIR
+        artifacts_dir.mkdir(exist_ok=True)
+        path = artifacts_dir / re.sub(r'[^\w.-]', '_', name)
+        tmp_path = artifacts_dir / f".{path.name}.{os.getpid()}.{threading.get_ident()}"
+        tmp_path.write_text(content)
+        os.replace(tmp_path, path)
+        return True
+
+    @staticmethod
+    def _link_or_copy(src: str, dst: str):
+        # Hard links share the model bytes; fall back to a copy across filesystems
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+    def copy_models(self, session_id: str, dest_dir: Path):
+        """Snapshot a session's stored models into ``dest_dir`` (e.g. for the training cache)."""
+        shutil.copytree(self._session_dir(session_id), dest_dir, copy_function=self._link_or_copy)
+
+    def restore_models(self, src_dir: Path, session_id: str) -> Dict[str, Any]:
+        """Replace a session's stored models with a snapshot taken by ``copy_models``."""
+        version_dir = self._new_version_dir(session_id)
+        shutil.copytree(src_dir, version_dir, copy_function=self._link_or_copy)
+
+        metadata_path = version_dir / METADATA_FILE
+        with open(metadata_path, 'r') as f:
+            metadata = json.load(f)
+        metadata['session_id'] = session_id
+        metadata['saved_at'] = datetime.now().isoformat()
+        # Write a new file rather than through the hard link shared with the snapshot
+        metadata_path.unlink()
+        with open(metadata_path, 'w') as f:
+            json.dump(metadata, f)
+
+        self._publish(session_id, version_dir)
+        self._invalidate(session_id)
+        logger.info(f"Restored {len(metadata['models'])} stored models into session {session_id}")
+        return metadata
+
+    def delete(self, session_id: str) -> bool:
+        """Remove every stored model for a session."""
+        self._invalidate(session_id)
+        session_dir = self._session_dir(session_id)
+        if session_dir.exists() or session_dir.is_symlink():
+            self._remove_session_dir(session_dir)
+            return True
+        return False
+
+    def cleanup_old_models(self, max_age_hours: int = 24) -> int:
+        """Remove stored models older than the session lifetime."""
+        cutoff_time = datetime.now().timestamp() - (max_age_hours * 3600)
+        removed = 0
+        for session_dir in self.storage_path.iterdir():
+            if session_dir.name.startswith('.') or not (session_dir.is_dir() or session_dir.is_symlink()):
+                continue
+            metadata_path = session_dir / METADATA_FILE
+            if not metadata_path.exists() or metadata_path.stat().st_mtime < cutoff_time:
+                self._invalidate(session_dir.name)
+                self._remove_session_dir(session_dir)
+                removed += 1
+        # Versions left behind by interrupted saves
+        for version_dir in (self.storage_path / VERSIONS_DIR).iterdir():
+            if version_dir.stat().st_mtime < cutoff_time:
+                shutil.rmtree(version_dir, ignore_errors=True)
+        return removed
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'warm_models': len(self._cache),
+                'cache_size': self.cache_size,
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+
+# Global registry instance
+model_registry = ModelRegistry()
@@ -0,0 +1,133 @@
+"""
+Plot downsampling
+Reduces large scatter and line series to a bounded number of points before they are shipped as Plotly figures, keeping their visual shape (peaks, outliers, sparse regions)
+"""
+
+import os
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Sampling configuration
+VIZ_MAX_POINTS = int(os.getenv("VIZ_MAX_POINTS", "2000"))  # Per trace
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of ``n_out`` points that preserve a series' shape.
+
+    ``x`` must be sorted. The first and last points are always kept; every
+    bucket in between contributes the point forming the largest triangle with
+    the previously kept point and the average of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # n_out - 2 buckets over the interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], max(edges[b + 1], edges[b] + 1)
+        next_start, next_end = end, (edges[b + 2] if b + 2 < len(edges) else n)
+        next_end = max(next_end, next_start + 1)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Twice the triangle area; the constant factor does not change the argmax
+        areas = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev]) - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(areas))
+        selected[b + 1] = prev
+    return selected
+
+
+def density_sample_indices(x: np.ndarray, y: np.ndarray, n_out: int, seed: int = 42) -> np.ndarray:
+    """Indices of at most ``n_out`` points from an unordered scatter, thinning dense regions first.
+
+    Points are binned on a 2-D grid. Every occupied cell keeps at least one
+    point, so outliers and sparse regions survive; the remaining budget is
+    shared out in proportion to cell counts, so dense regions stay visibly
+    denser. Selection inside a cell is random with a fixed seed, so the same
+    data always yields the same plot.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # At most half the budget goes to the one-per-cell guarantee
+    grid = max(1, int(np.sqrt(n_out / 2)))
+    cells = _grid_cells(x, grid) * grid + _grid_cells(y, grid)
+
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(n), cells))
+    sorted_cells = cells[order]
+    cell_ids, first, counts = np.unique(sorted_cells, return_index=True, return_counts=True)
+
+    quota = np.maximum(1, (counts * (n_out - len(cell_ids))) // n)
+    # Rank of each point within its cell (0 for the first point of the cell in random order)
+    rank = np.arange(n) - np.repeat(first, counts)
+    keep = rank < np.repeat(quota, counts)
+    return np.sort(order[keep])
+
+
+def grouped_scatter_indices(x: np.ndarray, y: np.ndarray, groups: np.ndarray,
+                            max_points: Optional[int] = None, seed: int = 42) -> np.ndarray:
+    """Indices of at most ``max_points`` from a scatter colored by ``groups`` (e.g. cluster labels).
+    
+    Each group gets a share of the budget proportional to its size but never
+    fewer than ``min(size, max_points // (2 * n_groups))`` points, so small
+    groups stay visible; each share is then density-sampled within its group.
+    """
+    max_points = max_points or VIZ_MAX_POINTS
+    n = len(groups)
+    if n <= max_points:
+        return np.arange(n)
+    
+    group_ids, inverse, counts = np.unique(groups, return_inverse=True, return_counts=True)
+    floor = np.minimum(counts, max(1, max_points // (2 * len(group_ids))))
+    quota = np.minimum(counts, floor + (counts * max(0, max_points - floor.sum())) // n)
+    
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    selected = []
+    for g in range(len(group_ids)):
+        members = order[bounds[g]:bounds[g + 1]]
+        keep = density_sample_indices(x[members], y[members], int(quota[g]), seed=seed)
+        selected.append(members[keep])
+    return np.sort(np.concatenate(selected))
+
+
+def _grid_cells(values: np.ndarray, grid: int) -> np.ndarray:
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return np.zeros(len(values), dtype=np.int64)
+    low, high = finite.min(), finite.max()
+    span = high - low if high > low else 1.0
+    scaled = np.nan_to_num((values - low) / span, nan=0.0, posinf=1.0, neginf=0.0)
+    return np.clip((scaled * grid).astype(np.int64), 0, grid - 1)
+
+
+def downsample_series(x: np.ndarray, y: np.ndarray,
+                      max_points: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Line-like series (sorted ``x``): LTTB down to ``max_points``."""
+    max_points = max_points or VIZ_MAX_POINTS
+    idx = lttb_indices(x, y, max_points)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def scatter_indices(x: np.ndarray, y: np.ndarray, max_points: Optional[int] = None) -> np.ndarray:
+    """Indices for an unordered scatter of at most ``max_points`` (density-aware)."""
+    max_points = max_points or VIZ_MAX_POINTS
+    return density_sample_indices(x, y, max_points)
@@ -0,0 +1,296 @@
+"""
+Progress events for long-running ML work
+Training, clustering and EDA publish per-model, per-fold and per-stage events to a shared store (Redis Stream, or SQLite when Redis is not available) that the WebSocket relay and the SSE endpoint read from
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+# Conditional Redis import
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from session_storage import REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD
+
+# Progress configuration
+PROGRESS_BACKEND = os.getenv("PROGRESS_BACKEND", "auto")  # auto, redis or sqlite
+PROGRESS_DB_PATH = os.getenv("PROGRESS_DB_PATH", "/tmp/ml_progress/events.db")
+PROGRESS_MAX_EVENTS = int(os.getenv("PROGRESS_MAX_EVENTS", "1000"))  # Retained per session
+PROGRESS_TTL_SECONDS = int(os.getenv("PROGRESS_TTL_SECONDS", "86400"))
+PROGRESS_POLL_INTERVAL = float(os.getenv("PROGRESS_POLL_INTERVAL", "0.5"))  # Seconds between relay/SSE reads
+
+STARTED = 'started'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+TERMINAL_EVENTS = (DONE, FAILED, CANCELLED)
+
+ProgressCallback = Callable[[str, float, Optional[Dict[str, Any]]], None]
+
+
+class ProgressStore:
+    """Append-only event log per session; event ids increase within a session."""
+
+    def publish(self, session_id: str, event: Dict[str, Any]) -> str:
+        raise NotImplementedError
+
+    def read(self, session_id: str, after_id: Optional[str] = None,
+             limit: int = PROGRESS_MAX_EVENTS) -> List[Dict[str, Any]]:
+        """Events newer than ``after_id`` (all retained events when None), oldest first, each with its ``id``."""
+        raise NotImplementedError
+
+    def latest_id(self, session_id: str) -> Optional[str]:
+        """Id of the newest event, used as a cursor to follow only what comes next."""
+        raise NotImplementedError
+
+    def request_stop(self, session_id: str):
+        """Ask the session's running training to finish after the current model."""
+        raise NotImplementedError
+
+    def stop_requested_at(self, session_id: str) -> Optional[float]:
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+    def cleanup(self, max_age_seconds: int = PROGRESS_TTL_SECONDS) -> int:
+        return 0
+
+    def read_latest_run(self, session_id: str) -> List[Dict[str, Any]]:
+        """Events of the most recently started run, so late subscribers can catch up."""
+        events = self.read(session_id)
+        for i in range(len(events) - 1, -1, -1):
+            if events[i].get('event') == STARTED:
+                return events[i:]
+        return events
+
+
+class RedisProgressStore(ProgressStore):
+    """Redis Stream per session, capped at PROGRESS_MAX_EVENTS and expiring with the session."""
+
+    STREAM_KEY = "progress:{}"
+    STOP_KEY = "progress_stop:{}"
+
+    def __init__(self):
+        try:
+            self.redis_client = redis.Redis(
+                host=REDIS_HOST,
+                port=REDIS_PORT,
+                db=REDIS_DB,
+                password=REDIS_PASSWORD,
+                decode_responses=True
+            )
+            self.redis_client.ping()
+            self.backend = 'redis'
+            logger.info("✅ Redis progress store initialized")
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis progress store: {e}")
+            raise
+
+    def publish(self, session_id: str, event: Dict[str, Any]) -> str:
+        key = self.STREAM_KEY.format(session_id)
+        pipe = self.redis_client.pipeline()
+        pipe.xadd(key, {'data': json.dumps(event)}, maxlen=PROGRESS_MAX_EVENTS, approximate=True)
+        pipe.expire(key, PROGRESS_TTL_SECONDS)
+        event_id, _ = pipe.execute()
+        return event_id
+
+    def read(self, session_id: str, after_id: Optional[str] = None,
+             limit: int = PROGRESS_MAX_EVENTS) -> List[Dict[str, Any]]:
+        # "(" makes the lower bound exclusive
+        start = f"({after_id}" if after_id else '-'
+        entries = self.redis_client.xrange(self.STREAM_KEY.format(session_id), min=start, max='+', count=limit)
+        return [{'id': event_id, **json.loads(fields['data'])} for event_id, fields in entries]
+
+    def latest_id(self, session_id: str) -> Optional[str]:
+        entries = self.redis_client.xrevrange(self.STREAM_KEY.format(session_id), count=1)
+        return entries[0][0] if entries else None
+
+    def request_stop(self, session_id: str):
+        self.redis_client.set(self.STOP_KEY.format(session_id), time.time(), ex=PROGRESS_TTL_SECONDS)
+
+    def stop_requested_at(self, session_id: str) -> Optional[float]:
+        value = self.redis_client.get(self.STOP_KEY.format(session_id))
+        return float(value) if value else None
+
+    def delete(self, session_id: str):
+        self.redis_client.delete(self.STREAM_KEY.format(session_id), self.STOP_KEY.format(session_id))
+
+
+class SQLiteProgressStore(ProgressStore):
+    """SQLite event table (fallback when Redis is not available), shared by the API and worker processes."""
+
+    def __init__(self, db_path: str = PROGRESS_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.backend = 'sqlite'
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL,"
+            " created_at REAL NOT NULL, data TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS events_session ON events (session_id, id)")
+        conn.execute("CREATE TABLE IF NOT EXISTS stops (session_id TEXT PRIMARY KEY, requested_at REAL NOT NULL)")
+        logger.info(f"✅ SQLite progress store initialized at {self.db_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; autocommit mode
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def publish(self, session_id: str, event: Dict[str, Any]) -> str:
+        conn = self._connect()
+        cursor = conn.execute(
+            "INSERT INTO events (session_id, created_at, data) VALUES (?, ?, ?)",
+            (session_id, time.time(), json.dumps(event))
+        )
+        event_id = cursor.lastrowid
+        if event.get('event') == STARTED:
+            # Trim once per run rather than on every event
+            conn.execute(
+                "DELETE FROM events WHERE session_id = ? AND id <= ?",
+                (session_id, event_id - PROGRESS_MAX_EVENTS)
+            )
+        return str(event_id)
+
+    def read(self, session_id: str, after_id: Optional[str] = None,
+             limit: int = PROGRESS_MAX_EVENTS) -> List[Dict[str, Any]]:
+        rows = self._connect().execute(
+            "SELECT id, data FROM events WHERE session_id = ? AND id > ? ORDER BY id LIMIT ?",
+            (session_id, int(after_id) if after_id else 0, limit)
+        ).fetchall()
+        return [{'id': str(event_id), **json.loads(data)} for event_id, data in rows]
+
+    def latest_id(self, session_id: str) -> Optional[str]:
+        row = self._connect().execute("SELECT MAX(id) FROM events WHERE session_id = ?", (session_id,)).fetchone()
+        return str(row[0]) if row and row[0] is not None else None
+
+    def request_stop(self, session_id: str):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO stops (session_id, requested_at) VALUES (?, ?)", (session_id, time.time())
+        )
+
+    def stop_requested_at(self, session_id: str) -> Optional[float]:
+        row = self._connect().execute("SELECT requested_at FROM stops WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def delete(self, session_id: str):
+        conn = self._connect()
+        conn.execute("DELETE FROM events WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM stops WHERE session_id = ?", (session_id,))
+
+    def cleanup(self, max_age_seconds: int = PROGRESS_TTL_SECONDS) -> int:
+        conn = self._connect()
+        cutoff = time.time() - max_age_seconds
+        conn.execute("DELETE FROM stops WHERE requested_at < ?", (cutoff,))
+        cursor = conn.execute("DELETE FROM events WHERE created_at < ?", (cutoff,))
+        return cursor.rowcount
+
+
+class ProgressTracker:
+    """Publishes the progress of one run (a training, clustering or EDA task) for a session.
+
+    Workflows call ``update(event, progress, data)`` with their own progress in
+    [0, 1]; the tracker adds percent, elapsed time and an ETA extrapolated from
+    the rate so far. ``scoped(start, end)`` maps a workflow's progress onto a
+    slice of the run when a task chains several workflow calls. Publishing
+    never raises: a progress outage must not fail the work it reports on.
+    """
+
+    def __init__(self, session_id: str, task: str, store: Optional[ProgressStore] = None):
+        self.session_id = session_id
+        self.task = task
+        self.store = store or progress_store
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.progress = 0.0
+
+    def _publish(self, event: str, data: Optional[Dict[str, Any]] = None):
+        elapsed = time.time() - self.started_at
+        eta = None
+        if 0 < self.progress < 1:
+            eta = round(elapsed * (1 - self.progress) / self.progress, 1)
+        payload = {
+            'run_id': self.run_id,
+            'task': self.task,
+            'event': event,
+            'progress': round(self.progress, 4),
+            'percent': round(100 * self.progress, 1),
+            'elapsed_s': round(elapsed, 1),
+            'eta_s': eta,
+            'timestamp': time.time(),
+            'data': data or {}
+        }
+        try:
+            self.store.publish(self.session_id, payload)
+        except Exception as e:
+            logger.warning(f"Progress publish failed for session {self.session_id}: {e}")
+
+    def start(self, data: Optional[Dict[str, Any]] = None) -> 'ProgressTracker':
+        self.started_at = time.time()
+        self.progress = 0.0
+        self._publish(STARTED, data)
+        return self
+
+    def update(self, event: str, progress: float, data: Optional[Dict[str, Any]] = None):
+        # Progress never moves backwards, even if a workflow re-reports an earlier stage
+        self.progress = min(1.0, max(self.progress, float(progress)))
+        self._publish(event, data)
+
+    def scoped(self, start: float, end: float) -> ProgressCallback:
+        """Callback mapping a workflow's own 0-1 progress onto [start, end] of this run."""
+        def report(event: str, progress: float, data: Optional[Dict[str, Any]] = None):
+            self.update(event, start + (end - start) * progress, data)
+        return report
+
+    def stop_requested(self) -> bool:
+        """True once a stop was requested for this session after this run started."""
+        try:
+            requested_at = self.store.stop_requested_at(self.session_id)
+        except Exception as e:
+            logger.warning(f"Stop check failed for session {self.session_id}: {e}")
+            return False
+        return requested_at is not None and requested_at >= self.started_at
+
+    def done(self, data: Optional[Dict[str, Any]] = None):
+        self.progress = 1.0
+        self._publish(DONE, data)
+
+    def failed(self, error: str, data: Optional[Dict[str, Any]] = None):
+        self._publish(FAILED, {'error': error, **(data or {})})
+
+    def cancelled(self, data: Optional[Dict[str, Any]] = None):
+        self._publish(CANCELLED, data)
+
+
+# Factory function to create appropriate store
+def create_progress_store() -> ProgressStore:
+    """Create progress store instance based on availability"""
+    if PROGRESS_BACKEND != 'sqlite' and REDIS_AVAILABLE:
+        try:
+            return RedisProgressStore()
+        except Exception as e:
+            logger.warning(f"Redis connection failed ({e}), falling back to SQLite progress store")
+    return SQLiteProgressStore()
+
+
+# Global store instance
+progress_store = create_progress_store()
@@ -14,21 +14,32 @@ import joblib
 import json
 from pathlib import Path
 import logging
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Dict, List, Optional, Tuple, Any, Union, Callable
 from dataclasses import dataclass, asdict
 import hashlib
 import base64
 
 # Machine Learning
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV, RandomizedSearchCV
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.linear_model import LinearRegression, Ridge, Lasso, ElasticNet
+from sklearn.model_selection import train_test_split, check_cv, GridSearchCV, RandomizedSearchCV, KFold
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder, TargetEncoder, FunctionTransformer
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.base import BaseEstimator, TransformerMixin, clone, is_classifier
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, HistGradientBoostingRegressor
+from sklearn.linear_model import LinearRegression, Ridge, Lasso, ElasticNet, enet_path
 from sklearn.svm import SVR
-from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+from sklearn.kernel_approximation import Nystroem
+from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error, check_scoring
 from sklearn.inspection import permutation_importance
 from sklearn.pipeline import Pipeline
-from scipy import stats
+from sklearn.utils import _safe_indexing
+from scipy import stats, sparse
+from scipy.sparse.linalg import LinearOperator, lsqr, svds
+
+from incremental_training import IncrementalTrainer
+from dataset_store import MatrixArtifact
+from plot_sampling import downsample_series, scatter_indices
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -48,6 +59,22 @@ class RegressionConfig:
     hyperparameter_tuning: bool = True
     tuning_method: str = 'random'
     tuning_iterations: int = 50
+    large_data_substitution: bool = True
+    svm_approximation_threshold: int = 10000
+    boosting_hist_threshold: int = 10000
+    kernel_approximation_components: int = 300
+    regularization_path: bool = True
+    n_alphas: int = 50
+    elastic_net_l1_ratio: float = 0.5
+    path_max_features: int = 20
+    training_mode: str = 'batch'
+    chunk_size: int = 50000
+    incremental_epochs: int = 3
+    cluster_features: int = 8
+    hash_features: int = 32
+    onehot_max_cardinality: int = 20
+    target_encoding_min_rows_per_level: int = 20
+    sparse_threshold: float = 0.3
     
     def __post_init__(self):
         if self.models_to_include is None:
@@ -136,14 +163,213 @@ class DataValidator:
         
         return summary
 
+def _as_string(X: Any) -> np.ndarray:
+    """Categorical values as strings so mixed-type columns encode consistently."""
+    return np.asarray(X).astype(str)
+
+def _to_dense(X: Any) -> Any:
+    return X.toarray() if sparse.issparse(X) else X
+
+def _requires_dense(model: Any) -> bool:
+    """Estimators (or pipeline steps) that reject sparse input in scikit-learn 1.3."""
+    if isinstance(model, Pipeline):
+        return any(_requires_dense(step) for _, step in model.steps)
+    return isinstance(model, HistGradientBoostingRegressor)
+
+class ColumnHasher(BaseEstimator, TransformerMixin):
+    """Hash every categorical column into its own block of ``n_features`` sparse columns.
+    
+    Stateless apart from the column count, so unseen levels at prediction time
+    simply land in an existing bucket.
+    """
+    
+    def __init__(self, n_features: int = 32):
+        self.n_features = n_features
+    
+    def fit(self, X: Any, y: Any = None) -> 'ColumnHasher':
+        self.n_features_in_ = np.asarray(X).shape[1]
+        return self
+    
+    def transform(self, X: Any) -> sparse.csr_matrix:
+        values = _as_string(X)
+        hasher = FeatureHasher(n_features=self.n_features, input_type='string',
+                               alternate_sign=False, dtype=np.float32)
+        return sparse.hstack(
+            [hasher.transform(values[:, [j]]) for j in range(values.shape[1])], format='csr'
+        )
+    
+    def get_feature_names_out(self, input_features: Any = None) -> np.ndarray:
+        if input_features is None:
+            input_features = [f"x{j}" for j in range(self.n_features_in_)]
+        return np.asarray(
+            [f"{col}_hash_{i}" for col in input_features for i in range(self.n_features)], dtype=object
+        )
+
+class FeatureEncoder:
+    """Fitted ColumnTransformer shared by training and serving.
+    
+    Each categorical column gets an encoding chosen from its cardinality:
+    sparse one-hot up to ``onehot_max_cardinality`` levels; above that, target
+    encoding when levels average at least ``target_encoding_min_rows_per_level``
+    rows, otherwise feature hashing into ``hash_features`` columns. Target
+    encoding is cross-fitted, so every training row is encoded with statistics
+    from folds that exclude it. Label encoding maps every categorical column to
+    ordinal codes instead. Numeric columns are median-imputed.
+    """
+    
+    def __init__(self, config: RegressionConfig):
+        self.config = config
+        self.transformer = None
+        self.input_columns = []
+        self.numeric_columns = []
+        self.strategies = {}
+        self.memory = {}
+        self.steps = []
+    
+    def _choose_strategy(self, cardinality: int, n_rows: int) -> str:
+        if self.config.encode_categorical in ['label', 'label_encoding']:
+            return 'ordinal'
+        if cardinality <= self.config.onehot_max_cardinality:
+            return 'onehot'
+        if n_rows / cardinality >= self.config.target_encoding_min_rows_per_level:
+            return 'target'
+        return 'hashing'
+    
+    def _categorical_pipeline(self, encoder: Any) -> Pipeline:
+        return Pipeline([
+            ('impute', SimpleImputer(strategy='most_frequent')),
+            ('as_string', FunctionTransformer(_as_string, feature_names_out='one-to-one')),
+            ('encode', encoder)
+        ])
+    
+    def _build(self) -> ColumnTransformer:
+        encoders = {
+            'onehot': OneHotEncoder(handle_unknown='ignore', sparse_output=True, dtype=np.float32),
+            'hashing': ColumnHasher(n_features=self.config.hash_features),
+            'target': TargetEncoder(
+                target_type='continuous',
+                cv=self.config.cv_folds,
+                random_state=self.config.random_state
+            ),
+            'ordinal': OrdinalEncoder(
+                handle_unknown='use_encoded_value', unknown_value=-1, dtype=np.float32
+            )
+        }
+        transformers = []
+        if self.numeric_columns:
+            transformers.append(('numeric', SimpleImputer(strategy='median'), self.numeric_columns))
+        for strategy, encoder in encoders.items():
+            columns = [col for col, info in self.strategies.items() if info['strategy'] == strategy]
+            if columns:
+                transformers.append((strategy, self._categorical_pipeline(encoder), columns))
+        return ColumnTransformer(
+            transformers,
+            sparse_threshold=self.config.sparse_threshold,
+            verbose_feature_names_out=False
+        )
+    
+    def _prepare(self, X: pd.DataFrame) -> pd.DataFrame:
+        X = X.reindex(columns=self.input_columns)
+        bool_columns = [col for col in self.numeric_columns if pd.api.types.is_bool_dtype(X[col])]
+        if bool_columns:
+            X = X.astype({col: float for col in bool_columns})
+        return X
+    
+    def fit_transform(self, X: pd.DataFrame, y: Any) -> Any:
+        """Fit on training rows only and return their encoded matrix (CSR when mostly zeros).
+        
+        Held-out and prediction rows must go through ``transform``, so their
+        targets never reach the target-encoding statistics.
+        """
+        self.input_columns = X.columns.tolist()
+        self.numeric_columns = [col for col in self.input_columns if pd.api.types.is_numeric_dtype(X[col])]
+        categorical_columns = [col for col in self.input_columns if col not in self.numeric_columns]
+        
+        n_rows = len(X)
+        self.strategies = {}
+        for col in categorical_columns:
+            cardinality = int(X[col].nunique())
+            self.strategies[col] = {
+                'cardinality': cardinality,
+                'strategy': self._choose_strategy(max(1, cardinality), n_rows)
+            }
+        
+        self.transformer = self._build()
+        X_encoded = self.transformer.fit_transform(self._prepare(X), np.asarray(y, dtype=np.float64))
+        
+        # Per-column output width, for the encoding report
+        for name, _, columns in self.transformer.transformers_:
+            if name == 'numeric' or name == 'remainder':
+                continue
+            encoder = self.transformer.named_transformers_[name].named_steps['encode']
+            for i, col in enumerate(columns):
+                if name == 'onehot':
+                    width = len(encoder.categories_[i])
+                elif name == 'hashing':
+                    width = encoder.n_features
+                else:
+                    width = 1
+                self.strategies[col]['n_outputs'] = int(width)
+        
+        # Dense one-hot (get_dummies as float32) is the baseline the encoded block replaces
+        encoded_bytes = (
+            X_encoded.data.nbytes + X_encoded.indices.nbytes + X_encoded.indptr.nbytes
+            if sparse.issparse(X_encoded) else X_encoded.nbytes
+        )
+        dense_onehot_columns = len(self.numeric_columns) + sum(
+            info['cardinality'] for info in self.strategies.values()
+        )
+        self.memory = {
+            'before_mb': round(float(X.memory_usage(deep=True).sum()) / 1024**2, 3),
+            'after_mb': round(encoded_bytes / 1024**2, 3),
+            'dense_onehot_mb': round(n_rows * dense_onehot_columns * 4 / 1024**2, 3)
+        }
+        
+        self.steps = []
+        for strategy in ('onehot', 'hashing', 'target', 'ordinal'):
+            columns = [col for col, info in self.strategies.items() if info['strategy'] == strategy]
+            if not columns:
+                continue
+            if strategy == 'onehot':
+                self.steps.append(f"One-hot encoded {len(columns)} low-cardinality columns (sparse)")
+            elif strategy == 'hashing':
+                self.steps.append(
+                    f"Hashed {len(columns)} high-cardinality columns into {self.config.hash_features} features each"
+                )
+            elif strategy == 'target':
+                self.steps.append(
+                    f"Target encoded {len(columns)} high-cardinality columns ({self.config.cv_folds}-fold out-of-fold)"
+                )
+            else:
+                self.steps.append(f"Label encoded {len(columns)} categorical columns")
+        self.steps.append(
+            f"Encoded features use {self.memory['after_mb']} MB "
+            f"(raw columns {self.memory['before_mb']} MB, dense one-hot {self.memory['dense_onehot_mb']} MB)"
+        )
+        if sparse.issparse(X_encoded):
+            self.steps.append(f"Kept encoded features sparse ({X_encoded.nnz / max(1, np.prod(X_encoded.shape)):.2%} non-zero)")
+        return X_encoded
+    
+    def transform(self, X: pd.DataFrame) -> Any:
+        """Apply the fitted transform; missing input columns are treated as missing values."""
+        return self.transformer.transform(self._prepare(X))
+    
+    def get_feature_names(self) -> List[str]:
+        return [str(name) for name in self.transformer.get_feature_names_out()]
+    
+    def get_report(self) -> Dict[str, Any]:
+        return {
+            'columns': self.strategies,
+            'memory': self.memory
+        }
+
 class DataProcessor:
     """Handle data preprocessing."""
     
     def __init__(self, config: RegressionConfig):
         self.config = config
         self.preprocessing_steps = []
-        self.encoders = {}
-        self.scalers = {}
+        self.feature_encoder = None
         
     def handle_missing_values(self, data: pd.DataFrame, target_column: str) -> pd.DataFrame:
         """Handle missing values based on configuration."""
@@ -158,7 +384,7 @@ class DataProcessor:
                     continue
                     
                 if data[col].isnull().sum() > 0:
-                    if data[col].dtype in ['object', 'category']:
+                    if not pd.api.types.is_numeric_dtype(data[col]):
                         mode_value = data[col].mode()
                         fill_value = mode_value[0] if len(mode_value) > 0 else 'Unknown'
                         data[col] = data[col].fillna(fill_value)
@@ -170,26 +396,19 @@ class DataProcessor:
         
         return data
     
-    def encode_categorical_features(self, data: pd.DataFrame, target_column: str) -> pd.DataFrame:
-        """Encode categorical features."""
-        data = data.copy()
-        feature_columns = [col for col in data.columns if col != target_column]
-        categorical_cols = data[feature_columns].select_dtypes(include=['object', 'category']).columns.tolist()
-        
-        if not categorical_cols:
-            return data
-        
-        if self.config.encode_categorical in ['onehot', 'one_hot_encoding']:
-            data = pd.get_dummies(data, columns=categorical_cols, prefix_sep='_', drop_first=True)
-            self.preprocessing_steps.append(f"One-hot encoded {len(categorical_cols)} categorical columns")
-        elif self.config.encode_categorical in ['label', 'label_encoding']:
-            for col in categorical_cols:
-                le = LabelEncoder()
-                data[col] = le.fit_transform(data[col].astype(str))
-                self.encoders[col] = le
-                self.preprocessing_steps.append(f"Label encoded '{col}'")
-        
-        return data
+    def encode_categorical_features(self, data: pd.DataFrame, target_column: str) -> Tuple[Any, np.ndarray]:
+        """Fit the feature encoder on training rows and return the encoded matrix and the numeric target."""
+        y = pd.to_numeric(data[target_column]).to_numpy(dtype=np.float64)
+        self.feature_encoder = FeatureEncoder(self.config)
+        X = self.feature_encoder.fit_transform(data.drop(columns=[target_column]), y)
+        self.preprocessing_steps.extend(self.feature_encoder.steps)
+        return X, y
+    
+    def encode_holdout(self, data: pd.DataFrame, target_column: str) -> Tuple[Any, np.ndarray]:
+        """Encode held-out rows with the already fitted encoder; their targets are not used."""
+        y = pd.to_numeric(data[target_column]).to_numpy(dtype=np.float64)
+        X = self.feature_encoder.transform(data.drop(columns=[target_column]))
+        return X, y
     
     def get_preprocessing_summary(self) -> List[str]:
         """Get summary of preprocessing steps performed."""
@@ -202,9 +421,15 @@ class ModelTrainer:
         self.config = config
         self.models = {}
         self.trained_models = {}
+        self.substitutions = {}
+        
+    def initialize_models(self, n_samples: Optional[int] = None, n_features: Optional[int] = None) -> Dict[str, Any]:
+        """Initialize regression models.
         
-    def initialize_models(self) -> Dict[str, Any]:
-        """Initialize regression models."""
+        When ``n_samples`` is given and exceeds the configured thresholds, models that
+        scale quadratically or worse are replaced by approximate equivalents. Every
+        replacement is recorded in ``self.substitutions``.
+        """
         available_models = {
             'linear': LinearRegression(),
             'ridge': Ridge(random_state=self.config.random_state),
@@ -222,6 +447,13 @@ class ModelTrainer:
             'svr': SVR()
         }
         
+        self.substitutions = {}
+        if n_samples is not None and self.config.large_data_substitution:
+            for name, (model, description) in self.get_large_data_models(n_samples, n_features).items():
+                available_models[name] = model
+                if name in self.config.models_to_include:
+                    self.substitutions[name] = description
+        
         self.models = {
             name: model for name, model in available_models.items()
             if name in self.config.models_to_include
@@ -229,6 +461,35 @@ class ModelTrainer:
         
         return self.models
     
+    def get_large_data_models(self, n_samples: int, n_features: Optional[int] = None) -> Dict[str, Tuple[Any, str]]:
+        """Approximate estimators to use above the configured row thresholds."""
+        substitutes = {}
+        
+        if n_samples >= self.config.svm_approximation_threshold:
+            n_components = min(self.config.kernel_approximation_components, n_samples)
+            substitutes['svr'] = (
+                Pipeline([
+                    ('kernel', Nystroem(
+                        kernel='rbf',
+                        n_components=n_components,
+                        random_state=self.config.random_state
+                    )),
+                    ('linear', Ridge(random_state=self.config.random_state))
+                ]),
+                f"Nystroem RBF approximation ({n_components} components) + Ridge instead of SVR"
+            )
+        
+        if n_samples >= self.config.boosting_hist_threshold:
+            substitutes['gradient_boosting'] = (
+                HistGradientBoostingRegressor(
+                    max_iter=100,
+                    random_state=self.config.random_state
+                ),
+                "HistGradientBoostingRegressor instead of GradientBoostingRegressor"
+            )
+        
+        return substitutes
+    
     def train_model(self, model_name: str, X_train: pd.DataFrame, y_train: pd.Series) -> Any:
         """Train a single model."""
         if model_name not in self.models:
@@ -237,8 +498,18 @@ class ModelTrainer:
         model = self.models[model_name]
         
         if model_name == 'svr' or self.config.scale_features:
+            # Sparse input is scaled without centering, or densified first for estimators that need it
+            steps = [('scaler', StandardScaler(with_mean=not sparse.issparse(X_train))), ('model', model)]
+            if sparse.issparse(X_train) and _requires_dense(model):
+                steps = [('densify', FunctionTransformer(_to_dense, accept_sparse=True)),
+                         ('scaler', StandardScaler()), ('model', model)]
+            pipeline = Pipeline(steps)
+            pipeline.fit(X_train, y_train)
+            self.trained_models[model_name] = pipeline
+            return pipeline
+        elif sparse.issparse(X_train) and _requires_dense(model):
             pipeline = Pipeline([
-                ('scaler', StandardScaler()),
+                ('densify', FunctionTransformer(_to_dense, accept_sparse=True)),
                 ('model', model)
             ])
             pipeline.fit(X_train, y_train)
@@ -249,23 +520,237 @@ class ModelTrainer:
             self.trained_models[model_name] = model
             return model
 
+class RegularizationPathTrainer:
+    """Tune Ridge, Lasso and ElasticNet along warm-started regularization paths.
+    
+    Every CV fold computes the full path in one pass: Lasso/ElasticNet via
+    coordinate descent with warm starts (``enet_path``) and Ridge from one
+    eigendecomposition of the centered Gram matrix reused for all alphas
+    (LSQR per alpha when there are more than ``GRAM_MAX_FEATURES`` columns).
+    Sparse input stays sparse: centering is implicit, never materialized.
+    The alpha with the lowest mean CV error is kept.
+    """
+    
+    PATH_MODELS = ('ridge', 'lasso', 'elastic_net')
+    GRAM_MAX_FEATURES = 2000
+    
+    def __init__(self, config: RegressionConfig):
+        self.config = config
+        self.paths = {}
+        self.best_alphas = {}
+    
+    @staticmethod
+    def _prepare(X: Any, y: Any) -> Tuple[Any, np.ndarray]:
+        """Float64 copies of X (CSR when sparse) and y."""
+        if sparse.issparse(X):
+            X = sparse.csr_matrix(X, dtype=np.float64)
+        else:
+            X = np.asarray(X, dtype=np.float64)
+        return X, np.asarray(y, dtype=np.float64)
+    
+    def _scale(self, X_fit: Any, *others: Any) -> Tuple[Any, ...]:
+        """Standardize with statistics from ``X_fit`` only, as the training pipeline does.
+        
+        Sparse input is scaled without centering, so it stays sparse.
+        """
+        if not self.config.scale_features:
+            return (X_fit,) + others
+        scaler = StandardScaler(with_mean=not sparse.issparse(X_fit)).fit(X_fit)
+        return tuple(scaler.transform(X) for X in (X_fit,) + others)
+    
+    @staticmethod
+    def _column_means(X: Any) -> np.ndarray:
+        return np.asarray(X.mean(axis=0)).ravel()
+    
+    @staticmethod
+    def _centered_operator(X: Any, X_mean: np.ndarray) -> LinearOperator:
+        """X minus its column means as a linear operator, without densifying sparse X."""
+        return LinearOperator(
+            X.shape,
+            matvec=lambda v: X @ np.ravel(v) - X_mean @ np.ravel(v),
+            rmatvec=lambda u: X.T @ np.ravel(u) - X_mean * np.ravel(u).sum(),
+            dtype=np.float64
+        )
+    
+    @staticmethod
+    def _centered_gram(X: Any, X_mean: np.ndarray) -> np.ndarray:
+        """(X - mean)^T (X - mean) as a dense (n_features, n_features) array."""
+        if sparse.issparse(X):
+            gram = (X.T @ X).toarray()
+            return gram - X.shape[0] * np.outer(X_mean, X_mean)
+        Xc = X - X_mean
+        return Xc.T @ Xc
+    
+    def _enet_alphas(self, X: Any, y: np.ndarray, l1_ratio: float) -> np.ndarray:
+        """Alpha grid from the smallest alpha that zeroes every coefficient down 3 decades."""
+        # X^T (y - mean) already equals the centered product, so X is used as is
+        alpha_max = np.abs(X.T @ (y - y.mean())).max() / (len(y) * l1_ratio)
+        if not np.isfinite(alpha_max) or alpha_max <= 0:
+            alpha_max = 1.0
+        return np.logspace(np.log10(alpha_max), np.log10(alpha_max * 1e-3), self.config.n_alphas)
+    
+    def _ridge_alphas(self, X: Any) -> np.ndarray:
+        """Alpha grid scaled to the largest squared singular value of centered X."""
+        X_mean = self._column_means(X)
+        if X.shape[1] <= self.GRAM_MAX_FEATURES:
+            s2_max = np.linalg.eigvalsh(self._centered_gram(X, X_mean))[-1]
+        else:
+            s_max = svds(self._centered_operator(X, X_mean), k=1, return_singular_vectors=False)[0]
+            s2_max = s_max ** 2
+        scale = s2_max if s2_max > 0 else 1.0
+        return scale * np.logspace(0, -6, self.config.n_alphas)
+    
+    @classmethod
+    def _enet_coef_path(cls, X: Any, y: np.ndarray, alphas: np.ndarray,
+                        l1_ratio: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Coefficients (n_features, n_alphas) and intercepts along an elastic-net path."""
+        X_mean, y_mean = cls._column_means(X), y.mean()
+        if sparse.issparse(X):
+            # Coordinate descent centers sparse columns implicitly from the offsets
+            _, coefs, _ = enet_path(X, y - y_mean, l1_ratio=l1_ratio, alphas=alphas,
+                                    X_offset=X_mean, X_scale=np.ones_like(X_mean))
+        else:
+            _, coefs, _ = enet_path(X - X_mean, y - y_mean, l1_ratio=l1_ratio, alphas=alphas)
+        intercepts = y_mean - X_mean @ coefs
+        return coefs, intercepts
+    
+    def _ridge_coef_path(self, X: Any, y: np.ndarray, alphas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Coefficients (n_features, n_alphas) and intercepts for every alpha."""
+        X_mean, y_mean = self._column_means(X), y.mean()
+        y_centered = y - y_mean
+        if X.shape[1] <= self.GRAM_MAX_FEATURES:
+            eigvals, V = np.linalg.eigh(self._centered_gram(X, X_mean))
+            eigvals = np.clip(eigvals, 0, None)
+            Vtz = V.T @ (X.T @ y_centered)
+            coefs = V @ (Vtz[:, None] / (eigvals[:, None] + alphas[None, :]))
+        else:
+            operator = self._centered_operator(X, X_mean)
+            coefs = np.column_stack([
+                lsqr(operator, y_centered, damp=np.sqrt(alpha))[0] for alpha in alphas
+            ])
+        intercepts = y_mean - X_mean @ coefs
+        return coefs, intercepts
+    
+    def _coef_path(self, name: str, X: Any, y: np.ndarray,
+                   alphas: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if name == 'ridge':
+            return self._ridge_coef_path(X, y, alphas)
+        l1_ratio = 1.0 if name == 'lasso' else self.config.elastic_net_l1_ratio
+        return self._enet_coef_path(X, y, alphas, l1_ratio)
+    
+    def fit(self, X_train: Any, y_train: Any, model_names: List[str],
+            feature_names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Compute CV error along each path and record the best alpha per model."""
+        names = [name for name in self.PATH_MODELS if name in model_names]
+        if not names:
+            return {}
+        
+        X, y = self._prepare(X_train, y_train)
+        X_scaled = self._scale(X)[0]
+        feature_names = feature_names or [f"feature_{i}" for i in range(X.shape[1])]
+        folds = list(KFold(
+            n_splits=self.config.cv_folds,
+            shuffle=True,
+            random_state=self.config.random_state
+        ).split(X))
+        
+        for name in names:
+            if name == 'ridge':
+                alphas = self._ridge_alphas(X_scaled)
+            else:
+                l1_ratio = 1.0 if name == 'lasso' else self.config.elastic_net_l1_ratio
+                alphas = self._enet_alphas(X_scaled, y, l1_ratio)
+            
+            fold_mse = np.empty((len(folds), len(alphas)))
+            for i, (train_idx, val_idx) in enumerate(folds):
+                # Scaler statistics come from the fold's training rows only
+                X_fold, X_val = self._scale(X[train_idx], X[val_idx])
+                coefs, intercepts = self._coef_path(name, X_fold, y[train_idx], alphas)
+                preds = X_val @ coefs + intercepts
+                fold_mse[i] = ((preds - y[val_idx, None]) ** 2).mean(axis=0)
+            
+            mse_mean = fold_mse.mean(axis=0)
+            best_idx = int(np.argmin(mse_mean))
+            
+            # Full-data path for the visualization layer, limited to the largest coefficients
+            coefs, _ = self._coef_path(name, X_scaled, y, alphas)
+            top = np.argsort(-np.abs(coefs).max(axis=1))[:self.config.path_max_features]
+            
+            self.best_alphas[name] = float(alphas[best_idx])
+            self.paths[name] = {
+                'alphas': alphas.tolist(),
+                'cv_mse_mean': mse_mean.tolist(),
+                'cv_mse_std': fold_mse.std(axis=0).tolist(),
+                'best_alpha': float(alphas[best_idx]),
+                'best_cv_mse': float(mse_mean[best_idx]),
+                'n_nonzero': (np.abs(coefs) > 1e-10).sum(axis=0).astype(int).tolist(),
+                'coefficient_paths': {
+                    feature_names[j]: coefs[j].tolist() for j in top
+                }
+            }
+        
+        return self.paths
+    
+    def get_tuned_models(self) -> Dict[str, Any]:
+        """Estimators refit at the selected alphas."""
+        tuned = {}
+        for name, alpha in self.best_alphas.items():
+            if name == 'ridge':
+                tuned[name] = Ridge(alpha=alpha, random_state=self.config.random_state)
+            elif name == 'lasso':
+                tuned[name] = Lasso(alpha=alpha, random_state=self.config.random_state)
+            else:
+                tuned[name] = ElasticNet(
+                    alpha=alpha,
+                    l1_ratio=self.config.elastic_net_l1_ratio,
+                    random_state=self.config.random_state
+                )
+        return tuned
+
+def _fit_and_score_fold(model: Any, X: Any, y: Any, scorer: Any, train: np.ndarray, test: np.ndarray) -> float:
+    """Fit a fresh clone on one CV training split and score it on the held-out split."""
+    estimator = clone(model)
+    try:
+        estimator.fit(_safe_indexing(X, train), _safe_indexing(y, train))
+        return float(scorer(estimator, _safe_indexing(X, test), _safe_indexing(y, test)))
+    except Exception as e:
+        # Same as cross_val_score's error_score=np.nan
+        logger.warning(f"Cross-validation fold failed: {e}")
+        return float('nan')
+
 class ModelEvaluator:
     """Evaluate model performance."""
     
     def __init__(self, config: RegressionConfig):
         self.config = config
     
+    def cross_validate(self, model: Any, X: Any, y: Any,
+                       on_fold: Optional[Callable[[int, int, float], None]] = None) -> np.ndarray:
+        """Cross-validation scores, reporting each fold as it finishes.
+        
+        Equivalent to ``cross_val_score(..., n_jobs=-1)``, but folds are consumed
+        from a joblib generator so ``on_fold(fold, n_folds, score)`` fires per fold.
+        """
+        cv = check_cv(self.config.cv_folds, y, classifier=is_classifier(model))
+        scorer = check_scoring(model, scoring=self.config.scoring_metric)
+        splits = list(cv.split(X, y))
+        folds = joblib.Parallel(n_jobs=-1, return_as='generator')(
+            joblib.delayed(_fit_and_score_fold)(model, X, y, scorer, train, test) for train, test in splits
+        )
+        scores = []
+        for fold, score in enumerate(folds, 1):
+            scores.append(score)
+            if on_fold is not None:
+                on_fold(fold, len(splits), score)
+        return np.array(scores)
+    
     def evaluate_model(self, model: Any, X_train: pd.DataFrame, X_test: pd.DataFrame,
-                      y_train: pd.Series, y_test: pd.Series, model_name: str) -> Tuple[Dict[str, float], np.ndarray]:
-        """Evaluate a single model."""
+                      y_train: pd.Series, y_test: pd.Series, model_name: str,
+                      on_fold: Optional[Callable[[int, int, float], None]] = None) -> Tuple[Dict[str, float], np.ndarray, np.ndarray]:
+        """Evaluate a single model; also returns its test-set predictions."""
         
         # Cross-validation
-        cv_scores = cross_val_score(
-            model, X_train, y_train,
-            cv=self.config.cv_folds,
-            scoring=self.config.scoring_metric,
-            n_jobs=-1
-        )
+        cv_scores = self.cross_validate(model, X_train, y_train, on_fold)
         
         # Test predictions
         y_pred = model.predict(X_test)
@@ -279,7 +764,7 @@ class ModelEvaluator:
             'test_mae': float(mean_absolute_error(y_test, y_pred))
         }
         
-        return metrics, cv_scores
+        return metrics, cv_scores, y_pred
 
 class ModelVisualizer:
     """Create visualizations for model analysis."""
@@ -342,10 +827,49 @@ class ModelVisualizer:
         return fig.to_dict()
     
     @staticmethod
-    def create_residual_plots(y_true: pd.Series, y_pred: np.ndarray) -> Dict[str, Any]:
-        """Create residual analysis plots."""
+    def create_regularization_path_chart(paths: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Create CV error vs. alpha curves for the regularized linear models."""
+        
+        fig = go.Figure()
+        
+        for name, path in paths.items():
+            fig.add_trace(go.Scatter(
+                x=path['alphas'],
+                y=path['cv_mse_mean'],
+                mode='lines',
+                name=name,
+                error_y=dict(type='data', array=path['cv_mse_std'], visible=False)
+            ))
+            fig.add_trace(go.Scatter(
+                x=[path['best_alpha']],
+                y=[path['best_cv_mse']],
+                mode='markers',
+                name=f"{name} best alpha",
+                marker=dict(size=10, symbol='star')
+            ))
+        
+        fig.update_layout(
+            title="Regularization Path (CV MSE vs. Alpha)",
+            xaxis_title="Alpha",
+            yaxis_title="CV Mean Squared Error",
+            xaxis_type='log',
+            height=450
+        )
+        
+        return fig.to_dict()
+    
+    @staticmethod
+    def create_residual_plots(y_true: Any, y_pred: np.ndarray, max_points: Optional[int] = None) -> Dict[str, Any]:
+        """Create residual analysis plots.
+        
+        Statistics use every test point; the scatter panels are thinned with
+        density-aware sampling and the Q-Q line with LTTB, and the histogram is
+        sent as pre-binned bars, so the figure size does not grow with the test set.
+        """
         
-        residuals = y_true - y_pred
+        y_pred = np.asarray(y_pred, dtype=np.float64)
+        residuals = np.asarray(y_true, dtype=np.float64) - y_pred
+        n_points = len(residuals)
         
         fig = make_subplots(
             rows=2, cols=2,
@@ -356,8 +880,9 @@ class ModelVisualizer:
         )
         
         # Residuals vs Predicted
+        shown = scatter_indices(y_pred, residuals, max_points)
         fig.add_trace(
-            go.Scatter(x=y_pred, y=residuals, mode='markers',
+            go.Scatter(x=y_pred[shown], y=residuals[shown], mode='markers',
                       name='Residuals', marker=dict(opacity=0.6)),
             row=1, col=1
         )
@@ -370,32 +895,37 @@ class ModelVisualizer:
             row=1, col=1
         )
         
-        # Residual distribution
+        # Residual distribution, binned here rather than shipping every residual
+        counts, edges = np.histogram(residuals, bins=30)
         fig.add_trace(
-            go.Histogram(x=residuals, nbinsx=30, name='Distribution'),
+            go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), name='Distribution'),
             row=1, col=2
         )
         
         # Q-Q Plot
         sorted_residuals = np.sort(residuals)
         theoretical_quantiles = stats.norm.ppf(np.linspace(0.01, 0.99, len(sorted_residuals)))
+        qq_x, qq_y = downsample_series(theoretical_quantiles, sorted_residuals, max_points)
         
         fig.add_trace(
-            go.Scatter(x=theoretical_quantiles, y=sorted_residuals,
+            go.Scatter(x=qq_x, y=qq_y,
                       mode='markers', name='Q-Q Plot'),
             row=2, col=1
         )
         
         # Standardized residuals
-        std_residuals = residuals / residuals.std()
+        std_residuals = residuals / residuals.std(ddof=1)
         fig.add_trace(
-            go.Scatter(x=y_pred, y=std_residuals, mode='markers',
+            go.Scatter(x=y_pred[shown], y=std_residuals[shown], mode='markers',
                       name='Standardized'),
             row=2, col=2
         )
         
-        fig.update_layout(height=600, showlegend=False, 
-                         title_text="Residual Analysis")
+        title = "Residual Analysis"
+        if len(shown) < n_points:
+            title += f" ({len(shown):,} of {n_points:,} test points shown)"
+        fig.update_layout(height=600, showlegend=False, bargap=0,
+                         title_text=title)
         
         return fig.to_dict()
 
@@ -407,12 +937,27 @@ class RegressionWorkflow:
         self.data_processor = DataProcessor(self.config)
         self.model_trainer = ModelTrainer(self.config)
         self.model_evaluator = ModelEvaluator(self.config)
+        self.path_trainer = RegularizationPathTrainer(self.config)
         self.results = {}
         self.feature_columns = None
         self.models = {}  # Store models separately from results
         self.best_model = None  # Store best model separately
         self.X_test = None  # Store test data for predictions
         self.y_test = None
+        self.evaluation = None  # Compact test-set targets/predictions of the best model, for plots
+        self.processed_matrix = None  # MatrixArtifact from preprocess_data
+        self.preprocessor = None  # Fitted FeatureEncoder, reused at prediction time
+        self.progress_callback = None  # Optional (event, progress, data) hook for live progress
+        self.should_stop = None  # Optional () -> bool, checked between models to skip the rest
+    
+    def _report(self, event: str, progress: float, data: Optional[Dict[str, Any]] = None):
+        """Forward a progress event; reporting failures never interrupt training."""
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback(event, progress, data)
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
     
     def validate_data(self, data: pd.DataFrame, target_column: str) -> Dict[str, Any]:
         """Validate uploaded data."""
@@ -425,25 +970,52 @@ class RegressionWorkflow:
         }
     
     def preprocess_data(self, data: pd.DataFrame, target_column: str) -> Dict[str, Any]:
-        """Preprocess the data."""
+        """Fit the feature encoder and encode the training matrix."""
         try:
+            # Drop rows with missing target values
+            processed_data = data.dropna(subset=[target_column])
+            if len(processed_data) < len(data):
+                self.data_processor.preprocessing_steps.append("Removed rows with missing target values")
+            
             # Handle missing values
-            processed_data = self.data_processor.handle_missing_values(data, target_column)
+            processed_data = self.data_processor.handle_missing_values(processed_data, target_column)
             
-            # Encode categorical features
-            processed_data = self.data_processor.encode_categorical_features(processed_data, target_column)
+            # Split before encoding: target encoding must only see training targets
+            train_data, test_data = train_test_split(
+                processed_data,
+                test_size=self.config.test_size,
+                random_state=self.config.random_state
+            )
             
-            # Update feature columns
-            self.feature_columns = [col for col in processed_data.columns if col != target_column]
+            # Encode categorical features by cardinality into a (possibly sparse) matrix
+            X_train, y_train = self.data_processor.encode_categorical_features(train_data, target_column)
+            X_test, y_test = self.data_processor.encode_holdout(test_data, target_column)
+            self.preprocessor = self.data_processor.feature_encoder
+            self.feature_columns = self.preprocessor.get_feature_names()
             
             preprocessing_summary = self.data_processor.get_preprocessing_summary()
             
+            # Training rows first, then the held-out rows; train_models reuses this split
+            if sparse.issparse(X_train):
+                X = sparse.vstack([X_train, X_test], format='csr')
+            else:
+                X = np.vstack([X_train, X_test])
+            y = np.concatenate([y_train, y_test])
+            
+            # Compact float32 block (CSR when sparse) handed to training; the client only gets a preview
+            self.processed_matrix = MatrixArtifact.from_matrix(
+                X, y, self.feature_columns, target_column, preprocessor=self.preprocessor,
+                train_rows=int(X_train.shape[0])
+            )
+            
             return {
                 'success': True,
-                'processed_data': processed_data.to_dict('records'),
+                'preview': self.processed_matrix.preview(),
+                'matrix': self.processed_matrix.summary(),
+                'encoding': self.preprocessor.get_report(),
                 'feature_columns': self.feature_columns,
                 'preprocessing_steps': preprocessing_summary,
-                'final_shape': processed_data.shape
+                'final_shape': self.processed_matrix.shape
             }
             
         except Exception as e:
@@ -452,45 +1024,109 @@ class RegressionWorkflow:
                 'error': str(e)
             }
     
-    def train_models(self, data: pd.DataFrame, target_column: str) -> Dict[str, Any]:
-        """Train and evaluate models."""
+    def load_processed_matrix(self, artifact: MatrixArtifact) -> MatrixArtifact:
+        """Adopt a stored preprocessing artifact (matrix and fitted encoder) for training."""
+        self.processed_matrix = artifact
+        self.feature_columns = artifact.feature_columns
+        self.preprocessor = artifact.preprocessor
+        return artifact
+    
+    def train_models(self, data: Union[pd.DataFrame, MatrixArtifact], target_column: str) -> Dict[str, Any]:
+        """Train and evaluate models on a DataFrame or a preprocessed (possibly sparse) matrix."""
         try:
-            # Ensure feature_columns is set
-            if self.feature_columns is None:
-                self.feature_columns = [col for col in data.columns if col != target_column]
-            
             # Prepare data
-            X = data[self.feature_columns]
-            y = data[target_column]
+            train_rows = None
+            if isinstance(data, MatrixArtifact):
+                self.feature_columns = data.feature_columns
+                X, y = data.X, data.y
+                # Matrices from preprocess_data were encoded with the split already made
+                train_rows = data.metadata.get('train_rows')
+            else:
+                # Ensure feature_columns is set
+                if self.feature_columns is None:
+                    self.feature_columns = [col for col in data.columns if col != target_column]
+                X = data[self.feature_columns]
+                y = data[target_column]
             
             # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, 
-                test_size=self.config.test_size,
-                random_state=self.config.random_state
-            )
+            if train_rows is not None:
+                X_train, X_test = X[:train_rows], X[train_rows:]
+                y_train, y_test = y[:train_rows], y[train_rows:]
+            else:
+                X_train, X_test, y_train, y_test = train_test_split(
+                    X, y, 
+                    test_size=self.config.test_size,
+                    random_state=self.config.random_state
+                )
             
-            # Initialize models
-            models = self.model_trainer.initialize_models()
+            # Initialize models (size-aware: large training sets get approximate estimators)
+            models = self.model_trainer.initialize_models(n_samples=X_train.shape[0], n_features=X_train.shape[1])
+            model_substitutions = dict(self.model_trainer.substitutions)
+            if model_substitutions:
+                logger.info(f"Large-data substitutions for {X_train.shape[0]} rows: {model_substitutions}")
+            
+            # Tune alpha for the regularized linear models along their paths
+            regularization_paths = {}
+            if self.config.regularization_path:
+                regularization_paths = self.path_trainer.fit(
+                    X_train, y_train, list(models), self.feature_columns
+                )
+                models.update(self.path_trainer.get_tuned_models())
             
             # Train and evaluate each model
             model_results = {}
             cross_validation_scores = {}
+            test_predictions = {}
             
-            for model_name in models:
+            # Each model is one slice of progress: its fit, then one step per CV fold
+            n_models = len(models)
+            steps_per_model = self.config.cv_folds + 1
+            
+            skipped_models = []
+            
+            for index, model_name in enumerate(models):
+                # The user picked a model from the partial leaderboard: keep what is done, skip the rest
+                if model_results and self.should_stop is not None and self.should_stop():
+                    skipped_models = list(models)[index:]
+                    logger.info(f"Training stopped early; skipping {skipped_models}")
+                    self._report('stopped', index / n_models, {'skipped_models': skipped_models})
+                    break
+                
+                def fold_done(fold: int, n_folds: int, score: float, index=index, model_name=model_name):
+                    self._report('fold_complete', (index + (1 + fold) / (n_folds + 1)) / n_models, {
+                        'model': model_name, 'fold': fold, 'n_folds': n_folds, 'score': score
+                    })
+                
+                self._report('model_started', index / n_models, {
+                    'model': model_name, 'index': index + 1, 'n_models': n_models
+                })
+                
                 # Train model
                 trained_model = self.model_trainer.train_model(model_name, X_train, y_train)
+                self._report('model_fitted', (index + 1 / steps_per_model) / n_models, {'model': model_name})
                 
                 # Evaluate model
-                metrics, cv_scores = self.model_evaluator.evaluate_model(
-                    trained_model, X_train, X_test, y_train, y_test, model_name
+                metrics, cv_scores, y_pred = self.model_evaluator.evaluate_model(
+                    trained_model, X_train, X_test, y_train, y_test, model_name, on_fold=fold_done
                 )
                 
                 model_results[model_name] = {
                     'model': trained_model,
                     'metrics': metrics
                 }
+                test_predictions[model_name] = y_pred
                 cross_validation_scores[model_name] = cv_scores.tolist()
+                
+                # Partial result: this model's metrics are final once its folds are scored
+                leaderboard = sorted(
+                    ({'model': name, 'test_r2': result['metrics']['test_r2'], 'cv_mean': result['metrics']['cv_mean']}
+                     for name, result in model_results.items()),
+                    key=lambda row: row['test_r2'], reverse=True
+                )
+                self._report('model_complete', (index + 1) / n_models, {
+                    'model': model_name, 'index': index + 1, 'n_models': n_models, 'metrics': metrics,
+                    'cv_scores': cross_validation_scores[model_name], 'leaderboard': leaderboard
+                })
             
             # Create comparison DataFrame
             comparison_data = []
@@ -505,19 +1141,20 @@ class RegressionWorkflow:
             best_model_name = comparison_df.iloc[0]['Model']
             best_model = model_results[best_model_name]['model']
             
-            # Generate feature importance if possible
+            # Generate feature importance if possible; fitted models sit inside a scaling Pipeline
             feature_importance = None
-            if hasattr(best_model, 'feature_importances_'):
+            estimator = best_model.named_steps['model'] if hasattr(best_model, 'named_steps') else best_model
+            n_features = len(self.feature_columns)
+            if hasattr(estimator, 'feature_importances_') and len(estimator.feature_importances_) == n_features:
                 importance_df = pd.DataFrame({
                     'feature': self.feature_columns,
-                    'importance': best_model.feature_importances_
+                    'importance': estimator.feature_importances_
                 }).sort_values('importance', ascending=False)
                 feature_importance = importance_df.to_dict('records')
-            elif hasattr(best_model, 'coef_'):
-                coef = best_model.coef_ if hasattr(best_model, 'coef_') else best_model.named_steps['model'].coef_
+            elif hasattr(estimator, 'coef_') and np.ravel(estimator.coef_).shape[0] == n_features:
                 importance_df = pd.DataFrame({
                     'feature': self.feature_columns,
-                    'importance': np.abs(coef)
+                    'importance': np.abs(np.ravel(estimator.coef_))
                 }).sort_values('importance', ascending=False)
                 feature_importance = importance_df.to_dict('records')
             
@@ -526,6 +1163,7 @@ class RegressionWorkflow:
             self.best_model = best_model
             self.X_test = X_test
             self.y_test = y_test
+            self.evaluation = self._evaluation_arrays(y_test, test_predictions[best_model_name])
             
             # Store only serializable results
             self.results = {
@@ -534,9 +1172,11 @@ class RegressionWorkflow:
                 'cross_validation': cross_validation_scores,
                 'best_model_name': best_model_name,
                 'feature_importance': feature_importance,
+                'model_substitutions': model_substitutions,
+                'regularization_paths': regularization_paths,
                 'split_info': {
-                    'train_size': len(X_train),
-                    'test_size': len(X_test),
+                    'train_size': X_train.shape[0],
+                    'test_size': X_test.shape[0],
                     'test_ratio': self.config.test_size
                 }
             }
@@ -547,10 +1187,15 @@ class RegressionWorkflow:
                 'comparison_data': comparison_df.to_dict('records'),
                 'best_model': best_model_name,
                 'feature_importance': feature_importance,
+                'model_substitutions': model_substitutions,
+                'regularization_paths': regularization_paths,
+                'skipped_models': skipped_models,
                 'training_summary': {
                     'models_trained': len(model_results),
+                    'stopped_early': bool(skipped_models),
                     'best_r2_score': float(comparison_df.iloc[0]['test_r2']),
-                    'best_rmse': float(comparison_df.iloc[0]['test_rmse'])
+                    'best_rmse': float(comparison_df.iloc[0]['test_rmse']),
+                    'approximated_models': list(model_substitutions.keys())
                 }
             }
             
@@ -561,6 +1206,89 @@ class RegressionWorkflow:
                 'error': str(e)
             }
     
+    def train_models_incremental(self, source: Union[str, Path, pd.DataFrame], target_column: str,
+                                 column_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Train partial_fit models over a chunked dataset that need not fit in memory."""
+        try:
+            trainer = IncrementalTrainer('regression', self.config)
+            streaming_metrics = trainer.fit(source, target_column, column_names=column_names)
+            pipelines = trainer.get_pipelines()
+            
+            model_results = {}
+            cross_validation_scores = {}
+            for model_name, metrics in streaming_metrics.items():
+                model_results[model_name] = {
+                    'model': pipelines[model_name],
+                    'metrics': metrics.result()
+                }
+                cross_validation_scores[model_name] = metrics.chunk_scores
+            
+            comparison_data = []
+            for name, result in model_results.items():
+                row = {'Model': name}
+                row.update(result['metrics'])
+                comparison_data.append(row)
+            comparison_df = pd.DataFrame(comparison_data).sort_values('test_r2', ascending=False)
+            
+            best_model_name = comparison_df.iloc[0]['Model']
+            feature_importance = trainer.get_feature_importance(best_model_name)
+            
+            # Raw input columns: the fitted pipelines encode and scale rows themselves
+            self.feature_columns = trainer.feature_columns
+            self.preprocessor = None
+            self.models = model_results
+            self.best_model = model_results[best_model_name]['model']
+            self.X_test = trainer.holdout_X
+            self.y_test = trainer.holdout_y
+            self.evaluation = None  # Predicted from the holdout on first use
+            
+            self.results = {
+                'model_metrics': {name: result['metrics'] for name, result in model_results.items()},
+                'comparison_df': comparison_df.to_dict('records'),
+                'cross_validation': cross_validation_scores,
+                'best_model_name': best_model_name,
+                'feature_importance': feature_importance,
+                'incremental': trainer.stats,
+                'split_info': {
+                    'train_size': trainer.stats['train_rows'],
+                    'test_size': trainer.stats['holdout_rows'],
+                    'test_ratio': self.config.test_size
+                }
+            }
+            
+            return {
+                'success': True,
+                'model_results': {name: result['metrics'] for name, result in model_results.items()},
+                'comparison_data': comparison_df.to_dict('records'),
+                'best_model': best_model_name,
+                'feature_importance': feature_importance,
+                'incremental': trainer.stats,
+                'training_summary': {
+                    'models_trained': len(model_results),
+                    'best_r2_score': float(comparison_df.iloc[0]['test_r2']),
+                    'best_rmse': float(comparison_df.iloc[0]['test_rmse']),
+                    'training_mode': 'incremental',
+                    'rows_seen': trainer.stats['rows_seen']
+                }
+            }
+            
+        except Exception as e:
+            logger.error(f"Incremental training failed: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _prepare_input(self, data: pd.DataFrame) -> Tuple[Any, List[str]]:
+        """Raw rows to model input: the fitted encoder if there is one, else column alignment."""
+        if self.preprocessor is not None:
+            expected = self.preprocessor.input_columns
+            return self.preprocessor.transform(data), [col for col in expected if col not in data.columns]
+        
+        # Missing features default to 0
+        missing = [col for col in self.feature_columns if col not in data.columns]
+        return data.reindex(columns=self.feature_columns, fill_value=0), missing
+    
     def make_prediction(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Make prediction with the best model."""
         try:
@@ -570,16 +1298,8 @@ class RegressionWorkflow:
                     'error': 'No trained model available'
                 }
             
-            # Convert input to DataFrame
-            input_df = pd.DataFrame([input_data])
-            
-            # Ensure all required features are present
-            for feature in self.feature_columns:
-                if feature not in input_df.columns:
-                    input_df[feature] = 0  # Default value for missing features
-            
-            # Select features in correct order
-            input_df = input_df[self.feature_columns]
+            # Convert input to DataFrame and apply the training-time transform
+            input_df, _ = self._prepare_input(pd.DataFrame([input_data]))
             
             # Make prediction
             prediction = self.best_model.predict(input_df)[0]
@@ -597,8 +1317,68 @@ class RegressionWorkflow:
                 'error': str(e)
             }
     
-    def get_visualizations(self) -> Dict[str, Any]:
-        """Generate visualization data."""
+    def make_batch_prediction(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """Score many rows with one vectorized predict call."""
+        try:
+            if not hasattr(self, 'best_model') or self.best_model is None:
+                return {
+                    'success': False,
+                    'error': 'No trained model available'
+                }
+            
+            input_df, missing_features = self._prepare_input(data)
+            predictions = self.best_model.predict(input_df)
+            
+            return {
+                'success': True,
+                'predictions': np.asarray(predictions, dtype=float).tolist(),
+                'n_rows': int(len(data)),
+                'model_used': self.results.get('best_model_name'),
+                'missing_features': missing_features
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def get_serving_state(self) -> Dict[str, Any]:
+        """State needed, besides the fitted model, to serve predictions later."""
+        return {
+            'feature_columns': self.feature_columns,
+            'preprocessor': self.preprocessor,
+            'results': self.results,
+            'evaluation': self.get_evaluation_data(),
+            'config': asdict(self.config)
+        }
+    
+    def restore_serving_state(self, state: Dict[str, Any], model: Any, model_name: str):
+        """Load a persisted model and its serving state into this workflow."""
+        self.feature_columns = state.get('feature_columns')
+        self.preprocessor = state.get('preprocessor')
+        self.results = dict(state.get('results') or {})
+        self.results['best_model_name'] = model_name
+        self.best_model = model
+        # Test-set predictions belong to the best model only
+        best_model_name = (state.get('results') or {}).get('best_model_name')
+        self.evaluation = state.get('evaluation') if model_name == best_model_name else None
+    
+    @staticmethod
+    def _evaluation_arrays(y_true: Any, y_pred: np.ndarray) -> Dict[str, np.ndarray]:
+        return {
+            'y_true': np.asarray(y_true, dtype=np.float32),
+            'y_pred': np.asarray(y_pred, dtype=np.float32)
+        }
+    
+    def get_evaluation_data(self) -> Optional[Dict[str, np.ndarray]]:
+        """Best model's test-set targets and predictions (float32), kept so plots never re-predict."""
+        if self.evaluation is None and self.best_model is not None and self.X_test is not None:
+            self.evaluation = self._evaluation_arrays(self.y_test, self.best_model.predict(self.X_test))
+        return self.evaluation
+    
+    def get_visualizations(self, max_points: Optional[int] = None) -> Dict[str, Any]:
+        """Generate visualization data; scatter traces are downsampled to ``max_points``."""
         try:
             visualizations = {}
             
@@ -610,10 +1390,15 @@ class RegressionWorkflow:
                 importance_df = pd.DataFrame(self.results['feature_importance'])
                 visualizations['feature_importance'] = ModelVisualizer.create_feature_importance_chart(importance_df)
             
-            if hasattr(self, 'best_model') and hasattr(self, 'X_test') and self.best_model is not None:
-                y_pred = self.best_model.predict(self.X_test)
+            if self.results.get('regularization_paths'):
+                visualizations['regularization_paths'] = ModelVisualizer.create_regularization_path_chart(
+                    self.results['regularization_paths']
+                )
+            
+            evaluation = self.get_evaluation_data()
+            if evaluation is not None:
                 visualizations['residual_analysis'] = ModelVisualizer.create_residual_plots(
-                    self.y_test, y_pred
+                    evaluation['y_true'], evaluation['y_pred'], max_points
                 )
             
             return {
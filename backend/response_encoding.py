@@ -0,0 +1,111 @@
+"""
+Fast JSON response encoding
+Encodes API payloads holding NumPy, pandas and datetime values in a single pass (orjson when installed, the standard library otherwise) and drops values that have no JSON form by their type
+"""
+
+import json
+import math
+import logging
+import datetime
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Conditional orjson import
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Values with a JSON form; anything else (fitted models, file handles, ...) is dropped
+ENCODABLE_TYPES = (
+    str, int, float, bool, type(None), dict, list, tuple, set, frozenset,
+    np.generic, np.ndarray, pd.DataFrame, pd.Series, pd.Index,
+    datetime.date, datetime.time, datetime.timedelta, pd.Timedelta, Decimal, Enum, Path
+)
+
+
+def is_encodable(value: Any) -> bool:
+    return isinstance(value, ENCODABLE_TYPES) or value is pd.NaT or value is pd.NA
+
+
+def encode_default(obj: Any) -> Any:
+    """Convert one value the encoder does not handle natively into JSON-ready data."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        # orjson encodes contiguous numeric arrays itself; this covers object and strided arrays
+        return obj.tolist()
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict('records')
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.tolist()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (datetime.timedelta, pd.Timedelta)):
+        return obj.total_seconds()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, Path):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    logger.debug(f"Dropping value of type {type(obj).__name__} from JSON response")
+    return None
+
+
+def strip_unencodable(value: Any) -> Any:
+    """Copy of nested dicts/lists without the entries whose type has no JSON form."""
+    if isinstance(value, dict):
+        return {key: strip_unencodable(item) for key, item in value.items() if is_encodable(item)}
+    if isinstance(value, (list, tuple)):
+        return [strip_unencodable(item) for item in value if is_encodable(item)]
+    return value
+
+
+def _to_builtin(obj: Any) -> Any:
+    # Standard-library path: plain containers, string keys, and null for NaN/inf as orjson does
+    if isinstance(obj, dict):
+        return {key if isinstance(key, str) else str(_to_builtin(key)): _to_builtin(item) for key, item in obj.items()}
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return [_to_builtin(item) for item in obj]
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, (str, int, type(None))):
+        return obj
+    return _to_builtin(encode_default(obj))
+
+
+def dumps(content: Any) -> bytes:
+    """Encode ``content`` as compact UTF-8 JSON."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(content, default=encode_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError as e:
+            # e.g. dict keys orjson cannot stringify (NumPy scalars); the slower path handles them
+            logger.debug(f"orjson could not encode response ({e}); using the standard library encoder")
+    return json.dumps(_to_builtin(content), ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: one encoding pass that understands NumPy, pandas and datetimes.
+
+    Returning an instance directly from an endpoint also skips FastAPI's
+    ``jsonable_encoder`` walk, so large results are encoded exactly once.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
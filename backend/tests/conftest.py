@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# Backend modules are imported as top-level modules, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep module-level singletons away from shared paths and external services
+os.environ.setdefault("JOB_QUEUE_BACKEND", "sqlite")
+os.environ.setdefault("JOB_QUEUE_PATH", os.path.join(tempfile.mkdtemp(prefix="ml_jobs_test_"), "jobs.db"))
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.datasets import make_blobs
+
+import clustering.enhanced_clustering_framework as framework
+from clustering.enhanced_clustering_framework import (
+    ClusteringConfig, ClusteringPlanner, ClusteringWorkflow, PARALLEL_MIN_SECONDS
+)
+
+
+def make_workflow(n_samples, algorithms):
+    data, _ = make_blobs(n_samples=n_samples, n_features=4, centers=3, random_state=0)
+    workflow = ClusteringWorkflow(ClusteringConfig(algorithms_to_include=algorithms, n_jobs=2))
+    assert workflow.preprocess_data(pd.DataFrame(data, columns=list('abcd')))['success']
+    plans = ClusteringPlanner(workflow.config).plan(algorithms, n_samples, 4, 3)['algorithms']
+    return workflow, plans
+
+
+def run(workflow, plans, algorithms):
+    started = []
+    results = dict(workflow._run_algorithms(algorithms, 3, plans, None, started.append))
+    assert sorted(started) == sorted(algorithms)
+    return results
+
+
+def inflate(plans):
+    """The same plans, each costed as if worth spreading over processes."""
+    return {name: {**plan, 'estimated_seconds': PARALLEL_MIN_SECONDS} for name, plan in plans.items()}
+
+
+def test_small_jobs_run_in_process(monkeypatch):
+    algorithms = ['kmeans', 'birch']
+    workflow, plans = make_workflow(900, algorithms)
+
+    def no_processes(*args, **kwargs):
+        raise AssertionError("spawned worker processes for a small job")
+
+    monkeypatch.setattr(framework.multiprocessing, 'get_context', no_processes)
+    assert workflow._n_workers(algorithms, plans) == 1
+
+    results = run(workflow, plans, algorithms)
+
+    assert all(len(result['labels']) == 900 for result in results.values())
+
+
+def test_large_jobs_use_the_pool_and_match_in_process_results():
+    algorithms = ['kmeans', 'birch']
+    workflow, plans = make_workflow(900, algorithms)
+    assert workflow._n_workers(algorithms, inflate(plans)) == 2
+
+    pooled = run(workflow, inflate(plans), algorithms)
+    in_process = run(workflow, plans, algorithms)
+
+    for name in algorithms:
+        assert 'error' not in pooled[name]
+        np.testing.assert_array_equal(pooled[name]['labels'], in_process[name]['labels'])
+
+
+def test_pooled_algorithm_past_its_timeout_is_stopped():
+    # Exact Mean Shift on 3000 rows takes several seconds
+    algorithms = ['meanshift', 'birch']
+    workflow, plans = make_workflow(3000, algorithms)
+    assert plans['meanshift']['variant'] == 'exact'
+    # Planned under the default limit; only the run is held to the short one
+    workflow.config.algorithm_timeout = 2.0
+
+    results = run(workflow, inflate(plans), algorithms)
+
+    assert results['meanshift'].get('timed_out')
+    assert 'labels' not in results['meanshift']
+    assert len(results['birch']['labels']) == 3000
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from regression.enhanced_regression_framework import RegressionConfig, RegressionWorkflow
+
+
+def make_frame(n_rows=2000, n_levels=50, seed=0):
+    rng = np.random.default_rng(seed)
+    city = rng.integers(0, n_levels, n_rows)
+    return pd.DataFrame({
+        'city': [f"city_{c}" for c in city],
+        'size': rng.normal(size=n_rows),
+        'price': city * 2.0 + rng.normal(size=n_rows)
+    })
+
+
+def preprocess(data):
+    config = RegressionConfig(models_to_include=['linear'], regularization_path=False)
+    workflow = RegressionWorkflow(config)
+    result = workflow.preprocess_data(data, 'price')
+    assert result['success'], result.get('error')
+    return workflow
+
+
+def test_high_cardinality_column_is_target_encoded():
+    workflow = preprocess(make_frame())
+
+    assert workflow.preprocessor.strategies['city']['strategy'] == 'target'
+
+
+def test_holdout_targets_do_not_change_training_encodings():
+    data = make_frame()
+    baseline = preprocess(data).processed_matrix
+    n_train = baseline.metadata['train_rows']
+    assert n_train < len(data)
+
+    # Same rows and split, but every held-out target replaced
+    config = RegressionConfig()
+    _, test_rows = train_test_split(data, test_size=config.test_size, random_state=config.random_state)
+    shifted = data.copy()
+    shifted.loc[test_rows.index, 'price'] = 1e6
+    changed = preprocess(shifted).processed_matrix
+
+    np.testing.assert_array_equal(baseline.X[:n_train], changed.X[:n_train])
+    np.testing.assert_array_equal(baseline.X[n_train:], changed.X[n_train:])
+    assert not np.array_equal(baseline.y[n_train:], changed.y[n_train:])
+
+
+def test_train_models_reuses_the_encoding_split():
+    workflow = preprocess(make_frame())
+    artifact = workflow.processed_matrix
+
+    result = workflow.train_models(artifact, 'price')
+
+    assert result['success'], result.get('error')
+    assert workflow.results['split_info']['train_size'] == artifact.metadata['train_rows']
+    np.testing.assert_array_equal(workflow.y_test, artifact.y[artifact.metadata['train_rows']:])
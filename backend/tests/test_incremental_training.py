@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import accuracy_score, r2_score, roc_auc_score
+
+from classification.enhanced_classification_framework import ClassificationConfig
+from incremental_training import IncrementalTrainer, StreamingFeatureTransformer
+from regression.enhanced_regression_framework import RegressionConfig
+
+N_ROWS = 1500
+CHUNK_SIZE = 500
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        'x1': rng.normal(size=N_ROWS),
+        'x2': rng.normal(size=N_ROWS),
+        'color': rng.choice(['red', 'green', 'blue'], size=N_ROWS)
+    })
+    data['price'] = 3 * data['x1'] - 2 * data['x2'] + (data['color'] == 'red') + rng.normal(scale=0.5, size=N_ROWS)
+    data['label'] = np.where(data['x1'] + rng.normal(scale=0.5, size=N_ROWS) > 0, 'yes', 'no')
+    path = tmp_path / 'data.csv'
+    data.to_csv(path, index=False)
+    return path
+
+
+def test_streaming_r2_matches_sklearn_on_the_holdout(csv_path):
+    config = RegressionConfig(chunk_size=CHUNK_SIZE, incremental_epochs=2)
+    trainer = IncrementalTrainer('regression', config)
+
+    metrics = trainer.fit(csv_path, 'price', feature_columns=['x1', 'x2', 'color'])
+
+    # The whole holdout fits in the kept sample, so sklearn can score it directly
+    assert len(trainer.holdout_y) == trainer.stats['holdout_rows']
+    for name, pipeline in trainer.get_pipelines().items():
+        expected = r2_score(trainer.holdout_y, pipeline.predict(trainer.holdout_X))
+        assert metrics[name].result()['test_r2'] == pytest.approx(expected, abs=1e-9)
+
+
+def test_streaming_accuracy_and_auc_match_sklearn_on_the_holdout(csv_path):
+    config = ClassificationConfig(chunk_size=CHUNK_SIZE, incremental_epochs=2)
+    trainer = IncrementalTrainer('classification', config)
+
+    metrics = trainer.fit(csv_path, 'label', feature_columns=['x1', 'x2', 'color'])
+
+    pipelines = trainer.get_pipelines()
+    for name, pipeline in pipelines.items():
+        result = metrics[name].result()
+        expected = accuracy_score(trainer.holdout_y, pipeline.predict(trainer.holdout_X))
+        assert result['test_accuracy'] == pytest.approx(expected, abs=1e-9)
+    proba = pipelines['multinomial_nb'].predict_proba(trainer.holdout_X)[:, 1]
+    # Binned streaming AUC
+    assert metrics['multinomial_nb'].result()['test_auc'] == pytest.approx(
+        roc_auc_score(trainer.holdout_y, proba), abs=0.01)
+    # Hinge loss has no probabilities, so there is no AUC to report
+    assert metrics['sgd_hinge'].result()['test_auc'] is None
+
+
+def test_each_chunk_is_transformed_once_per_pass(csv_path, monkeypatch):
+    calls = []
+    transform_outputs = StreamingFeatureTransformer.transform_outputs
+
+    def counting(self, X, outputs):
+        calls.append(tuple(outputs))
+        return transform_outputs(self, X, outputs)
+
+    monkeypatch.setattr(StreamingFeatureTransformer, 'transform_outputs', counting)
+    config = ClassificationConfig(chunk_size=CHUNK_SIZE, incremental_epochs=2)
+
+    IncrementalTrainer('classification', config).fit(csv_path, 'label', feature_columns=['x1', 'x2', 'color'])
+
+    n_chunks = N_ROWS // CHUNK_SIZE
+    # Every epoch plus the final holdout pass; both scalings come out of one call
+    assert len(calls) == n_chunks * (config.incremental_epochs + 1)
+    assert set(calls) == {('minmax', 'standard')}
@@ -0,0 +1,131 @@
+import pytest
+
+import job_queue as jq
+from job_queue import SQLiteJobQueue, PRIORITY_PREMIUM, PRIORITY_STANDARD, QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteJobQueue(str(tmp_path / "jobs.db"))
+
+
+@pytest.fixture
+def expired_leases(monkeypatch):
+    # Claims hand out leases that have already run out
+    monkeypatch.setattr(jq, "JOB_LEASE_SECONDS", -1)
+
+
+def test_claim_order_by_priority_then_submission(queue):
+    first_standard = queue.enqueue('train', {}, priority=PRIORITY_STANDARD)
+    second_standard = queue.enqueue('train', {}, priority=PRIORITY_STANDARD)
+    premium = queue.enqueue('train', {}, priority=PRIORITY_PREMIUM)
+
+    claimed = [queue.claim('w').id for _ in range(3)]
+
+    assert claimed == [premium.id, first_standard.id, second_standard.id]
+    assert queue.claim('w') is None
+
+
+def test_retry_until_max_retries(queue):
+    job = queue.enqueue('train', {}, max_retries=2)
+
+    for attempt in (1, 2):
+        claimed = queue.claim('w')
+        assert claimed.attempts == attempt
+        assert queue.fail(job.id, 'w', 'boom').status == QUEUED
+
+    assert queue.claim('w').attempts == 3
+    failed = queue.fail(job.id, 'w', 'boom')
+    assert failed.status == FAILED
+    assert failed.finished_at is not None
+    assert queue.claim('w') is None
+
+
+def test_permanent_failure_skips_retries(queue):
+    job = queue.enqueue('train', {})
+    queue.claim('w')
+    assert queue.fail(job.id, 'w', 'bad input', retry=False).status == FAILED
+
+
+def test_requeue_after_lease_expiry(queue, expired_leases):
+    job = queue.enqueue('train', {})
+    queue.claim('w1')
+
+    assert queue.requeue_expired() == 1
+    requeued = queue.get(job.id)
+    assert requeued.status == QUEUED
+    assert requeued.worker_id is None
+    assert 'lease expired' in requeued.error
+    assert queue.claim('w2').attempts == 2
+
+
+def test_live_lease_is_not_requeued(queue):
+    job = queue.enqueue('train', {})
+    queue.claim('w1')
+
+    assert queue.requeue_expired() == 0
+    assert queue.get(job.id).status == RUNNING
+
+
+def test_cancel_queued_job(queue):
+    job = queue.enqueue('train', {})
+
+    cancelled = queue.cancel(job.id)
+
+    assert cancelled.status == CANCELLED
+    assert queue.claim('w') is None
+
+
+def test_cancel_running_job(queue):
+    job = queue.enqueue('train', {})
+    queue.claim('w')
+
+    flagged = queue.cancel(job.id)
+    assert flagged.status == RUNNING
+    assert flagged.cancel_requested
+
+    assert queue.mark_cancelled(job.id, 'w').status == CANCELLED
+
+
+def test_failure_of_cancelled_running_job_is_not_retried(queue):
+    job = queue.enqueue('train', {})
+    queue.claim('w')
+    queue.cancel(job.id)
+
+    assert queue.fail(job.id, 'w', 'stopped').status == CANCELLED
+
+
+def test_completion_between_expiry_scan_and_requeue_wins(queue, expired_leases, monkeypatch):
+    job = queue.enqueue('train', {})
+    queue.claim('w1')
+    expire = queue._expire
+
+    def complete_then_expire(job_id):
+        # The worker finishes after requeue_expired listed the job but before it is failed
+        queue.complete(job_id, 'w1', {'success': True})
+        return expire(job_id)
+    monkeypatch.setattr(queue, '_expire', complete_then_expire)
+
+    assert queue.requeue_expired() == 0
+    done = queue.get(job.id)
+    assert done.status == SUCCEEDED
+    assert done.result == {'success': True}
+    assert queue.claim('w2') is None
+
+
+def test_stale_worker_cannot_overwrite_new_attempt(queue, expired_leases):
+    job = queue.enqueue('train', {})
+    queue.claim('w1')
+    queue.requeue_expired()
+    queue.claim('w2')
+
+    assert queue.complete(job.id, 'w1', {'stale': True}) is None
+    assert queue.fail(job.id, 'w1', 'stale failure') is None
+    assert queue.mark_cancelled(job.id, 'w1') is None
+
+    current = queue.get(job.id)
+    assert current.status == RUNNING
+    assert current.worker_id == 'w2'
+    assert current.result is None
+
+    assert queue.complete(job.id, 'w2', {'success': True}).status == SUCCEEDED
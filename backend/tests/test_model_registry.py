@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from model_registry import ModelRegistry, METADATA_FILE, VERSIONS_DIR
+
+
+def fitted(coef: float) -> LinearRegression:
+    x = np.arange(10, dtype=float).reshape(-1, 1)
+    return LinearRegression().fit(x, coef * x.ravel())
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return str(tmp_path / "models")
+
+
+def test_retrain_saved_by_another_instance_is_served(storage):
+    api = ModelRegistry(storage)
+    worker = ModelRegistry(storage)
+
+    api.save('s1', 'regression', {'linear': fitted(1.0)}, 'linear', {'version': 1})
+    assert api.load_model('s1')[1].predict([[5.0]]) == pytest.approx([5.0])
+    assert api.load_state('s1') == {'version': 1}
+
+    # A training worker retrains the session through its own registry instance
+    worker.save('s1', 'regression', {'linear': fitted(3.0)}, 'linear', {'version': 2})
+
+    assert api.load_model('s1')[1].predict([[5.0]]) == pytest.approx([15.0])
+    assert api.load_state('s1') == {'version': 2}
+
+
+def test_warm_model_is_reused_while_unchanged(storage):
+    registry = ModelRegistry(storage)
+    registry.save('s1', 'regression', {'linear': fitted(2.0)}, 'linear')
+
+    first = registry.load_model('s1')[1]
+    second = registry.load_model('s1')[1]
+
+    assert first is second
+    assert registry.get_cache_stats()['hits'] == 1
+
+
+def test_save_replaces_the_previous_version(storage, tmp_path):
+    registry = ModelRegistry(storage)
+    registry.save('s1', 'regression', {'a': fitted(1.0)}, 'a')
+    registry.save('s1', 'regression', {'b': fitted(2.0)}, 'b')
+
+    assert registry.get_metadata('s1')['models'] == ['b']
+    with pytest.raises(KeyError):
+        registry.load_model('s1', 'a')
+    # Only the published version is kept
+    assert len(list((tmp_path / "models" / VERSIONS_DIR).iterdir())) == 1
+
+
+def test_restore_and_delete(storage, tmp_path):
+    registry = ModelRegistry(storage)
+    registry.save('s1', 'regression', {'linear': fitted(4.0)}, 'linear')
+    snapshot = tmp_path / "snapshot"
+    registry.copy_models('s1', snapshot)
+    assert (snapshot / METADATA_FILE).exists()
+
+    registry.restore_models(snapshot, 's2')
+    assert registry.load_model('s2')[1].predict([[1.0]]) == pytest.approx([4.0])
+
+    assert registry.delete('s1')
+    assert not registry.has_models('s1')
+    assert registry.has_models('s2')
+    assert len(list((tmp_path / "models" / VERSIONS_DIR).iterdir())) == 1
+
+
+def test_cleanup_removes_old_sessions(storage, tmp_path):
+    registry = ModelRegistry(storage)
+    registry.save('s1', 'regression', {'linear': fitted(1.0)}, 'linear')
+
+    assert registry.cleanup_old_models(max_age_hours=-1) == 1
+    assert not registry.has_models('s1')
+    assert list((tmp_path / "models" / VERSIONS_DIR).iterdir()) == []
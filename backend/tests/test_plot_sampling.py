@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from plot_sampling import lttb_indices, density_sample_indices
+
+
+@pytest.mark.parametrize("n_out", [3, 10, 100, 999])
+def test_lttb_keeps_endpoints_and_returns_n_out_indices(n_out):
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 25) + np.random.default_rng(0).normal(0, 0.1, 1000)
+
+    idx = lttb_indices(x, y, n_out)
+
+    assert len(idx) == n_out
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_keeps_a_spike():
+    x = np.arange(500, dtype=float)
+    y = np.zeros(500)
+    y[250] = 100.0
+
+    assert 250 in lttb_indices(x, y, 20)
+
+
+def test_lttb_returns_everything_when_under_budget():
+    x = np.arange(10, dtype=float)
+    assert np.array_equal(lttb_indices(x, x, 50), np.arange(10))
+
+
+@pytest.mark.parametrize("n_out", [10, 100, 500, 2000])
+def test_density_sampling_never_exceeds_n_out(n_out):
+    rng = np.random.default_rng(1)
+    x, y = rng.normal(size=(2, 20000))
+
+    idx = density_sample_indices(x, y, n_out)
+
+    assert len(idx) <= n_out
+    assert len(np.unique(idx)) == len(idx)
+
+
+def test_density_sampling_keeps_a_lone_outlier():
+    rng = np.random.default_rng(2)
+    x, y = rng.normal(size=(2, 10000))
+    x[1234], y[1234] = 50.0, 50.0
+
+    assert 1234 in density_sample_indices(x, y, 200)
+
+
+def test_density_sampling_is_deterministic():
+    rng = np.random.default_rng(3)
+    x, y = rng.normal(size=(2, 5000))
+
+    assert np.array_equal(density_sample_indices(x, y, 300, seed=7), density_sample_indices(x, y, 300, seed=7))
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from sklearn.linear_model import ElasticNet, Ridge
+
+from regression.enhanced_regression_framework import RegressionConfig, RegularizationPathTrainer
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = sparse.random(400, 60, density=0.1, format='csr', random_state=1, dtype=np.float64)
+    coef = rng.normal(size=60) * (rng.random(60) < 0.3)
+    y = X @ coef + 3.0 + rng.normal(scale=0.1, size=400)
+    return X, y
+
+
+@pytest.mark.parametrize("gram_max_features", [2000, 0])
+def test_sparse_ridge_path_matches_ridge(data, gram_max_features):
+    X, y = data
+    trainer = RegularizationPathTrainer(RegressionConfig())
+    trainer.GRAM_MAX_FEATURES = gram_max_features
+    alphas = np.array([10.0, 0.1])
+
+    coefs, intercepts = trainer._ridge_coef_path(X, y, alphas)
+
+    for k, alpha in enumerate(alphas):
+        reference = Ridge(alpha=alpha, solver='sparse_cg', tol=1e-10).fit(X, y)
+        np.testing.assert_allclose(coefs[:, k], reference.coef_, atol=1e-4)
+        assert intercepts[k] == pytest.approx(reference.intercept_, abs=1e-4)
+
+
+def test_sparse_enet_path_matches_elastic_net(data):
+    X, y = data
+    alphas = np.array([0.05, 0.005])
+
+    coefs, intercepts = RegularizationPathTrainer._enet_coef_path(X, y, alphas, 0.5)
+
+    for k, alpha in enumerate(alphas):
+        reference = ElasticNet(alpha=alpha, l1_ratio=0.5, tol=1e-8, max_iter=10000).fit(X, y)
+        np.testing.assert_allclose(coefs[:, k], reference.coef_, atol=1e-3)
+        assert intercepts[k] == pytest.approx(reference.intercept_, abs=1e-3)
+
+
+def test_sparse_input_is_never_densified(data, monkeypatch):
+    X, y = data
+
+    def refuse(*args, **kwargs):
+        raise AssertionError("sparse matrix was densified")
+
+    monkeypatch.setattr(sparse.csr_matrix, 'toarray', refuse)
+    monkeypatch.setattr(sparse.csc_matrix, 'toarray', refuse)
+    trainer = RegularizationPathTrainer(RegressionConfig(n_alphas=10))
+    trainer.GRAM_MAX_FEATURES = 0
+
+    paths = trainer.fit(X, y, ['ridge', 'lasso', 'elastic_net'])
+
+    assert set(paths) == {'ridge', 'lasso', 'elastic_net'}
+    assert all(np.isfinite(path['best_cv_mse']) for path in paths.values())
+
+
+def test_unscaled_sparse_and_dense_input_give_the_same_paths(data):
+    X, y = data
+    config = RegressionConfig(n_alphas=10, scale_features=False)
+
+    sparse_paths = RegularizationPathTrainer(config).fit(X, y, ['ridge', 'lasso'])
+    dense_paths = RegularizationPathTrainer(config).fit(X.toarray(), y, ['ridge', 'lasso'])
+
+    for name in ('ridge', 'lasso'):
+        np.testing.assert_allclose(sparse_paths[name]['cv_mse_mean'], dense_paths[name]['cv_mse_mean'],
+                                   rtol=1e-4)
+        assert sparse_paths[name]['best_alpha'] == pytest.approx(dense_paths[name]['best_alpha'])
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_blobs
+from sklearn.metrics import silhouette_score
+
+from clustering.enhanced_clustering_framework import SilhouetteEstimator
+
+
+@pytest.fixture(scope="module")
+def blobs():
+    data, labels = make_blobs(n_samples=6000, centers=[[0, 0], [4, 0], [0, 5], [6, 6]],
+                              cluster_std=[1.0, 1.5, 0.8, 2.0], random_state=0)
+    return data, labels
+
+
+def test_exact_mode_matches_silhouette_score(blobs):
+    data, labels = blobs
+
+    result = SilhouetteEstimator(mode='exact').estimate(data, labels)
+
+    assert result['exact']
+    assert result['n_used'] == len(data)
+    assert result['score'] == pytest.approx(silhouette_score(data, labels))
+    assert result['ci'] == [result['score'], result['score']]
+
+
+def test_auto_mode_is_exact_up_to_the_sample_size(blobs):
+    data, labels = blobs
+    estimator = SilhouetteEstimator(mode='auto', sample_size=len(data))
+
+    assert estimator.uses_exact(len(data))
+    assert estimator.estimate(data, labels)['score'] == pytest.approx(silhouette_score(data, labels))
+
+
+@pytest.mark.parametrize("random_state", [0, 1, 2])
+def test_sampled_score_lies_within_its_ci_of_the_exact_score(blobs, random_state):
+    data, labels = blobs
+    exact = silhouette_score(data, labels)
+
+    result = SilhouetteEstimator(mode='sampled', sample_size=1000, random_state=random_state).estimate(data, labels)
+
+    assert not result['exact']
+    assert result['n_used'] <= 1000
+    low, high = result['ci']
+    assert low < result['score'] < high
+    assert low <= exact <= high
+
+
+def test_sampled_estimate_keeps_small_clusters():
+    rng = np.random.default_rng(4)
+    data = np.vstack([rng.normal(0, 1, (5000, 2)), rng.normal(10, 1, (3, 2))])
+    labels = np.array([0] * 5000 + [1] * 3)
+
+    estimator = SilhouetteEstimator(mode='sampled', sample_size=200)
+    idx, _, _ = estimator._stratified_sample(labels)
+
+    # Every cluster contributes at least two points, so its silhouette is defined
+    assert (labels[idx] == 1).sum() >= 2
+    assert np.isfinite(estimator.estimate(data, labels)['score'])
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        SilhouetteEstimator(mode='approximate')
@@ -0,0 +1,171 @@
+"""
+Training result cache
+Re-running training with the same dataset, target, features, models and config returns the stored results and models instead of fitting again
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+from model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+TRAINING_CACHE_PATH = os.getenv("TRAINING_CACHE_PATH", "/tmp/ml_training_cache")
+TRAINING_CACHE_MAX_ENTRIES = int(os.getenv("TRAINING_CACHE_MAX_ENTRIES", "200"))
+TRAINING_CACHE_TTL_HOURS = int(os.getenv("TRAINING_CACHE_TTL_HOURS", "24"))
+
+RESULTS_FILE = "results.json"
+MODELS_DIR = "models"
+
+
+def dataset_fingerprint(data: pd.DataFrame) -> Optional[str]:
+    """Content hash of a DataFrame: column names, dtypes and every cell (row order matters).
+
+    None when a column holds values pandas cannot hash (e.g. lists); such
+    datasets are simply not cached.
+    """
+    try:
+        row_hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    except TypeError as e:
+        logger.info(f"Dataset not hashable, training cache disabled for it: {e}")
+        return None
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in data.dtypes.items()]).encode())
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+def training_cache_key(tool_type: str, dataset_hash: str, target_column: str,
+                       feature_columns: List[str], config: Dict[str, Any]) -> str:
+    """Key for a training run; the model list is part of ``config``."""
+    payload = {
+        'tool_type': tool_type,
+        'dataset': dataset_hash,
+        'target': target_column,
+        'features': list(feature_columns),
+        'config': config
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class TrainingCache:
+    """Disk-backed cache of training outcomes.
+
+    An entry holds the serializable results (metrics, comparison, importances,
+    explanations) and a copy of the session's model registry directory. Model
+    files are hard-linked where the filesystem allows, so an entry costs little
+    extra disk. A hit copies the models into the requesting session's registry,
+    so predictions and exports work exactly as after a fresh fit.
+    """
+
+    def __init__(self, storage_path: str = TRAINING_CACHE_PATH, max_entries: int = TRAINING_CACHE_MAX_ENTRIES):
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        logger.info(f"✅ Training cache initialized at {self.storage_path}")
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.storage_path / key
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The cached entry (results, explanations, cached_at) for a key, or None."""
+        results_path = self._entry_dir(key) / RESULTS_FILE
+        if not results_path.exists():
+            return None
+        try:
+            with open(results_path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable training cache entry {key[:12]}: {e}")
+            return None
+        if time.time() - results_path.stat().st_mtime > TRAINING_CACHE_TTL_HOURS * 3600:
+            return None
+        return entry
+
+    def put(self, key: str, session_id: str, tool_type: str, results: Dict[str, Any]) -> bool:
+        """Store a session's freshly trained models and their results under a key."""
+        if not model_registry.has_models(session_id):
+            return False
+        entry_dir = self._entry_dir(key)
+        staging_dir = self.storage_path / f".{key}.{uuid.uuid4().hex[:8]}"
+        try:
+            model_registry.copy_models(session_id, staging_dir / MODELS_DIR)
+            entry = {
+                'key': key,
+                'tool_type': tool_type,
+                'source_session': session_id,
+                'cached_at': datetime.now().isoformat(),
+                'results': results,
+                'explanations': None
+            }
+            with open(staging_dir / RESULTS_FILE, 'w') as f:
+                json.dump(entry, f, default=str)
+            # Swap in the complete entry so readers never see a partial one
+            if entry_dir.exists():
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(staging_dir, entry_dir)
+        except Exception as e:
+            logger.warning(f"Failed to cache training results {key[:12]}: {e}")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return False
+        self._trim()
+        logger.info(f"Cached training results {key[:12]} from session {session_id}")
+        return True
+
+    def set_explanations(self, key: str, explanations: Dict[str, Any]):
+        """Attach the permutation-importance explanations computed after training."""
+        entry = self.get(key)
+        if entry is None:
+            return
+        entry['explanations'] = explanations
+        tmp_path = self._entry_dir(key) / f".{RESULTS_FILE}.{uuid.uuid4().hex[:8]}"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, self._entry_dir(key) / RESULTS_FILE)
+
+    def restore(self, key: str, session_id: str) -> Optional[Dict[str, Any]]:
+        """Install a cached entry's models as the session's models; returns the registry metadata."""
+        models_dir = self._entry_dir(key) / MODELS_DIR
+        if not models_dir.exists():
+            return None
+        return model_registry.restore_models(models_dir, session_id)
+
+    def invalidate(self, key: str):
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def _trim(self):
+        entries = sorted(
+            (p for p in self.storage_path.iterdir() if p.is_dir() and not p.name.startswith('.')),
+            key=lambda p: p.stat().st_mtime
+        )
+        for entry_dir in entries[:max(0, len(entries) - self.max_entries)]:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+    def cleanup(self, max_age_hours: int = TRAINING_CACHE_TTL_HOURS) -> int:
+        """Remove entries older than the cache lifetime (and abandoned staging directories)."""
+        cutoff_time = time.time() - max_age_hours * 3600
+        removed = 0
+        for entry_dir in self.storage_path.iterdir():
+            if entry_dir.is_dir() and entry_dir.stat().st_mtime < cutoff_time:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries = [p for p in self.storage_path.iterdir() if p.is_dir() and not p.name.startswith('.')]
+        return {'entries': len(entries), 'max_entries': self.max_entries}
+
+
+# Global cache instance
+training_cache = TrainingCache()
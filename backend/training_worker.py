@@ -0,0 +1,373 @@
+"""
+Training worker processes
+Claim training jobs from the durable job queue and run each fit in its own child process, so the API process never trains a model
+
+Run standalone with ``python training_worker.py --workers 2``, or let the API start embedded workers (JOB_EMBEDDED_WORKERS).
+"""
+
+import os
+import sys
+import time
+import uuid
+import signal
+import asyncio
+import logging
+import argparse
+import subprocess
+import multiprocessing
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable
+
+import pandas as pd
+
+from session_storage import session_storage
+from dataset_store import dataset_store, MatrixArtifact
+from model_registry import model_registry
+from explanation_service import explanation_service
+from job_queue import job_queue, Job, QUEUED, RUNNING, FAILED, CANCELLED
+from progress_events import ProgressTracker
+from training_cache import training_cache
+
+from regression.enhanced_regression_framework import RegressionWorkflow, RegressionConfig
+from classification.enhanced_classification_framework import ClassificationWorkflow, ClassificationConfig
+
+logger = logging.getLogger(__name__)
+
+# Worker configuration
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))  # Seconds between queue polls and cancel checks
+JOB_TIMEOUT_SECONDS = int(os.getenv("JOB_TIMEOUT_SECONDS", "3600"))
+
+PREPROCESSED_MATRIX = "preprocessed"
+
+
+class PermanentJobError(Exception):
+    """A job failure that retrying cannot fix (bad input, unsupported tool)."""
+
+
+def resolve_training_frame(session_id: str, workflow: Any, data: pd.DataFrame, target_col: str) -> MatrixArtifact:
+    """Training matrix from the stored preprocessed artifact, preprocessing inline when none matches the target"""
+    if dataset_store.exists(session_id, PREPROCESSED_MATRIX):
+        artifact = dataset_store.load(session_id, PREPROCESSED_MATRIX)
+        if artifact.target_column == target_col:
+            return workflow.load_processed_matrix(artifact)
+
+    result = workflow.preprocess_data(data, target_col)
+    if not result.get('success'):
+        raise ValueError(result.get('error') or 'Preprocessing failed')
+    return workflow.load_processed_matrix(workflow.processed_matrix)
+
+
+def create_training_workflow(tool_type: str, config: Dict[str, Any]) -> Any:
+    """Regression/classification workflow built with the requested training config"""
+    # Build the workflow with the config so every component (trainer, tuner) sees it
+    if tool_type == 'regression':
+        return RegressionWorkflow(RegressionConfig(**config))
+    if tool_type == 'classification':
+        return ClassificationWorkflow(ClassificationConfig(**config))
+    raise ValueError(f"Training not implemented for {tool_type}")
+
+
+def cacheable_results(results: Dict[str, Any]) -> bool:
+    """Only complete runs are reused: not ones stopped early by the user"""
+    return bool(results.get('success')) and not results.get('skipped_models')
+
+
+async def compute_explanations(session_id: str, tool_type: str, workflow: Any, cache_key: Optional[str] = None):
+    """Compute permutation importance for the best model off the request path"""
+    explanations: Dict[str, Any]
+    try:
+        if getattr(workflow, 'best_model', None) is None or getattr(workflow, 'X_test', None) is None:
+            return
+        result = await asyncio.to_thread(
+            explanation_service.explain,
+            workflow.best_model,
+            workflow.X_test,
+            workflow.y_test,
+            tool_type,
+            workflow.feature_columns
+        )
+        explanations = {'status': 'complete', **result}
+    except Exception as e:
+        logger.error(f"Explanation failed for session {session_id}: {e}")
+        explanations = {'status': 'failed', 'error': str(e)}
+
+    # Re-read the session: training results may have been written since scheduling
+    session_data = await session_storage.get_session(session_id)
+    if not session_data:
+        return
+    session_data['explanations'] = explanations
+    training_results = session_data.get('training_results')
+    if (explanations['status'] == 'complete' and isinstance(training_results, dict)
+            and not training_results.get('feature_importance')):
+        training_results['feature_importance'] = [
+            {'feature': item['feature'], 'importance': item['importance']}
+            for item in explanations['feature_importance']
+        ]
+    await session_storage.save_session(session_id, session_data)
+
+    if cache_key and explanations['status'] == 'complete':
+        try:
+            training_cache.set_explanations(cache_key, explanations)
+        except Exception as e:
+            logger.warning(f"Failed to cache explanations for session {session_id}: {e}")
+
+
+async def run_training_job(job: Job) -> Dict[str, Any]:
+    """Train the models requested in a queued ``train`` job and store the results in the session"""
+    session_id = job.session_id
+    tool_type = job.payload['tool_type']
+    request = job.payload['request']
+    config = request.get('config') or {}
+
+    session_data = await session_storage.get_session(session_id)
+    if not session_data:
+        raise PermanentJobError(f"Session {session_id} not found for background training")
+
+    session_data['status'] = 'training_in_progress'
+    session_data['training_started_at'] = datetime.now()
+    await session_storage.save_session(session_id, session_data)
+
+    try:
+        workflow = create_training_workflow(tool_type, config)
+    except ValueError as e:
+        raise PermanentJobError(str(e))
+
+    data = session_data.get('dataframe')
+    if data is None or (hasattr(data, 'empty') and data.empty):
+        raise PermanentJobError("No data available for training")
+
+    target_col = request.get('target_column') or session_data.get('target_column')
+    if not target_col:
+        raise PermanentJobError("No target column specified")
+    if target_col not in data.columns:
+        raise PermanentJobError(f"Target column '{target_col}' not found")
+
+    # Per-model and per-fold progress for the session's WebSocket room and SSE stream;
+    # failures and cancellation are published by record_job_status, which sees every outcome
+    tracker = ProgressTracker(session_id, 'training').start({
+        'job_id': job.id, 'attempt': job.attempts, 'models': config.get('models_to_include')
+    })
+    workflow.progress_callback = tracker.scoped(0.05, 0.9)
+    workflow.should_stop = tracker.stop_requested
+
+    if config.get('training_mode') == 'incremental' or session_data.get('out_of_core'):
+        # Stream the raw upload (or the in-memory frame) through partial_fit models
+        source = session_data.get('source_file') or data
+        results = workflow.train_models_incremental(source, target_col, column_names=session_data.get('source_columns'))
+    else:
+        # Preprocessed float32 matrix (sets workflow.feature_columns)
+        try:
+            train_input = resolve_training_frame(session_id, workflow, data, target_col)
+        except ValueError as e:
+            raise PermanentJobError(str(e))
+        tracker.update('preprocessed', 0.05, {'rows': train_input.shape[0], 'features': len(workflow.feature_columns)})
+        results = workflow.train_models(train_input, target_col)
+
+    if not results.get('success'):
+        raise PermanentJobError(results.get('error') or 'Training failed')
+
+    # Persist trained pipelines so predictions can be served later
+    try:
+        session_data['model_registry'] = model_registry.save_workflow(session_id, tool_type, workflow)
+    except Exception as reg_err:
+        logger.warning(f"Failed to persist trained models for session {session_id}: {reg_err}")
+
+    # Identical requests (same dataset, target, features and config) reuse this run
+    cache_key = job.payload.get('cache_key')
+    if cache_key and cacheable_results(results):
+        training_cache.put(cache_key, session_id, tool_type, results)
+
+    session_data['status'] = 'training_complete'
+    session_data['training_completed_at'] = datetime.now()
+    session_data['training_results'] = results
+    session_data['explanations'] = {'status': 'pending'}
+    await session_storage.save_session(session_id, session_data)
+
+    tracker.update('models_saved', 0.9, {'best_model': results.get('best_model')})
+    await compute_explanations(session_id, tool_type, workflow, cache_key)
+    tracker.done({
+        'job_id': job.id,
+        'best_model': results.get('best_model'),
+        'training_summary': results.get('training_summary')
+    })
+
+    return {
+        'success': True,
+        'best_model': results.get('best_model'),
+        'training_summary': results.get('training_summary')
+    }
+
+
+JOB_HANDLERS: Dict[str, Callable[[Job], Any]] = {
+    'train': run_training_job
+}
+
+
+async def record_job_status(job: Optional[Job]):
+    """Mirror a queued job's state into its session so results endpoints see it"""
+    if job is None or not job.session_id:
+        return
+    session_data = await session_storage.get_session(job.session_id)
+    if not session_data:
+        return
+    tracker = ProgressTracker(job.session_id, 'training')
+    if job.status == QUEUED:
+        session_data['status'] = 'training_queued'
+        tracker.update('retrying', 0.0, {'job_id': job.id, 'attempt': job.attempts, 'error': job.error})
+    elif job.status == CANCELLED:
+        session_data['status'] = 'training_cancelled'
+        tracker.cancelled({'job_id': job.id})
+    elif job.status == FAILED:
+        session_data['status'] = 'training_failed'
+        tracker.failed(job.error or 'Training failed', {'job_id': job.id})
+        session_data['error'] = job.error
+        session_data['training_results'] = {'success': False, 'error': job.error}
+    else:
+        return
+    await session_storage.save_session(job.session_id, session_data)
+
+
+def _execute_job(job_id: str, worker_id: str):
+    """Child-process entry point: run one claimed job and record its outcome under the worker's lease"""
+    logging.basicConfig(level=logging.INFO)
+    job = job_queue.get(job_id)
+    if job is None or job.status != RUNNING or job.worker_id != worker_id:
+        return
+
+    try:
+        result = asyncio.run(JOB_HANDLERS[job.kind](job))
+        job_queue.complete(job_id, worker_id, result)
+    except PermanentJobError as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        asyncio.run(record_job_status(job_queue.fail(job_id, worker_id, str(e), retry=False)))
+    except Exception as e:
+        logger.error(f"Job {job_id} attempt {job.attempts} failed: {e}")
+        asyncio.run(record_job_status(job_queue.fail(job_id, worker_id, str(e))))
+
+
+class TrainingWorker:
+    """Claims jobs one at a time and supervises the child process running each.
+
+    The supervisor renews the job's lease while the child runs and terminates
+    the child on cancellation or timeout. A child that dies without recording
+    an outcome (e.g. killed for memory) counts as a failed attempt.
+    """
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or f"worker-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.context = multiprocessing.get_context('spawn')
+        self.running = True
+
+    def run_forever(self):
+        logger.info(f"Training worker {self.worker_id} started")
+        while self.running:
+            try:
+                job_queue.requeue_expired()
+                job = job_queue.claim(self.worker_id)
+                if job is None:
+                    time.sleep(JOB_POLL_INTERVAL)
+                    continue
+                if job.kind not in JOB_HANDLERS:
+                    job_queue.fail(job.id, self.worker_id, f"Unknown job kind: {job.kind}", retry=False)
+                    continue
+                self.supervise(job)
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} loop error: {e}")
+                time.sleep(JOB_POLL_INTERVAL)
+
+    def supervise(self, job: Job):
+        logger.info(f"Worker {self.worker_id} running {job.kind} job {job.id} (attempt {job.attempts})")
+        process = self.context.Process(target=_execute_job, args=(job.id, self.worker_id), name=f"job-{job.id}")
+        process.start()
+        deadline = time.time() + JOB_TIMEOUT_SECONDS
+
+        try:
+            while process.is_alive():
+                process.join(JOB_POLL_INTERVAL)
+                if not process.is_alive():
+                    break
+                current = job_queue.renew_lease(job.id, self.worker_id)
+                if current is not None and current.cancel_requested:
+                    self._stop(process)
+                    asyncio.run(record_job_status(job_queue.mark_cancelled(job.id, self.worker_id)))
+                    logger.info(f"Cancelled running job {job.id}")
+                    return
+                if time.time() > deadline:
+                    self._stop(process)
+                    asyncio.run(record_job_status(
+                        job_queue.fail(job.id, self.worker_id, f"Job exceeded {JOB_TIMEOUT_SECONDS}s timeout", retry=False)
+                    ))
+                    return
+        finally:
+            # The worker itself is shutting down: stop the child and hand the job back
+            if process.is_alive():
+                self._stop(process)
+                job_queue.fail(job.id, self.worker_id, "Worker shut down while the job was running")
+
+        current = job_queue.get(job.id)
+        if current is not None and current.status == RUNNING:
+            asyncio.run(record_job_status(
+                job_queue.fail(job.id, self.worker_id, f"Worker process exited with code {process.exitcode}")
+            ))
+
+    @staticmethod
+    def _stop(process: multiprocessing.Process):
+        process.terminate()
+        process.join(10)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+def worker_main(worker_id: Optional[str] = None):
+    """Process entry point for one supervising worker"""
+    logging.basicConfig(level=logging.INFO)
+    # SIGTERM unwinds through supervise(), which requeues the job in flight
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    TrainingWorker(worker_id).run_forever()
+
+
+def start_worker_processes(n_workers: int = JOB_WORKERS) -> List[subprocess.Popen]:
+    """Start supervising workers as separate interpreter processes running this module"""
+    script = os.path.abspath(__file__)
+    processes = [
+        subprocess.Popen(
+            [sys.executable, script, "--workers", "1", "--worker-id", f"worker-{os.getpid()}-{i}"],
+            cwd=os.path.dirname(script)
+        )
+        for i in range(n_workers)
+    ]
+    logger.info(f"Started {len(processes)} training worker processes")
+    return processes
+
+
+def stop_worker_processes(processes: List[subprocess.Popen], timeout: float = 30):
+    """SIGTERM each worker (its running job is requeued), killing any that do not exit in time"""
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run training workers against the job queue")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    parser.add_argument("--worker-id", default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.workers <= 1:
+        worker_main(args.worker_id)
+    else:
+        workers = start_worker_processes(args.workers)
+        try:
+            for worker in workers:
+                worker.wait()
+        except KeyboardInterrupt:
+            stop_worker_processes(workers)
+            sys.exit(0)
@@ -8,11 +8,13 @@ import asyncio
 import logging
 import json
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set, Callable, Awaitable
 from dataclasses import dataclass, asdict
 from enum import Enum
 import uuid
 
+from progress_events import progress_store, PROGRESS_POLL_INTERVAL
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -67,6 +69,12 @@ class WebSocketServer:
         self.user_sessions: Dict[str, List[str]] = {}  # user_id -> session_ids
         self.connected_clients: Dict[str, Dict[str, Any]] = {}  # sid -> client_info
         
+        # Progress subscriptions: ML session_id -> subscribed sids, and the last event relayed per session
+        self.progress_watchers: Dict[str, Set[str]] = {}
+        self.progress_cursors: Dict[str, Optional[str]] = {}
+        # Set by the API: async (session_id, client_info) -> bool, deciding who may watch a session
+        self.session_authorizer: Optional[Callable[[str, Dict[str, Any]], Awaitable[bool]]] = None
+        
         # Initialize available agents
         self._initialize_agents()
         
@@ -151,8 +159,10 @@ class WebSocketServer:
                                     session.status = SessionStatus.PAUSED
                                     session.last_activity = datetime.now()
                     
-                    # Remove from connected clients
+                    # Remove from connected clients and progress rooms
                     del self.connected_clients[sid]
+                    for session_id in list(self.progress_watchers):
+                        self._unwatch(session_id, sid)
                     
                 logger.info(f"Client {sid} disconnected")
                 
@@ -295,6 +305,85 @@ class WebSocketServer:
             except Exception as e:
                 logger.error(f"Error leaving assessment: {e}")
 
+        @self.sio.event
+        async def join_session(sid, data):
+            """Subscribe to progress events of an ML session (training, clustering, EDA)"""
+            try:
+                session_id = (data or {}).get('sessionId')
+                client_info = self.connected_clients.get(sid)
+                if not session_id or not client_info:
+                    await self.sio.emit('error', {'message': 'Invalid session subscription'}, room=sid)
+                    return
+                
+                if self.session_authorizer and not await self.session_authorizer(session_id, client_info):
+                    await self.sio.emit('error', {'message': 'Not authorized for this session'}, room=sid)
+                    return
+                
+                await self.sio.enter_room(sid, f"session_{session_id}")
+                
+                # Catch up on the current run before live events start arriving
+                history = await asyncio.to_thread(progress_store.read_latest_run, session_id)
+                if session_id not in self.progress_watchers:
+                    self.progress_watchers[session_id] = set()
+                    self.progress_cursors[session_id] = history[-1]['id'] if history else None
+                self.progress_watchers[session_id].add(sid)
+                
+                await self.sio.emit('session_joined', {
+                    'sessionId': session_id,
+                    'status': 'joined',
+                    'history': history
+                }, room=sid)
+                
+            except Exception as e:
+                logger.error(f"Error joining session: {e}")
+                await self.sio.emit('error', {'message': f'Failed to join session: {str(e)}'}, room=sid)
+
+        @self.sio.event
+        async def leave_session(sid, data):
+            """Unsubscribe from an ML session's progress events"""
+            try:
+                session_id = (data or {}).get('sessionId')
+                await self.sio.leave_room(sid, f"session_{session_id}")
+                self._unwatch(session_id, sid)
+                
+            except Exception as e:
+                logger.error(f"Error leaving session: {e}")
+
+    def _unwatch(self, session_id: str, sid: str):
+        watchers = self.progress_watchers.get(session_id)
+        if watchers is None:
+            return
+        watchers.discard(sid)
+        if not watchers:
+            self.progress_watchers.pop(session_id, None)
+            self.progress_cursors.pop(session_id, None)
+
+    async def relay_progress(self):
+        """Forward new progress events of watched sessions to their rooms.
+        
+        Events are written by whichever process does the work (API executor
+        threads or training worker processes), so the relay polls the shared
+        progress store rather than receiving them in-process.
+        """
+        while True:
+            try:
+                for session_id in list(self.progress_watchers):
+                    events = await asyncio.to_thread(
+                        progress_store.read, session_id, self.progress_cursors.get(session_id)
+                    )
+                    if not events or session_id not in self.progress_watchers:
+                        continue
+                    self.progress_cursors[session_id] = events[-1]['id']
+                    for event in events:
+                        await self.emit_to_session(session_id, 'progress', event)
+            except Exception as e:
+                logger.error(f"Error relaying progress: {e}")
+            await asyncio.sleep(PROGRESS_POLL_INTERVAL)
+
+    async def emit_to_session(self, session_id: str, event: str, data: Any):
+        """Emit an event to every client subscribed to an ML session"""
+        await self.sio.emit(event, data, room=f"session_{session_id}")
+
     async def _simulate_agent_response(self, session_id: str, agent_id: str, user_message: str = None):
         """Simulate agent response (replace with actual AI agent integration)"""
         try:
@@ -451,7 +540,8 @@ class WebSocketServer:
             'active_sessions': len([s for s in self.sessions.values() if s.status == SessionStatus.ACTIVE]),
             'connected_clients': len(self.connected_clients),
             'agents_online': len([a for a in self.agents.values() if a.status == AgentStatus.ONLINE]),
-            'total_messages': sum(len(s.messages) for s in self.sessions.values())
+            'total_messages': sum(len(s.messages) for s in self.sessions.values()),
+            'watched_ml_sessions': len(self.progress_watchers)
         }
 
 # Create global WebSocket server instance
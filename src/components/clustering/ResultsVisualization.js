@@ -76,6 +76,8 @@ const ResultsVisualization = ({ analysisResults, validationResults, onNext }) =>
     { x: 1.9, y: -1.3, cluster: 2, size: 42 }
   ];
 
+  const vizSummary = analysisResults.visualization_summary;
+
   const bestOpt = optDataSafe.length
     ? optDataSafe.reduce((best, current) => (current.silhouette > best.silhouette ? current : best))
     : { k: 0, silhouette: 0 };
@@ -222,6 +224,11 @@ const ResultsVisualization = ({ analysisResults, validationResults, onNext }) =>
         <h3 className="font-semibold text-charcoal mb-4">
           Cluster Visualization (PCA Projection) - {bestAlgorithm?.algorithm}
         </h3>
+        {vizSummary && vizSummary.n_shown < vizSummary.n_points && (
+          <p className="text-xs text-charcoal/60 -mt-2 mb-4">
+            Showing {vizSummary.n_shown.toLocaleString()} of {vizSummary.n_points.toLocaleString()} points, sampled per cluster
+          </p>
+        )}
         <ResponsiveContainer width="100%" height={400}>
           <ScatterChart data={clusterVisualizationData}>
             <CartesianGrid strokeDasharray="3 3" stroke="#A59E8C" />
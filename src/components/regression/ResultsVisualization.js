@@ -272,6 +272,12 @@ const ResultsVisualization = ({ trainingResults, sessionId, onContinue }) => {
     try {
       setIsLoading(true);
       const results = await regressionAPI.getResults(sessionId);
+      // Plots are a separate, lazily computed resource; fall back to client-side charts if unavailable
+      try {
+        results.visualizations = await regressionAPI.getVisualizations(sessionId);
+      } catch (vizError) {
+        console.warn('Visualizations unavailable, using fallbacks:', vizError);
+      }
       console.log('Full results from API:', results);
       console.log('Feature importance:', results?.feature_importance);
       console.log('Visualizations:', results?.visualizations);
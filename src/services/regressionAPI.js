@@ -357,6 +357,23 @@ class RegressionAPI {
     }
   }
 
+  async getVisualizations(sessionId) {
+    try {
+      const headers = await this.authHeaders();
+      const response = await fetch(`${this.baseURL}/api/regression/visualizations/${sessionId}`, { headers });
+      
+      if (!response.ok) {
+        throw new Error(`Failed to get visualizations: ${response.statusText}`);
+      }
+      
+      const result = await response.json();
+      return result.visualizations || {};
+    } catch (error) {
+      console.error('Error getting visualizations:', error);
+      throw error;
+    }
+  }
+
   async makePrediction(sessionId, predictionData) {
     try {
       const headers = await this.authHeaders();